@@ -1,16 +1,29 @@
 # app/api/v1/admin/admin_auth.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from ....core.admin import get_current_super_user
-from ....schemas.user import UserPublic, UserRoleUpdate
+from ....schemas.user import UserPublic, UserRoleUpdate, UserFilters, BulkUserSelection, BulkRoleUpdate, BulkUserResult, ROLE_PATTERN
 import logging
 from ....core.security import get_current_active_user
 from ....models.user import User
-from typing import List
-from ....crud.crud_admin import get_all_users, update_user_role
+from typing import List, Optional
+from ....crud.crud_admin import get_users, stream_users_async, update_user_role, USER_EXPORT_COLUMNS
+from ....crud.crud_admin import bulk_update_users, filtered_username_chunks, username_chunks, role_action, BulkUserAction
+from ....crud.crud_admin import SOFT_DELETE, MAKE_SUPERUSER, REVOKE_SUPERUSER
 from ....crud.crud_user import get_user_by_username
 from sqlalchemy.orm import Session
-from ....db.session import get_db
+from ....db.session import get_db, AsyncSessionLocal
+from ....core.config import settings
+from ....core.pagination import NEXT_CURSOR_HEADER
+from ....core.query_audit import skip_query_budget
+from ....core.serialization import ModelListResponse
+from ....core.streaming import ndjson_chunks, NDJSON_MEDIA_TYPE
+from ....core.user_cache import invalidate_user, user_cache_stats
+from ....core.token_blocklist import revocation_cache_stats
+from ....core.rate_limit import rate_limit_stats
+from ....core.report_cache import report_cache_stats
 from pydantic import BaseModel
 from fastapi.responses import JSONResponse
 
@@ -21,16 +34,51 @@ router = APIRouter()
 
 # These endpoints checks for superuser values in database.
 
+def user_filters(
+    role: Optional[str] = Query(None, pattern=ROLE_PATTERN),
+    is_active: Optional[bool] = None,
+    is_deleted: Optional[bool] = None,
+    joined_from: Optional[date] = Query(None, description="First day of date_joined to include"),
+    joined_to: Optional[date] = Query(None, description="Last day of date_joined to include"),
+    country: Optional[str] = Query(None, max_length=100, description="Exact match"),
+    city: Optional[str] = Query(None, max_length=100, description="Exact match"),
+) -> UserFilters:
+    if joined_from and joined_to and joined_from > joined_to:
+        raise HTTPException(status_code=400, detail="'joined_from' must not be after 'joined_to'")
+    return UserFilters(role=role, is_active=is_active, is_deleted=is_deleted, joined_from=joined_from, joined_to=joined_to, country=country, city=city)
+
 @router.get("/users", response_model=List[UserPublic])
-def list_all_users(db: Session = Depends(get_db), admin_user: User = Depends(get_current_super_user)):
+def list_all_users(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    filters: UserFilters = Depends(user_filters),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_super_user)
+):
+    """
+    A page of users in id order, optionally filtered. Accessible only by Superuser.
+    Use /users/export to get all of them at once.
+    """
+    users, next_cursor = get_users(db, filters, limit=limit, cursor=cursor)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return ModelListResponse(UserPublic, users, headers=headers)
+
+async def _user_export_batches(filters: UserFilters):
+    # The stream outlives the request's dependencies, so it opens (and closes) its own session
+    async with AsyncSessionLocal() as db:
+        async for batch in stream_users_async(db, filters, yield_per=settings.EXPORT_YIELD_PER):
+            yield batch
+
+@router.get("/users/export", response_class=StreamingResponse, responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}})
+async def export_users(filters: UserFilters = Depends(user_filters), admin_user: User = Depends(get_current_super_user)):
     """
-    Endpoint to list all users. Accessible only by Superuser.
+    Stream every matching user as NDJSON (one UserPublic object per line) with constant memory. Accessible only by Superuser.
     """
-    users = get_all_users(db)
-    # Assuming get_all_users returns a list of SQLAlchemy User models, 
-    # convert them to a list of UserPublic models
-    return [UserPublic.from_orm(user) for user in users]
-    #return [UserPublic(id=user.id, username=user.username, email=user.email, first_name=user.first_name, last_name=user.last_name, is_active=user.is_active) for user in users]
+    return StreamingResponse(
+        ndjson_chunks(USER_EXPORT_COLUMNS, _user_export_batches(filters)),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
 
 @router.get("/is-superuser")
 def is_admin(user: User = Depends(get_current_active_user)) -> dict:
@@ -52,6 +100,7 @@ def soft_delete_user(username: str, db: Session = Depends(get_db), current_super
     user.is_deleted = True
     db.add(user)
     db.commit()
+    invalidate_user(username)
     logger.info(f"User {username} soft-deleted by Superuser {current_superuser.username}")
     return {"message": f"User {username} has been soft-deleted"}
 
@@ -70,6 +119,7 @@ def make_user_admin(username: str, db: Session = Depends(get_db), current_superu
     user.is_superuser = True
     db.add(user)
     db.commit()
+    invalidate_user(username)
     logger.info(f"User {username} granted Superuser privileges by {current_superuser.username}")
     return {"message": f"User {username} has been granted Superuser privileges"}
 
@@ -88,6 +138,7 @@ def revoke_admin(username: str, db: Session = Depends(get_db), current_superuser
     user.is_superuser = False
     db.add(user)
     db.commit()
+    invalidate_user(username)
     logger.info(f"Superuser privileges revoked from user {username} by Superuser {current_superuser.username}")
     return {"message": f"Superuser privileges have been revoked from user {username}"}
 
@@ -106,14 +157,60 @@ def update_user_role_endpoint(username: str, role_update: UserRoleUpdate, db: Se
         logger.error(f"User {username} not found for role update")
         return JSONResponse(status_code=404, content={"detail": "User not found"})
 
+    # Stored as the role enum's value, lowercase, like the bulk endpoint stores it
+    new_role = role_update.role.lower()
+    if new_role not in ALLOWED_ROLES:
+        return JSONResponse(status_code=400, content={"detail": f"Role must be one of: {', '.join(ALLOWED_ROLES)}"})
+
     logger.debug(f"Current role for user {username}: {user.role}")
-    if user.role.lower() == role_update.role.lower():
+    if user.role.lower() == new_role:
         message = f"User {username} is already assigned the role '{role_update.role}'. No changes made."
         logger.info(message)
         return JSONResponse(status_code=200, content={"message": message})
 
-    updated_user = update_user_role(db, user, role_update.role.capitalize())
+    updated_user = update_user_role(db, user, new_role)
     logger.info(f"User {username}'s role updated to {updated_user.role} by superuser {current_super.username}")
 
     return UserPublic.from_orm(updated_user)
 
+# Bulk versions of the endpoints above, for many users at once: the same guards, one
+# UPDATE ... WHERE username IN (...) per chunk, and an outcome per user instead of an error
+
+def _bulk_update(db: Session, action: BulkUserAction, selection: BulkUserSelection, current_superuser: User, name: str) -> dict:
+    skip_query_budget()  # Two statements per chunk, however many chunks there are
+    chunk_size = settings.ADMIN_BULK_CHUNK_SIZE
+    if selection.usernames is not None:
+        chunks = username_chunks(db, selection.usernames, chunk_size)
+    else:
+        chunks = filtered_username_chunks(db, selection.filters, chunk_size)
+    result = bulk_update_users(db, action, current_superuser.username, chunks)
+    logger.info(f"Bulk {name} by Superuser {current_superuser.username}: {result['updated']} of {len(result['outcomes'])} users updated")
+    return result
+
+@router.post("/bulk/soft-delete", response_model=BulkUserResult)
+def bulk_soft_delete_users(selection: BulkUserSelection, db: Session = Depends(get_db), current_superuser: User = Depends(get_current_super_user)):
+    return _bulk_update(db, SOFT_DELETE, selection, current_superuser, "soft-delete")
+
+@router.post("/bulk/make-superuser", response_model=BulkUserResult)
+def bulk_make_superuser(selection: BulkUserSelection, db: Session = Depends(get_db), current_superuser: User = Depends(get_current_super_user)):
+    return _bulk_update(db, MAKE_SUPERUSER, selection, current_superuser, "make-superuser")
+
+@router.post("/bulk/revoke-superuser", response_model=BulkUserResult)
+def bulk_revoke_superuser(selection: BulkUserSelection, db: Session = Depends(get_db), current_superuser: User = Depends(get_current_super_user)):
+    return _bulk_update(db, REVOKE_SUPERUSER, selection, current_superuser, "revoke-superuser")
+
+@router.post("/bulk/update-role", response_model=BulkUserResult)
+def bulk_update_role(selection: BulkRoleUpdate, db: Session = Depends(get_db), current_superuser: User = Depends(get_current_super_user)):
+    return _bulk_update(db, role_action(selection.role), selection, current_superuser, f"update-role to {selection.role}")
+
+@router.get("/cache-stats")
+def get_cache_stats(admin_user: User = Depends(get_current_super_user)) -> dict:
+    """
+    Hit/miss counters for the caches and the rate limiter. Accessible only by Superuser.
+    """
+    return {
+        "user_cache": user_cache_stats(),
+        "token_revocation_cache": revocation_cache_stats(),
+        "rate_limit": rate_limit_stats(),
+        "report_cache": report_cache_stats(),
+    }
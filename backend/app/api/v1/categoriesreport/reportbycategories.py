@@ -1,111 +1,85 @@
-from fastapi import APIRouter, Depends, Request
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from ....db.session import get_db
-from datetime import date, datetime, timedelta
-from sqlalchemy import func
-from typing import List
-from ....schemas.reportbycategories import ExpensePercentageReport,ExpenseReportByCategory,BudgetOverview  # You need to define this schema
+from ....db.replica import get_read_db, is_replica_session
+from typing import List, Optional, Tuple
+from ....schemas.reportbycategories import ExpensePercentageReport,ExpenseReportByCategory,BudgetOverview,MonthlySummary,TrendReport  # You need to define this schema
 from ....core.security import get_current_active_user
 from ....models.user import User
-from ....models.transactions import Transaction
-from ....models.category import Category
-from decimal import Decimal
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from ....crud import crud_reportsbycategories as crud_reports
 from ....config import RATE_LIMITS
+from ....core.rate_limit import limiter
+from ....core.report_cache import cached_month_summary, cached_trend_report
 # Import other CRUD functions as necessary
 
 
-# Assuming you have the limiter instance set up as shown above
-limiter = Limiter(key_func=get_remote_address)
 
 router = APIRouter()
 
-@router.get("/categories/expenses/{year}/{month}", response_model=List[ExpenseReportByCategory])
-@limiter.limit(RATE_LIMITS["read"])  # This limits to 5 requests per minute
-def get_expenses_by_category(request: Request,year: int, month: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    start_date = datetime(year, month, 1)
-    end_date = (start_date + timedelta(days=31)).replace(day=1)  # Adjust for month/year differences
+# Reports read from the replica when there is one (db/replica.py)
+# Each report is computed in one pass over the month's rollup rows (see crud_reportsbycategories)
+# and served from the report cache (core/report_cache.py) until the user's data changes
 
-    expenses = db.query(
-        Category.id.label("id"),
-        Category.name.label("category_name"),
-        func.sum(Transaction.Amount).label("total_amount")
-    ).join(Category, Category.id == Transaction.CategoryID).filter(
-        Transaction.Date >= start_date,
-        Transaction.Date < end_date,
-        Transaction.UserID == current_user.id,
-        Transaction.Is_Income == False
-    ).group_by(Category.id, Category.name).all()
+def _month_summary(route: str, db: Session, user_id: int, year: int, month: int) -> MonthlySummary:
+    return cached_month_summary(route, user_id, year, month, lambda: crud_reports.get_month_summary(db, user_id, year, month), replica=is_replica_session(db))
 
-    # Convert to ExpenseReportByCategory schema
-    report = [ExpenseReportByCategory(id=expense.id, category_name=expense.category_name, total_amount=expense.total_amount) for expense in expenses]
-    return report
+@router.get("/categories/expenses/{year}/{month}", response_model=List[ExpenseReportByCategory])
+@limiter.limit(RATE_LIMITS["read"])  # This limits to 5 requests per minute
+def get_expenses_by_category(request: Request,year: int, month: int, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_active_user)):
+    return _month_summary("expenses_by_category", db, current_user.id, year, month).expenses_by_category
 
 @router.get("/categories/expense-percentages/{year}/{month}", response_model=List[ExpensePercentageReport])
 @limiter.limit(RATE_LIMITS["read"])  # This limits to 5 requests per minute
-def get_expense_percentages(request: Request,year: int, month: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    start_date = datetime(year, month, 1)
-    end_date = (start_date + timedelta(days=31)).replace(day=1)
-
-    total_income = db.query(
-        func.sum(Transaction.Amount)
-    ).filter(
-        Transaction.Date >= start_date,
-        Transaction.Date < end_date,
-        Transaction.UserID == current_user.id,
-        Transaction.Is_Income == True
-    ).scalar() or 0  # Default to 0 if no income
-
-    expense_percentages = db.query(
-        Category.id.label("id"),
-        Category.name.label("category_name"),
-        func.sum(Transaction.Amount).label("total_amount")
-    ).join(Category, Category.id == Transaction.CategoryID).filter(
-        Transaction.Date >= start_date,
-        Transaction.Date < end_date,
-        Transaction.UserID == current_user.id,
-        Transaction.Is_Income == False
-    ).group_by(Category.id, Category.name).all()
-
-    # Convert to ExpensePercentageReport schema
-    report = [
-        ExpensePercentageReport(
-            id=expense.id,
-            category_name=expense.category_name,
-            percentage=(expense.total_amount / total_income * 100) if total_income else 0
-        ) for expense in expense_percentages
-    ]
-    return report
+def get_expense_percentages(request: Request,year: int, month: int, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_active_user)):
+    return _month_summary("expense_percentages", db, current_user.id, year, month).expense_percentages
 
 @router.get("/budgets/{year}/{month}/budget-overview", response_model=BudgetOverview)
 @limiter.limit(RATE_LIMITS["read"])  # This limits to 5 requests per minute
-def get_monthly_budget_overview(request: Request,year: int, month: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    start_date = datetime(year, month, 1)
-    end_date = (start_date + timedelta(days=31)).replace(day=1)  # Adjust for month/year differences
+def get_monthly_budget_overview(request: Request,year: int, month: int, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_active_user)):
+    return _month_summary("budget_overview", db, current_user.id, year, month).overview
+
+@router.get("/{year}/{month}/summary", response_model=MonthlySummary)
+@limiter.limit(RATE_LIMITS["read"])
+def get_monthly_summary(request: Request,year: int, month: int, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_active_user)):
+    """
+    Overview, per-category totals and percentages for the dashboard in one request and one query.
+    """
+    return _month_summary("summary", db, current_user.id, year, month)
 
-    # Calculate total income
-    total_income = Decimal(db.query(
-        func.sum(Transaction.Amount)
-    ).filter(
-        Transaction.Date >= start_date,
-        Transaction.Date < end_date,
-        Transaction.UserID == current_user.id,
-        Transaction.Is_Income == True
-    ).scalar() or 0)
+TRENDS_MAX_MONTHS = 60
+YEAR_MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
 
-    # Calculate total expenses
-    total_expenses = Decimal(db.query(
-        func.sum(Transaction.Amount)
-    ).filter(
-        Transaction.Date >= start_date,
-        Transaction.Date < end_date,
-        Transaction.UserID == current_user.id,
-        Transaction.Is_Income == False
-    ).scalar() or 0)
+def _parse_year_month(value: str) -> Tuple[int, int]:
+    year, month = value.split("-")
+    return int(year), int(month)
 
-    # Compute balance
-    balance = total_income - total_expenses
+def _months_before(year: int, month: int, months: int) -> Tuple[int, int]:
+    index = year * 12 + month - 1 - months
+    return index // 12, index % 12 + 1
 
-    # Ensure the response model can serialize `Decimal` values or convert to float
-    return BudgetOverview(total_income=float(total_income), total_expenses=float(total_expenses), balance=float(balance))
\ No newline at end of file
+@router.get("/trends", response_model=TrendReport)
+@limiter.limit(RATE_LIMITS["read"])
+def get_trends(
+    request: Request,
+    month_from: Optional[str] = Query(None, alias="from", pattern=YEAR_MONTH_PATTERN, description="First month (YYYY-MM); defaults to 11 months before 'to'"),
+    month_to: Optional[str] = Query(None, alias="to", pattern=YEAR_MONTH_PATTERN, description="Last month (YYYY-MM); defaults to the current month"),
+    group: str = Query("month", pattern="^(category|month)$", description="'category' adds a series per category to the monthly totals"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Monthly income, expenses and transaction counts over a range of months, zero-filled, from one
+    grouped query over the rollup. Replaces calling the month reports once per month for a chart.
+    """
+    today = date.today()
+    end = _parse_year_month(month_to) if month_to else (today.year, today.month)
+    start = _parse_year_month(month_from) if month_from else _months_before(*end, 11)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (end[0] - start[0]) * 12 + end[1] - start[1] + 1 > TRENDS_MAX_MONTHS:
+        raise HTTPException(status_code=400, detail=f"At most {TRENDS_MAX_MONTHS} months per request")
+    return cached_trend_report(
+        f"trends_by_{group}", current_user.id, start, end, group,
+        lambda: crud_reports.get_trends(db, current_user.id, start, end, by_category=group == "category"),
+        replica=is_replica_session(db),
+    )
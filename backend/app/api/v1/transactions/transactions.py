@@ -1,51 +1,191 @@
 # app/api/endpoints/transaction.py
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from typing import List
-from ....db.session import get_db
-from ....schemas.transaction import TransactionCreate, Transaction
-from ....schemas.transaction import Transaction as TransactionSchema
-from ....models.transactions import Transaction as SQLAlchemyTransaction
-from ....crud.crud_transactions import create_transaction, get_transactions, update_transaction, delete_transaction, get_transaction
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from datetime import date
+from ....db.session import get_async_db
+from ....db.replica import get_async_read_db, async_read_session_factory, is_replica_session
+from ....schemas.transaction import TransactionCreate, Transaction, TransactionWithCategory, TransactionFilters, BulkImportResult
+from ....crud.crud_transactions import create_transaction_async, get_transactions_async, update_transaction_async, delete_transaction_async, get_transaction_async, bulk_create_transactions_async
+from ....crud.crud_transactions import stream_transactions_async, EXPORT_COLUMNS, DEFAULT_TRANSACTION_SORT
 from ....models.user import User
 from ....core.security import get_current_active_user
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from ....core.pagination import NEXT_CURSOR_HEADER
+from ....core.etag import collection_etag, etag_matches, not_modified
+from ....core.serialization import ModelResponse, ModelListResponse
+from ....core.streaming import csv_chunks, ndjson_chunks, CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE
 from ....config import RATE_LIMITS
+from ....core.rate_limit import limiter
+from ....core.config import settings
+from ....core.query_audit import skip_query_budget
+import asyncio
+import csv
+import io
+import json
 # Import other CRUD functions as necessary
 
 
-# Assuming you have the limiter instance set up as shown above
-limiter = Limiter(key_func=get_remote_address)
 
 router = APIRouter()
 
+# ?expand=category embeds each transaction's category, eager-loaded so rows never lazy-load it
+Expand = Optional[Literal["category"]]
+EXPAND_QUERY = Query(None, description="'category' embeds a compact category object in each transaction")
+
+def _read_schema(expand: Expand):
+    return TransactionWithCategory if expand == "category" else Transaction
+
 @router.post("/", response_model=Transaction)
 @limiter.limit(RATE_LIMITS["write"])  # This limits to 3 requests per minute
-async def create_transaction_endpoint(request: Request,transaction: TransactionCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    return create_transaction(db=db, transaction=transaction, user_id=current_user.id)
+async def create_transaction_endpoint(request: Request,transaction: TransactionCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_active_user)):
+    return await create_transaction_async(db=db, transaction=transaction, user_id=current_user.id)
+
+def _csv_rows(upload):
+    # Rows are read from the spooled upload one at a time (in the import's worker thread, see
+    # bulk_create_transactions_async); blank cells mean "not set"
+    reader = csv.DictReader(io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""))
+    for row_number, row in enumerate(reader, start=1):
+        yield row_number, {key.strip(): value for key, value in row.items() if key is not None and value not in ("", None)}
+
+BULK_IMPORT_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": TransactionCreate.model_json_schema()}},
+            "multipart/form-data": {
+                "schema": {"type": "object", "properties": {"file": {"type": "string", "format": "binary", "description": "CSV with a header row of TransactionCreate field names"}}}
+            },
+        },
+    }
+}
+
+@router.post("/bulk", response_model=BulkImportResult, openapi_extra=BULK_IMPORT_OPENAPI)
+@limiter.limit(RATE_LIMITS["write"])
+async def bulk_create_transactions_endpoint(
+    request: Request,
+    batch_size: int = Query(None, ge=1, le=10000, description="Rows per INSERT/COMMIT; defaults to BULK_IMPORT_BATCH_SIZE"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Import many transactions at once from a JSON array or an uploaded CSV file (form field "file").
+    Valid rows are inserted in batches; invalid rows are returned in "errors" without failing the import.
+    """
+    skip_query_budget()  # A few statements per batch, however many batches there are
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Expected a CSV file in the 'file' form field")
+        rows = _csv_rows(upload)
+    else:
+        # Parsed in a worker thread: a large array would hold the event loop for the whole parse
+        body = await request.body()
+        try:
+            body = await asyncio.to_thread(json.loads, body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of transactions")
+        rows = enumerate(body, start=1)
+
+    return await bulk_create_transactions_async(db=db, user_id=current_user.id, rows=rows, batch_size=batch_size or settings.BULK_IMPORT_BATCH_SIZE)
+
+EXPORT_FORMATS = {
+    "csv": (csv_chunks, CSV_MEDIA_TYPE),
+    "ndjson": (ndjson_chunks, NDJSON_MEDIA_TYPE),
+}
+
+async def _export_batches(user_id: int, date_from: Optional[date], date_to: Optional[date]):
+    # The get_async_db session is closed before a StreamingResponse body runs, so the
+    # stream opens (and closes) its own session for as long as the client is reading
+    async with (await async_read_session_factory(user_id))() as db:
+        async for batch in stream_transactions_async(db, user_id, date_from, date_to, yield_per=settings.EXPORT_YIELD_PER):
+            yield batch
+
+@router.get("/export", response_class=StreamingResponse, responses={200: {"content": {CSV_MEDIA_TYPE: {}, NDJSON_MEDIA_TYPE: {}}}})
+@limiter.limit(RATE_LIMITS["read"])
+async def export_transactions(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    date_from: Optional[date] = Query(None, alias="from", description="First day to include"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day to include"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream all of the user's transactions (optionally within a date range), oldest first, as CSV or NDJSON.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    encode, media_type = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        encode(EXPORT_COLUMNS, _export_batches(current_user.id, date_from, date_to)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
 
-@router.get("/", response_model=List[Transaction])
+@router.get("/", response_model=List[TransactionWithCategory])
 @limiter.limit(RATE_LIMITS["read"])  # This limits to 10 requests per minute
-async def read_transactions(request: Request,skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    transactions = get_transactions(db=db, user_id=current_user.id, skip=skip, limit=limit)
-    return transactions
+async def read_transactions(
+    request: Request,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page; takes precedence over skip"),
+    expand: Expand = EXPAND_QUERY,
+    sort: str = Query(DEFAULT_TRANSACTION_SORT, pattern="^-?(date|amount)$", description="'date' or 'amount', prefixed with '-' for descending"),
+    date_from: Optional[date] = Query(None, alias="from", description="First day to include"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day to include"),
+    category_id: Optional[List[int]] = Query(None, description="Repeat to match any of several categories"),
+    min_amount: Optional[float] = Query(None, ge=0),
+    max_amount: Optional[float] = Query(None, ge=0),
+    is_income: Optional[bool] = Query(None, description="true for income only, false for expenses only"),
+    location: Optional[str] = Query(None, max_length=255, description="Exact match"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    A page of the user's transactions, optionally filtered and sorted. Every filter and sort is
+    served from an index; a cursor is only valid with the filters and sort it was returned for.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if min_amount is not None and max_amount is not None and min_amount > max_amount:
+        raise HTTPException(status_code=400, detail="'min_amount' must not be greater than 'max_amount'")
+    filters = TransactionFilters(
+        date_from=date_from, date_to=date_to, category_ids=category_id, min_amount=min_amount,
+        max_amount=max_amount, is_income=is_income, location=location,
+    )
+    headers = {}
+    # The ETag covers the query string, so every page has its own. None on the replica (see core/etag.py)
+    etag = None if is_replica_session(db) else await collection_etag(request, current_user.id)
+    if etag:
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        headers["ETag"] = etag
+    transactions, next_cursor = await get_transactions_async(
+        db=db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor, expand_category=expand == "category",
+        filters=filters, sort=sort,
+    )
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return ModelListResponse(_read_schema(expand), transactions, headers=headers)
 
-@router.get("/{transaction_id}/", response_model=Transaction)
+@router.get("/{transaction_id}/", response_model=TransactionWithCategory)
 @limiter.limit(RATE_LIMITS["read"])  # This limits to 10 requests per minute
-async def read_transaction(request: Request,transaction_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    transaction = get_transaction(db=db, transaction_id=transaction_id, user_id=current_user.id)
+async def read_transaction(request: Request,transaction_id: int, expand: Expand = EXPAND_QUERY, db: AsyncSession = Depends(get_async_read_db), current_user: User = Depends(get_current_active_user)):
+    transaction = await get_transaction_async(db=db, transaction_id=transaction_id, user_id=current_user.id, expand_category=expand == "category")
     if transaction is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return transaction
+    return ModelResponse(_read_schema(expand), transaction)
 
 @router.put("/{transaction_id}/", response_model=Transaction)
 @limiter.limit(RATE_LIMITS["write"])  # This limits to 3 requests per minute
 async def update_transaction_endpoint(
-    request: Request,transaction_id: int, transaction_data: TransactionCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
+    request: Request,transaction_id: int, transaction_data: TransactionCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_active_user)
 ):
-    updated_transaction = update_transaction(
+    updated_transaction = await update_transaction_async(
         db=db, transaction_id=transaction_id, transaction_data=transaction_data, user_id=current_user.id
     )
     if updated_transaction is None:
@@ -57,10 +197,10 @@ async def update_transaction_endpoint(
 async def delete_transaction_endpoint(
     request: Request,
     transaction_id: int, 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     current_user: User = Depends(get_current_active_user)
 ):
-    success = delete_transaction(
+    success = await delete_transaction_async(
         db=db, 
         transaction_id=transaction_id, 
         user_id=current_user.id
@@ -69,12 +209,20 @@ async def delete_transaction_endpoint(
         raise HTTPException(status_code=404, detail="Transaction not found or you don't have permission to delete it")
     return {"message": "Transaction deleted successfully"}
 
-@router.get("/recent", response_model=List[TransactionSchema])
+@router.get("/recent", response_model=List[TransactionWithCategory])
 @limiter.limit(RATE_LIMITS["read"])  # This limits to 10 requests per minute
-def get_recent_transactions(request: Request,limit: int = 10, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    transactions = db.query(SQLAlchemyTransaction).filter(SQLAlchemyTransaction.UserID == current_user.id).order_by(SQLAlchemyTransaction.Date.desc()).limit(limit).all()
+async def get_recent_transactions(
+    request: Request,
+    limit: int = Query(10, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    expand: Expand = EXPAND_QUERY,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    # Same keyset ordering and paging as GET /transactions/, with a smaller default page
+    transactions, next_cursor = await get_transactions_async(db=db, user_id=current_user.id, limit=limit, cursor=cursor, expand_category=expand == "category")
     if not transactions:
         raise HTTPException(status_code=404, detail="No transactions found")
-    return transactions
+    return ModelListResponse(_read_schema(expand), transactions, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
 
 # Add endpoints for updating and deleting transactions as needed
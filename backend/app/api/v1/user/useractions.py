@@ -1,17 +1,14 @@
 from fastapi import APIRouter, Depends,HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
-from ....db.session import get_db
+from ....db.session import get_async_db
 from ....schemas.user import UserPublic, UserUpdate
 from ....core.security import get_current_active_user
 from ....models.user import User
-from ....crud.crud_user import update_user_profile
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from ....crud.crud_user import update_user_profile_async
 from ....config import RATE_LIMITS
+from ....core.rate_limit import limiter
 
-# Assuming you have the limiter instance set up as shown above
-limiter = Limiter(key_func=get_remote_address)
 
 router = APIRouter()
 
@@ -27,9 +24,9 @@ def get_user_profile(request: Request,current_user: User = Depends(get_current_a
 
 @router.patch("/profile", response_model=UserPublic)
 @limiter.limit(RATE_LIMITS["write"])  # This limits to 3 requests per minute
-def update_user_profile_partial(request: Request,update_data: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+async def update_user_profile_partial(request: Request,update_data: UserUpdate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_active_user)):
     logger.info(f"Updating profile for user: {current_user.username}")
-    updated_user = update_user_profile(db, user_id=current_user.id, update_data=update_data)
+    updated_user = await update_user_profile_async(db, user_id=current_user.id, update_data=update_data)
     if not updated_user:
         logger.error(f"User not found for user ID: {current_user.id}")
         raise HTTPException(status_code=404, detail="User not found")
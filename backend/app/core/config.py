@@ -3,17 +3,57 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
+from typing import Optional
 import os
 
 load_dotenv()  # Load environment variables from .env file
 
 class Settings(BaseSettings):
-    REDIS_URL: str = os.getenv("REDIS_URL")
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # Seconds; keeps a slow or unreachable Redis from stalling requests
     SECRET_KEY: str = os.getenv("SECRET_KEY", "default_secret_key_for_testing_if_not_set_in_env")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")  # Derived from DATABASE_URL when not set
+    DATABASE_READ_URL: Optional[str] = os.getenv("DATABASE_READ_URL")  # Read replica for list and report endpoints
+    ASYNC_DATABASE_READ_URL: Optional[str] = os.getenv("ASYNC_DATABASE_READ_URL")  # Derived from DATABASE_READ_URL when not set
+    REPLICA_READ_AFTER_WRITE_SECONDS: int = 10  # Users who wrote this recently read from the primary (above replica lag)
+    REPLICA_WITHOUT_REDIS: bool = False  # Use the replica without REDIS_URL; read-your-writes then only covers writes made in the same worker
+    DB_POOL_SIZE: int = 5  # Connections kept open per engine and worker (not used for SQLite)
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 10  # How long a request waits for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this, before the server's idle timeout closes them
+    DB_POOL_PRE_PING: bool = False  # Test every connection on checkout; an extra round-trip, only needed if recycling isn't enough
+    SCHEMA_CHECK_ON_STARTUP: bool = True  # Verify the indexes declared on the models exist
+    SCHEMA_CHECK_STRICT: bool = False  # Refuse to start when they don't
+    WARMUP_ENABLED: bool = True  # Open DB/Redis connections and load the crypto backends before serving
+    WARMUP_DB_CONNECTIONS: int = 2  # Connections opened per engine at startup (at most DB_POOL_SIZE)
+    WARMUP_TIMEOUT_SECONDS: float = 10  # Start serving anyway once warm-up has taken this long
+    BULK_IMPORT_BATCH_SIZE: int = 1000  # Rows per INSERT/COMMIT in POST /transactions/bulk
+    ADMIN_BULK_CHUNK_SIZE: int = 500  # Usernames per SELECT/UPDATE/COMMIT in the bulk admin operations
+    EXPORT_YIELD_PER: int = 1000  # Rows fetched per round-trip from the server-side cursor in exports
+    PASSWORD_HASH_WORKERS: int = 4  # Threads for bcrypt hash/verify, off the event loop
+    TOKEN_REVOCATION_CACHE_SECONDS: int = 5  # How long a worker trusts a "not revoked" answer before asking Redis again
+    BLOCKLIST_PURGE_INTERVAL_SECONDS: int = 3600  # How often expired rows are deleted from blocklisted_tokens (0 disables)
+    BLOCKLIST_PURGE_BATCH_SIZE: int = 1000
+    RATELIMIT_PER_USER: bool = False  # Key rate limits on the bearer token's user instead of the client address
+    RATELIMIT_SYNC_EVERY: int = 5  # Local hits per key between syncs to Redis
+    RATELIMIT_SYNC_INTERVAL_SECONDS: float = 1.0  # ...or after this long, whichever comes first
+    REPORT_CACHE_OPEN_MONTH_TTL_SECONDS: int = 300  # Cached month reports; writes invalidate them anyway
+    REPORT_CACHE_CLOSED_MONTH_TTL_SECONDS: int = 7 * 24 * 3600
+    REPORT_CACHE_REPLICA_TTL_SECONDS: int = 300  # Cap for reports computed on the replica, which can lag behind the version they're cached under
+    USER_CACHE_TTL_SECONDS: int = 30  # How long an authenticated user's row is served from the Redis cache
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 5  # ...and from the per-worker cache without Redis, which other workers' writes don't invalidate
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_USE_REDIS: bool = False  # Cache users in Redis, shared by and invalidated for every worker
+    METRICS_ENABLED: bool = True  # Record request, query and Redis metrics and serve them at /metrics
+    QUERY_LOG_REQUESTS: bool = True  # Log how many queries each request ran and how long they took
+    SLOW_QUERY_MS: float = 200  # Log statements slower than this, with the types of their parameters (0 disables)
+    QUERY_MAX_PER_REQUEST: int = 30  # Warn when a request runs more queries than this (0 disables)
+    QUERY_MAX_REPEATS: int = 5  # ...or runs the same SELECT more often than this, the N+1 pattern (0 disables)
+    QUERY_STRICT: bool = False  # Raise QueryBudgetExceeded instead of warning; for tests
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,147 @@
+# app/core/data_version.py
+
+import logging
+import time
+from typing import Dict, Optional
+from redis import RedisError
+from .config import settings
+from .redis import get_redis, get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# A per-user counter that changes whenever the user's transactions or categories do. Caches
+# put it in their keys, so bumping it invalidates every cached response for that user at once
+# without scanning for keys. Counters start at the current time in nanoseconds, so a version
+# is never reused even if Redis loses the key.
+
+def _redis_key(user_id: int) -> str:
+    return f"data-version:{user_id}"
+
+def get_data_version(user_id: int) -> Optional[str]:
+    """
+    The user's current data version, or None when Redis is not configured or unreachable.
+    """
+    redis_client = get_redis()
+    if redis_client is None:
+        return None
+    key = _redis_key(user_id)
+    try:
+        version = redis_client.get(key)
+        if version is None:
+            redis_client.set(key, time.time_ns(), nx=True)
+            version = redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Redis error reading data version for user {user_id}: {e}")
+        return None
+    return version.decode() if version is not None else None
+
+async def get_data_version_async(user_id: int) -> Optional[str]:
+    """
+    get_data_version for async code, through the redis.asyncio client.
+    """
+    redis_client = get_async_redis()
+    if redis_client is None:
+        return None
+    key = _redis_key(user_id)
+    try:
+        version = await redis_client.get(key)
+        if version is None:
+            await redis_client.set(key, time.time_ns(), nx=True)
+            version = await redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Redis error reading data version for user {user_id}: {e}")
+        return None
+    return version.decode() if version is not None else None
+
+def _queue_bump(pipe, user_id: int, replicated: bool) -> None:
+    key = _redis_key(user_id)
+    pipe.set(key, time.time_ns(), nx=True)
+    pipe.incr(key)
+    if replicated:
+        pipe.set(_recent_write_key(user_id), 1, ex=settings.REPLICA_READ_AFTER_WRITE_SECONDS)
+
+def bump_data_version(user_id: int) -> None:
+    """
+    Mark the user's data as changed. Call this after committing a write that affects what they read.
+    """
+    replicated = bool(settings.DATABASE_READ_URL)
+    if replicated:
+        _remember_write(user_id)
+    redis_client = get_redis()
+    if redis_client is None:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        _queue_bump(pipe, user_id, replicated)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Redis error bumping data version for user {user_id}: {e}")
+
+async def bump_data_version_async(user_id: int) -> None:
+    """
+    bump_data_version for the async crud functions, through the redis.asyncio client.
+    """
+    replicated = bool(settings.DATABASE_READ_URL)
+    if replicated:
+        _remember_write(user_id)
+    redis_client = get_async_redis()
+    if redis_client is None:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        _queue_bump(pipe, user_id, replicated)
+        await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Redis error bumping data version for user {user_id}: {e}")
+
+# Read-your-writes with a read replica: a user who wrote in the last REPLICA_READ_AFTER_WRITE_SECONDS
+# reads from the primary (db/replica.py), so they never see a list or report from before their
+# own write. Writes are remembered in this process and, for the other workers, in Redis.
+
+_MAX_REMEMBERED_WRITES = 10000
+_recent_writes: Dict[int, float] = {}  # user_id -> time.monotonic() of their last write in this process
+
+def _recent_write_key(user_id: int) -> str:
+    return f"recent-write:{user_id}"
+
+def _remember_write(user_id: int) -> None:
+    now = time.monotonic()
+    if len(_recent_writes) >= _MAX_REMEMBERED_WRITES:
+        for stale in [uid for uid, written in _recent_writes.items() if now - written >= settings.REPLICA_READ_AFTER_WRITE_SECONDS]:
+            del _recent_writes[stale]
+    _recent_writes[user_id] = now
+
+def _wrote_recently_here(user_id: int) -> bool:
+    written = _recent_writes.get(user_id)
+    return written is not None and time.monotonic() - written < settings.REPLICA_READ_AFTER_WRITE_SECONDS
+
+def wrote_recently(user_id: int) -> bool:
+    """
+    Whether the user wrote within REPLICA_READ_AFTER_WRITE_SECONDS, in any worker. True when
+    Redis can't be asked: the primary is always up to date, the replica might not be.
+    """
+    if _wrote_recently_here(user_id):
+        return True
+    redis_client = get_redis()
+    if redis_client is None:
+        return False
+    try:
+        return bool(redis_client.exists(_recent_write_key(user_id)))
+    except RedisError as e:
+        logger.warning(f"Redis error checking recent writes for user {user_id}: {e}")
+        return True
+
+async def wrote_recently_async(user_id: int) -> bool:
+    """
+    wrote_recently for async code, through the redis.asyncio client.
+    """
+    if _wrote_recently_here(user_id):
+        return True
+    redis_client = get_async_redis()
+    if redis_client is None:
+        return False
+    try:
+        return bool(await redis_client.exists(_recent_write_key(user_id)))
+    except RedisError as e:
+        logger.warning(f"Redis error checking recent writes for user {user_id}: {e}")
+        return True
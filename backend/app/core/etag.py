@@ -0,0 +1,37 @@
+# app/core/etag.py
+
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from .data_version import get_data_version_async
+
+# Weak ETags for per-user collections, derived from the user's data version (see
+# core/data_version.py) and the request URL, so an unchanged collection is answered with
+# 304 Not Modified before any rows are queried or serialized. The version is read before the
+# rows, so a write that lands in between only costs the client one extra full response.
+# The version comes from the primary's writes, so endpoints reading from a replica (which may
+# not have those writes yet) must not send one: a stale page would be answered with 304s until
+# the user's next write.
+
+async def collection_etag(request: Request, user_id: int) -> Optional[str]:
+    """
+    The ETag for this user's view of the requested collection, or None when the data version is unavailable (no Redis).
+    """
+    version = await get_data_version_async(user_id)
+    if version is None:
+        return None
+    digest = hashlib.sha1(f"{user_id}:{version}:{request.url.path}?{request.url.query}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored on both sides
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,293 @@
+# app/core/metrics.py
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as CounterDict
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+# Process-local metrics in the Prometheus text format, served at /metrics. Recording is a
+# perf_counter() and a locked dict update per request, query or Redis call, cheap enough to
+# leave on. Each worker process keeps its own numbers; Prometheus scrapes and sums them.
+# Routes are labelled with their template (/v1/transactions/{transaction_id}/), never the
+# raw path, so the number of series stays bounded.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"  # 404s, so arbitrary paths don't each get a series
+BACKGROUND_ROUTE = "background"  # Queries made outside a request (startup, the blocklist janitor)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in values]
+
+
+class Gauge(_Metric):
+    """
+    Either set directly, or computed at scrape time by `collect`, which returns {labels: value}.
+    """
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = (), collect: Optional[Callable[[], Dict[Labels, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._collect = collect
+
+    def add(self, amount: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        if self._collect is not None:
+            values = list(self._collect().items())
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in values]
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        self._series: Dict[Labels, list] = {}  # labels -> [per-bucket counts (last is +Inf), sum, count]
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        lines = self.header()
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+_engines: Dict[str, Engine] = {}
+
+
+def _pool_stats(read: Callable) -> Dict[Labels, float]:
+    values = {}
+    for name, engine in _engines.items():
+        try:
+            values[(name,)] = read(engine.pool)
+        except AttributeError:  # Pools without a fixed size (e.g. NullPool) don't track these
+            continue
+    return values
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "Requests by route template, method and status code.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route template.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.")
+DB_QUERIES = Counter("db_queries_total", "Database queries by the route that issued them.", ("route",))
+DB_QUERY_SECONDS = Counter("db_query_seconds_total", "Time spent in database queries by the route that issued them.", ("route",))
+DB_QUERY_LATENCY = Histogram("db_query_duration_seconds", "Latency of single database queries.", ("engine",))
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out of the pool.", ("engine",), collect=lambda: _pool_stats(lambda pool: pool.checkedout()))
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond pool_size (negative while the pool is filling).", ("engine",), collect=lambda: _pool_stats(lambda pool: pool.overflow()))
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size.", ("engine",), collect=lambda: _pool_stats(lambda pool: pool.size()))
+REDIS_LATENCY = Histogram("redis_command_duration_seconds", "Latency of Redis calls by command (PIPELINE for pipelines).", ("command",))
+REDIS_ERRORS = Counter("redis_errors_total", "Redis calls that raised.", ("command",))
+STARTUP_SECONDS = Gauge("startup_phase_seconds", "How long each startup phase took in this process (core/warmup.py).", ("phase",))
+RATE_LIMIT_REJECTIONS = Counter("rate_limit_rejections_total", "Requests rejected with 429 by route template.", ("route",))
+
+
+class RequestStats:
+    __slots__ = ("scope", "queries", "query_seconds", "selects", "budgeted", "warnings")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.query_seconds = 0.0
+        # Used by core/query_audit.py: SELECT counts by statement shape, whether the query
+        # budgets apply, and the budget warnings to log when the request ends
+        self.selects: CounterDict = CounterDict()
+        self.budgeted = True
+        self.warnings: List[str] = []
+
+
+# The stats of the request being handled. Set by MetricsMiddleware and shared (by reference)
+# with the threadpool threads that run sync endpoints and dependencies
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("metrics_request", default=None)
+
+# Called after every query with (stats or None outside a request, statement, parameters, seconds),
+# and with the stats at the end of every request. core/query_audit.py hooks in here, so the
+# query log and budgets share this module's middleware and engine listeners
+QueryObserver = Callable[[Optional[RequestStats], str, object, float], None]
+RequestObserver = Callable[[RequestStats], None]
+_query_observers: List[QueryObserver] = []
+_request_observers: List[RequestObserver] = []
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current_request.get()
+
+
+def add_query_observer(observer: QueryObserver) -> None:
+    _query_observers.append(observer)
+
+
+def add_request_observer(observer: RequestObserver) -> None:
+    _request_observers.append(observer)
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no per-request Request/Response objects) recording latency, status,
+    in-flight requests and the database time of each HTTP request.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        recording = settings.METRICS_ENABLED
+        if recording:
+            HTTP_IN_FLIGHT.add(1)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            if recording:
+                HTTP_IN_FLIGHT.add(-1)
+                route, method = route_template(scope), scope["method"]
+                HTTP_REQUESTS.inc((method, route, str(status)))
+                HTTP_LATENCY.observe(elapsed, (method, route))
+                if stats.queries:
+                    DB_QUERIES.inc((route,), stats.queries)
+                    DB_QUERY_SECONDS.inc((route,), stats.query_seconds)
+            for observer in _request_observers:
+                observer(stats)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Time every query on `engine` (pass async_engine.sync_engine for the async one), report its
+    pool, and pass each query to the query observers.
+    """
+    _engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_started"].pop()
+        stats = _current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+        if settings.METRICS_ENABLED:
+            DB_QUERY_LATENCY.observe(elapsed, (name,))
+            if stats is None:
+                DB_QUERIES.inc((BACKGROUND_ROUTE,))
+                DB_QUERY_SECONDS.inc((BACKGROUND_ROUTE,), elapsed)
+        for observer in _query_observers:
+            observer(stats, statement, parameters, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("metrics_query_started"):
+            connection.info["metrics_query_started"].pop()
+
+
+def record_redis_call(command: str, seconds: float, failed: bool = False) -> None:
+    REDIS_LATENCY.observe(seconds, (command,))
+    if failed:
+        REDIS_ERRORS.inc((command,))
+
+
+def record_rate_limit_rejection(scope) -> None:
+    RATE_LIMIT_REJECTIONS.inc((route_template(scope),))
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,98 @@
+# app/core/query_audit.py
+
+import logging
+import re
+from typing import Optional
+from .config import settings
+from .metrics import BACKGROUND_ROUTE, RequestStats, add_query_observer, add_request_observer, current_request_stats, route_template
+
+logger = logging.getLogger(__name__)
+
+# Per-request query logging on top of core/metrics.py, which owns the request stats, the
+# middleware and the engine listeners: how many queries each request ran and for how long,
+# statements slower than SLOW_QUERY_MS, and two budgets per request:
+# QUERY_MAX_PER_REQUEST queries in total, and QUERY_MAX_REPEATS runs of the same SELECT (the
+# N+1 pattern, e.g. touching Transaction.category for every row of a list). Over budget is a
+# warning, or with QUERY_STRICT an exception raised from the offending query, which fails tests.
+
+MAX_LOGGED_STATEMENT = 1000
+
+# "IN (?, ?, ?)" and "IN (%s, %s)" -> "IN (...)", so expanding IN lists of any length have one shape
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised in strict mode. An AssertionError so pytest reports it as a failure, not an error.
+    """
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def parameters_shape(parameters) -> str:
+    """
+    The types of the bound parameters, never their values (they can be passwords or personal data).
+    """
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):  # executemany
+            return f"{len(parameters)} x {parameters_shape(parameters[0])}"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def skip_query_budget() -> None:
+    """
+    Exempt the current request from the budgets, for endpoints whose query count grows with
+    their input by design (bulk import runs a few statements per batch).
+    """
+    current = current_request_stats()
+    if current is not None:
+        current.budgeted = False
+
+
+def _over_budget(current: RequestStats, message: str) -> None:
+    if settings.QUERY_STRICT:
+        raise QueryBudgetExceeded(message)
+    current.warnings.append(message)
+
+
+def _check_budgets(current: RequestStats, statement: str) -> None:
+    if settings.QUERY_MAX_PER_REQUEST and current.queries == settings.QUERY_MAX_PER_REQUEST + 1:
+        _over_budget(current, f"{route_template(current.scope)} ran more than {settings.QUERY_MAX_PER_REQUEST} queries")
+    if statement.lstrip().startswith("SELECT"):
+        shape = statement_shape(statement)
+        current.selects[shape] += 1
+        if settings.QUERY_MAX_REPEATS and current.selects[shape] == settings.QUERY_MAX_REPEATS + 1:
+            _over_budget(current, f"{route_template(current.scope)} ran the same SELECT more than {settings.QUERY_MAX_REPEATS} times, "
+                                  f"probably in a loop (N+1): {shape[:MAX_LOGGED_STATEMENT]}")
+
+
+def audit_query(current: Optional[RequestStats], statement: str, parameters, elapsed: float) -> None:
+    """
+    Log the query if it was slow and check the request's budgets (metrics has already counted it).
+    """
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        route = route_template(current.scope) if current is not None else BACKGROUND_ROUTE
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms) in {route}: {statement_shape(statement)[:MAX_LOGGED_STATEMENT]} parameters {parameters_shape(parameters)}")
+    if current is not None and current.budgeted:
+        _check_budgets(current, statement)
+
+
+def log_request_queries(current: RequestStats) -> None:
+    for warning in current.warnings:
+        logger.warning(warning)
+    if settings.QUERY_LOG_REQUESTS and current.queries:
+        logger.info(f"{current.scope['method']} {route_template(current.scope)}: {current.queries} queries in {current.query_seconds * 1000:.1f} ms")
+
+
+def install_query_audit() -> None:
+    """
+    Register the query log and budgets with core/metrics.py (once, from main.py).
+    """
+    add_query_observer(audit_query)
+    add_request_observer(log_request_queries)
@@ -0,0 +1,207 @@
+# app/core/rate_limit.py
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, Type, Union
+from fastapi import Request
+from jose import jwt, JWTError
+from limits.storage import Storage
+from redis import RedisError
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from .config import settings
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# The one Limiter every router decorates with. Counts live in Redis (through the shared pool in
+# core/redis.py) so limits hold across workers, but each worker counts locally and only pushes
+# its hits to Redis every RATELIMIT_SYNC_EVERY hits or RATELIMIT_SYNC_INTERVAL_SECONDS per key,
+# so most requests are decided without a Redis round-trip. slowapi calls the storage
+# synchronously from inside async endpoints, so the pushes run on a background thread and a
+# request never waits on Redis; the shared count is folded in when the push returns.
+#
+# The window is fixed rather than a token bucket: slowapi delegates to `limits`, whose strategies
+# are fixed and moving windows, and a bucket would mean a second limiter beside the
+# @limiter.limit decorators and RATE_LIMITS strings. A moving window needs every hit's timestamp
+# in Redis, which rules out batching. The price of the batching is that a worker doesn't see the
+# other workers' latest hits: a client can overshoot a limit by up to (RATELIMIT_SYNC_EVERY - 1)
+# hits per worker, plus whatever arrives while a push is in flight (one Redis round-trip). Like
+# any fixed window, a client can also spend two windows' worth of hits around a window boundary.
+
+
+class _Window:
+    __slots__ = ("expires_at", "synced", "in_flight", "pending", "synced_at")
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+        self.synced = 0  # The Redis count as of the last sync, including our own synced hits
+        self.in_flight = 0  # Our hits being pushed to Redis right now
+        self.pending = 0  # Our hits since then
+        self.synced_at = 0.0
+
+    def count(self) -> int:
+        return self.synced + self.in_flight + self.pending
+
+
+class LocalFirstRedisStorage(Storage):
+    """
+    A fixed-window `limits` storage that counts in process and syncs counts to Redis in batches.
+    Without Redis (REDIS_URL unset) or while it is unreachable, limits are enforced per process.
+    """
+
+    STORAGE_SCHEME = ["local+redis"]
+    PRUNE_INTERVAL_SECONDS = 60
+    SYNC_WORKERS = 2
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, sync_every: int = 5, sync_interval: float = 1.0, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.sync_every = int(sync_every)
+        self.sync_interval = float(sync_interval)
+        self.syncs = 0
+        self.hits = 0
+        self._windows: Dict[str, _Window] = {}
+        self._pruned_at = time.time()
+        self._sync_executor = ThreadPoolExecutor(max_workers=self.SYNC_WORKERS, thread_name_prefix="rate-limit-sync")
+
+    @property
+    def base_exceptions(self) -> Union[Type[Exception], Tuple[Type[Exception], ...]]:
+        return RedisError
+
+    def _window(self, key: str, expiry: int, now: float) -> _Window:
+        window = self._windows.get(key)
+        if window is None or window.expires_at <= now:
+            window = self._windows[key] = _Window(now + expiry)
+        return window
+
+    def _sync(self, key: str, window: _Window, delta: int, expiry: int) -> None:
+        """
+        Push `delta` hits to Redis and fold the shared count into the window. Runs on the sync
+        executor, without holding the lock during the round-trip.
+        """
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.set(key, 0, ex=expiry, nx=True)  # First hit of this window anywhere: start its clock
+            pipe.incrby(key, delta)
+            pipe.pttl(key)
+            _, count, ttl_ms = pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Redis error syncing rate limit {key}, counting locally: {e}")
+            with self.lock:
+                window.pending += window.in_flight  # Counted again with the next push
+                window.in_flight = 0
+                window.synced_at = time.time()  # Don't retry on every request while Redis is down
+            return
+        now = time.time()
+        with self.lock:
+            window.synced, window.in_flight, window.synced_at = count, 0, now
+            window.expires_at = now + (ttl_ms if ttl_ms > 0 else expiry * 1000) / 1000  # Follow the shared window
+            self.syncs += 1
+            # A burst that arrived during the round-trip is pushed right away, not on the next hit
+            delta = self._take_pending(window) if window.pending >= self.sync_every else 0
+        if delta:
+            self._sync_executor.submit(self._sync, key, window, delta, expiry)
+
+    @staticmethod
+    def _take_pending(window: _Window) -> int:
+        delta, window.in_flight, window.pending = window.pending, window.pending, 0
+        return delta
+
+    def _prune(self, now: float) -> None:
+        if now - self._pruned_at >= self.PRUNE_INTERVAL_SECONDS:
+            self._windows = {key: window for key, window in self._windows.items() if window.expires_at > now}
+            self._pruned_at = now
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        now = time.time()
+        delta = 0
+        with self.lock:
+            self._prune(now)
+            window = self._window(key, expiry, now)
+            window.pending += amount
+            self.hits += 1
+            count = window.count()
+            # The first hit of a window always syncs, so a worker picks up the shared count.
+            # One push per window at a time; hits meanwhile wait in `pending` for the next one
+            if not window.in_flight and settings.REDIS_URL and (window.pending >= self.sync_every or now - window.synced_at >= self.sync_interval):
+                delta = self._take_pending(window)
+        if delta:
+            self._sync_executor.submit(self._sync, key, window, delta, expiry)
+        return count
+
+    def get(self, key: str) -> int:
+        with self.lock:
+            window = self._windows.get(key)
+            if window is None or window.expires_at <= time.time():
+                return 0
+            return window.count()
+
+    def get_expiry(self, key: str) -> int:
+        with self.lock:
+            window = self._windows.get(key)
+            return int(window.expires_at if window is not None else time.time())
+
+    def check(self) -> bool:
+        redis_client = get_redis()
+        if redis_client is None:
+            return True
+        try:
+            return bool(redis_client.ping())
+        except RedisError:
+            return False
+
+    def reset(self) -> Optional[int]:
+        with self.lock:
+            cleared = len(self._windows)
+            self._windows = {}
+            return cleared
+
+    def clear(self, key: str) -> None:
+        with self.lock:
+            self._windows.pop(key, None)
+        redis_client = get_redis()
+        if redis_client is not None:
+            redis_client.delete(key)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "redis_syncs": self.syncs,
+                "sync_ratio": round(self.syncs / self.hits, 4) if self.hits else 0.0,
+                "tracked_keys": len(self._windows),
+            }
+
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Limit per authenticated user when RATELIMIT_PER_USER is set and the request carries a valid
+    bearer token, so users behind one NAT don't share a budget; otherwise per client address.
+    """
+    if settings.RATELIMIT_PER_USER:
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                username = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+            except JWTError:
+                username = None
+            if username:
+                return f"user:{username}"
+    return get_remote_address(request)
+
+
+limiter = Limiter(
+    key_func=rate_limit_key,
+    strategy="fixed-window",
+    storage_uri="local+redis://",
+    storage_options={
+        "sync_every": settings.RATELIMIT_SYNC_EVERY,
+        "sync_interval": settings.RATELIMIT_SYNC_INTERVAL_SECONDS,
+    },
+)
+
+
+def rate_limit_stats() -> dict:
+    return limiter.limiter.storage.stats()
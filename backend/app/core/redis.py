@@ -0,0 +1,113 @@
+# app/core/redis.py
+
+import asyncio
+import time
+from typing import Optional
+from weakref import WeakKeyDictionary
+from redis import Redis, ConnectionPool
+from redis import asyncio as aioredis
+from redis.client import Pipeline
+from .config import settings
+from .metrics import record_redis_call
+
+_pool: Optional[ConnectionPool] = None
+
+# redis.asyncio connections belong to the event loop that opened them, so each loop gets its own
+# pool (in production there is one loop per worker; TestClient starts one per request)
+_async_pools: "WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.ConnectionPool]" = WeakKeyDictionary()
+
+class _TimedPipeline(Pipeline):
+    def execute(self, raise_on_error: bool = True):
+        started, failed = time.perf_counter(), True
+        try:
+            result = super().execute(raise_on_error)
+            failed = False
+            return result
+        finally:
+            record_redis_call("PIPELINE", time.perf_counter() - started, failed)
+
+class _TimedRedis(Redis):
+    """
+    A Redis client that records each call's latency for /metrics.
+    """
+    def execute_command(self, *args, **options):
+        started, failed = time.perf_counter(), True
+        try:
+            result = super().execute_command(*args, **options)
+            failed = False
+            return result
+        finally:
+            record_redis_call(str(args[0]).upper(), time.perf_counter() - started, failed)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return _TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+def get_redis() -> Optional[Redis]:
+    """
+    Return a Redis client backed by the shared connection pool, or None when REDIS_URL is not set.
+    """
+    global _pool
+    if not settings.REDIS_URL:
+        return None
+    if _pool is None:
+        _pool = ConnectionPool.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return (_TimedRedis if settings.METRICS_ENABLED else Redis)(connection_pool=_pool)
+
+
+class _TimedAsyncPipeline(aioredis.client.Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started, failed = time.perf_counter(), True
+        try:
+            result = await super().execute(raise_on_error)
+            failed = False
+            return result
+        finally:
+            record_redis_call("PIPELINE", time.perf_counter() - started, failed)
+
+class _TimedAsyncRedis(aioredis.Redis):
+    """
+    The redis.asyncio counterpart of _TimedRedis.
+    """
+    async def execute_command(self, *args, **options):
+        started, failed = time.perf_counter(), True
+        try:
+            result = await super().execute_command(*args, **options)
+            failed = False
+            return result
+        finally:
+            record_redis_call(str(args[0]).upper(), time.perf_counter() - started, failed)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> aioredis.client.Pipeline:
+        return _TimedAsyncPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+def _new_async_pool() -> aioredis.ConnectionPool:
+    return aioredis.ConnectionPool.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+
+def get_async_redis() -> Optional[aioredis.Redis]:
+    """
+    Return a redis.asyncio client for use from `async def` code, or None when REDIS_URL is not set.
+    Must be called with an event loop running; the client is backed by that loop's pool.
+    """
+    if not settings.REDIS_URL:
+        return None
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None:
+        pool = _async_pools[loop] = _new_async_pool()
+    return (_TimedAsyncRedis if settings.METRICS_ENABLED else aioredis.Redis)(connection_pool=pool)
+
+async def close_async_redis() -> None:
+    """
+    Disconnect the running loop's async pool (called on shutdown).
+    """
+    pool = _async_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.disconnect()
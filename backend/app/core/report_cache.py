@@ -0,0 +1,94 @@
+# app/core/report_cache.py
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import date
+from typing import Callable, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from redis import RedisError
+from .config import settings
+from .data_version import get_data_version
+from .redis import get_redis
+from ..schemas.reportbycategories import MonthlySummary, TrendReport
+
+logger = logging.getLogger(__name__)
+
+# Read-through Redis cache for the reports. The month reports are all cut from the same
+# MonthlySummary, so one cached summary per (user, data version, year, month) serves every
+# month report route; trend reports are cached per (month range, grouping). A write bumps
+# the user's data version (core/data_version.py), and the old entries are simply never
+# read again and expire. Without Redis, nothing is cached.
+#
+# A report computed on the read replica may predate the latest write if the replica lags by more
+# than REPLICA_READ_AFTER_WRITE_SECONDS, yet it is cached under the current version. Such entries
+# live at most REPORT_CACHE_REPLICA_TTL_SECONDS, however long their month would otherwise be kept.
+
+Report = TypeVar("Report", bound=BaseModel)
+
+_route_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+_stats_lock = threading.Lock()
+
+def _redis_key(user_id: int, version: str, name: str) -> str:
+    return f"report:{user_id}:{version}:{name}"
+
+def _ttl_seconds(year: int, month: int) -> int:
+    # Closed months almost never change, so keep them around for longer
+    today = date.today()
+    if (year, month) < (today.year, today.month):
+        return settings.REPORT_CACHE_CLOSED_MONTH_TTL_SECONDS
+    return settings.REPORT_CACHE_OPEN_MONTH_TTL_SECONDS
+
+def _capped_ttl(ttl: int, replica: bool) -> int:
+    return min(ttl, settings.REPORT_CACHE_REPLICA_TTL_SECONDS) if replica else ttl
+
+def _count(route: str, hit: bool) -> None:
+    with _stats_lock:
+        _route_stats[route]["hits" if hit else "misses"] += 1
+
+def _read_through(route: str, user_id: int, name: str, ttl: int, schema: Type[Report], compute: Callable[[], Report]) -> Report:
+    redis_client = get_redis()
+    version = get_data_version(user_id) if redis_client is not None else None
+    if version is None:
+        _count(route, hit=False)
+        return compute()
+
+    key = _redis_key(user_id, version, name)
+    try:
+        cached = redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Redis error reading cached report {key}: {e}")
+        cached = None
+    if cached is not None:
+        _count(route, hit=True)
+        return schema.model_validate_json(cached)
+
+    _count(route, hit=False)
+    report = compute()
+    try:
+        redis_client.set(key, report.model_dump_json(), ex=ttl)
+    except RedisError as e:
+        logger.warning(f"Redis error caching report {key}: {e}")
+    return report
+
+def cached_month_summary(route: str, user_id: int, year: int, month: int, compute: Callable[[], MonthlySummary], replica: bool = False) -> MonthlySummary:
+    """
+    The month summary from the cache, or from `compute()` (then cached) on a miss. `route` labels the hit-ratio stats;
+    `replica` says `compute()` reads from the read replica.
+    """
+    ttl = _capped_ttl(_ttl_seconds(year, month), replica)
+    return _read_through(route, user_id, f"summary:{year}-{month:02d}", ttl, MonthlySummary, compute)
+
+def cached_trend_report(route: str, user_id: int, start: Tuple[int, int], end: Tuple[int, int], group: str, compute: Callable[[], TrendReport], replica: bool = False) -> TrendReport:
+    """
+    Like cached_month_summary, for a trend report from start to end; it lives as long as its last month would.
+    """
+    name = f"trends:{group}:{start[0]}-{start[1]:02d}:{end[0]}-{end[1]:02d}"
+    return _read_through(route, user_id, name, _capped_ttl(_ttl_seconds(*end), replica), TrendReport, compute)
+
+def report_cache_stats() -> dict:
+    with _stats_lock:
+        return {
+            route: {**counts, "hit_ratio": round(counts["hits"] / (counts["hits"] + counts["misses"]), 4)}
+            for route, counts in _route_stats.items()
+        }
@@ -1,7 +1,10 @@
 # app/core/security.py
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import os
+import uuid
 from typing import Any, Union, Optional
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -10,11 +13,13 @@ from fastapi.security import OAuth2PasswordBearer
 from .config import settings
 from ..crud import crud_user
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.user import User
 from ..schemas.token import TokenData
-from ..models.blocklist import BlocklistedToken
 import logging
-from ..db.session import get_db
+from ..db.session import get_async_db
+from .user_cache import get_cached_user_async, cache_user_async, invalidate_user, invalidate_user_async
+from .token_blocklist import token_id, revoke_token, revoke_token_async, is_token_revoked, is_token_revoked_async
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +27,9 @@ logger = logging.getLogger(__name__)
 
 # Configuration for password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt is deliberately slow (~250ms) and releases the GIL, so async code runs it on this
+# bounded pool instead of the event loop; a login burst then queues here, not in front of every request
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
 
 # Configuration for JWT
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")  # Adjust "tokenUrl" based on your login endpoint
@@ -54,12 +62,25 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password on the password thread pool, for use from async code.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash on the password thread pool, for use from async code.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_password_executor, get_password_hash, password)
+
 def create_access_token(username: str, access_token_expires_delta: Union[timedelta, None] = None, refresh_token_expires_delta: Union[timedelta, None] = None) -> dict:
     """
     Create JWT access and refresh tokens using the username as the subject of the tokens.
     """
-    access_token_to_encode = {"sub": username}
-    refresh_token_to_encode = {"sub": username}
+    # Every token gets its own jti so it can be revoked individually
+    access_token_to_encode = {"sub": username, "jti": uuid.uuid4().hex}
+    refresh_token_to_encode = {"sub": username, "jti": uuid.uuid4().hex}
 
     if access_token_expires_delta:
         access_expire = datetime.utcnow() + access_token_expires_delta
@@ -106,10 +127,23 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     user.last_login = datetime.utcnow()
     db.add(user)
     db.commit()
+    invalidate_user(user.username)
+    return user
+
+async def authenticate_user_async(db: AsyncSession, username: str, password: str) -> Optional[User]:
+    user = await crud_user.get_user_by_username_async(db, username)
+    if not user:
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    # Update last_login field
+    user.last_login = datetime.utcnow()
+    await db.commit()
+    await invalidate_user_async(user.username)
     return user
 
-async def get_current_active_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    from ..crud.crud_user import get_user_by_username  # Import the necessary function
+async def get_current_active_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
+    from ..crud.crud_user import get_user_by_username_async  # Import the necessary function
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -128,27 +162,44 @@ async def get_current_active_user(token: str = Depends(oauth2_scheme), db: Sessi
         logger.error(f"JWTError occurred: {e}")
         raise credentials_exception
 
-    user = get_user_by_username(db, username=username)
-    if user is None:
-        logger.error(f"User not found for username: {username}")
+    if await is_token_revoked_async(db, token_id(payload, token), datetime.utcfromtimestamp(payload["exp"])):
+        logger.error(f"Revoked token used for username: {username}")
         raise credentials_exception
 
+    # Served from the user cache when possible; the returned User is always a detached copy
+    user, generation = await get_cached_user_async(username)
+    if user is None:
+        user = await get_user_by_username_async(db, username=username)
+        if user is None:
+            logger.error(f"User not found for username: {username}")
+            raise credentials_exception
+        user = await cache_user_async(user, generation)
+
     logger.info(f"User {username} authenticated successfully")
     return user
 
 def add_token_to_blocklist(db: Session, token: str) -> bool:
     try:
-        # Decode the token to get its expiry time
+        # Decode the token to get its id and expiry time
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         expires_at = datetime.utcfromtimestamp(payload.get("exp"))
 
-        # Create a new BlocklistedToken instance
-        blocklisted_token = BlocklistedToken(token=token, expires_at=expires_at)
+        revoke_token(db, token_id(payload, token), expires_at)
 
-        # Add to the database and commit
-        db.add(blocklisted_token)
-        db.commit()
+        logger.info("Token successfully added to blocklist.")
+        return True
+    except JWTError as e:
+        logger.error(f"JWT error adding token to blocklist: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"Error adding token to blocklist: {e}")
+        return False
 
+async def add_token_to_blocklist_async(db: AsyncSession, token: str) -> bool:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        expires_at = datetime.utcfromtimestamp(payload.get("exp"))
+        await revoke_token_async(db, token_id(payload, token), expires_at)
         logger.info("Token successfully added to blocklist.")
         return True
     except JWTError as e:
@@ -171,7 +222,7 @@ def validate_refresh_token(token: str, db: Session) -> str:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token expired")
 
         # Check if the token is in the blocklist (revoked)
-        if db.query(BlocklistedToken).filter(BlocklistedToken.token == token).first():
+        if is_token_revoked(db, token_id(payload, token), datetime.utcfromtimestamp(expiration)):
             logger.error(f"Refresh token revoked for user: {username}")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token revoked")
 
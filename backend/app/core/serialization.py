@@ -0,0 +1,57 @@
+# app/core/serialization.py
+
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+# Fast path for large list responses. FastAPI's default validates each ORM object into the
+# response_model, dumps the models back to Python dicts and then json.dumps them. Here the list
+# is validated once by a cached TypeAdapter and encoded straight to JSON bytes by pydantic-core.
+# Endpoints keep their response_model for the OpenAPI schema; returning a Response skips
+# FastAPI's own pass.
+#
+# Reading attributes through SQLAlchemy's instrumentation is most of the validation cost, so a
+# loaded object is validated from its instance __dict__ when that holds every field the schema
+# needs; expired or deferred objects fall back to attribute access.
+
+@lru_cache(maxsize=None)
+def model_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+@lru_cache(maxsize=None)
+def _field_names(schema: Type[BaseModel]) -> frozenset:
+    return frozenset(schema.model_fields)
+
+def _loaded_value(item: Any, fields: frozenset) -> Any:
+    if hasattr(item, "_sa_instance_state") and fields <= item.__dict__.keys():
+        return item.__dict__
+    return item
+
+class ModelResponse(Response):
+    """
+    A JSON response for one ORM object (or dict), serialized as `schema`.
+    """
+    media_type = "application/json"
+
+    def __init__(self, schema: Type[BaseModel], content: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None):
+        self.schema = schema  # render() needs it, and Response.__init__ calls render()
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        adapter = model_adapter(self.schema)
+        return adapter.dump_json(adapter.validate_python(_loaded_value(content, _field_names(self.schema)), from_attributes=True))
+
+class ModelListResponse(ModelResponse):
+    """
+    A JSON response for a list of ORM objects (or dicts), serialized as List[schema].
+    """
+
+    def render(self, content: Any) -> bytes:
+        adapter = list_adapter(self.schema)
+        fields = _field_names(self.schema)
+        return adapter.dump_json(adapter.validate_python([_loaded_value(item, fields) for item in content], from_attributes=True))
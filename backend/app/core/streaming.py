@@ -0,0 +1,45 @@
+# app/core/streaming.py
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Sequence
+
+# Encoders for streamed exports. Each takes an async iterator of row batches (lists of
+# tuples in `columns` order) and yields one text chunk per batch, so a response never
+# holds more than one batch in memory.
+
+CSV_MEDIA_TYPE = "text/csv"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def _csv_row(row: tuple) -> tuple:
+    # true/false rather than Python's True/False, so an export can be fed back to the bulk import
+    return tuple(("true" if value else "false") if isinstance(value, bool) else value for value in row)
+
+async def csv_chunks(columns: Sequence[str], batches: AsyncIterator[Sequence[tuple]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    async for batch in batches:
+        writer.writerows(_csv_row(row) for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # header only: there were no rows
+
+async def ndjson_chunks(columns: Sequence[str], batches: AsyncIterator[Sequence[tuple]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps({column: _json_value(value) for column, value in zip(columns, row)}, separators=(",", ":")) + "\n"
+            for row in batch
+        )
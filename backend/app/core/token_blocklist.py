@@ -0,0 +1,134 @@
+# app/core/token_blocklist.py
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Optional
+from redis import RedisError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache
+from .config import settings
+from .redis import get_redis, get_async_redis
+from ..crud import crud_blocklist
+from ..db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Revoked tokens, by jti. Revocations live in Redis with a TTL equal to the token's remaining
+# lifetime, so they expire on their own; blocklisted_tokens keeps a durable copy that is only
+# read when Redis is not configured or unreachable.
+#
+# Every authenticated request asks "is this token revoked?", and the answer is almost always no.
+# Answers are cached per worker: "revoked" until the token expires (it can't be un-revoked) and
+# "not revoked" for TOKEN_REVOCATION_CACHE_SECONDS, so a logout takes up to that long to reach
+# other workers.
+_revocation_cache = TTLCache(maxsize=100_000, ttl=settings.TOKEN_REVOCATION_CACHE_SECONDS)
+
+def token_id(payload: dict, token: str) -> str:
+    """
+    The token's jti claim; tokens issued before jti was added are identified by their hash.
+    """
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+def _redis_key(jti: str) -> str:
+    return f"revoked-token:{jti}"
+
+def _remaining_seconds(expires_at: datetime) -> int:
+    return int((expires_at - datetime.utcnow()).total_seconds())
+
+def _revoke_in_redis(jti: str, expires_at: datetime) -> None:
+    ttl = _remaining_seconds(expires_at)
+    redis_client = get_redis()
+    if redis_client is None or ttl <= 0:
+        return
+    try:
+        redis_client.set(_redis_key(jti), 1, ex=ttl)
+    except RedisError as e:
+        logger.warning(f"Redis error revoking token {jti}, relying on the database copy: {e}")
+
+async def _revoke_in_redis_async(jti: str, expires_at: datetime) -> None:
+    ttl = _remaining_seconds(expires_at)
+    redis_client = get_async_redis()
+    if redis_client is None or ttl <= 0:
+        return
+    try:
+        await redis_client.set(_redis_key(jti), 1, ex=ttl)
+    except RedisError as e:
+        logger.warning(f"Redis error revoking token {jti}, relying on the database copy: {e}")
+
+def _revoked_in_redis(jti: str) -> Optional[bool]:
+    """
+    True/False from Redis, or None when Redis can't answer and the database has to.
+    """
+    redis_client = get_redis()
+    if redis_client is None:
+        return None
+    try:
+        return bool(redis_client.exists(_redis_key(jti)))
+    except RedisError as e:
+        logger.warning(f"Redis error checking token {jti}, falling back to the database: {e}")
+        return None
+
+async def _revoked_in_redis_async(jti: str) -> Optional[bool]:
+    redis_client = get_async_redis()
+    if redis_client is None:
+        return None
+    try:
+        return bool(await redis_client.exists(_redis_key(jti)))
+    except RedisError as e:
+        logger.warning(f"Redis error checking token {jti}, falling back to the database: {e}")
+        return None
+
+def _remember(jti: str, revoked: bool, expires_at: datetime) -> bool:
+    if revoked:
+        _revocation_cache.set(jti, True, ttl=max(_remaining_seconds(expires_at), 1))
+    else:
+        _revocation_cache.set(jti, False)
+    return revoked
+
+def revoke_token(db: Session, jti: str, expires_at: datetime) -> None:
+    _revoke_in_redis(jti, expires_at)
+    crud_blocklist.add_revocation(db, jti, expires_at)
+    _remember(jti, True, expires_at)
+
+async def revoke_token_async(db: AsyncSession, jti: str, expires_at: datetime) -> None:
+    await _revoke_in_redis_async(jti, expires_at)
+    await crud_blocklist.add_revocation_async(db, jti, expires_at)
+    _remember(jti, True, expires_at)
+
+def is_token_revoked(db: Session, jti: str, expires_at: datetime) -> bool:
+    cached = _revocation_cache.get(jti)
+    if cached is not None:
+        return cached
+    revoked = _revoked_in_redis(jti)
+    if revoked is None:
+        revoked = crud_blocklist.is_revoked(db, jti)
+    return _remember(jti, revoked, expires_at)
+
+async def is_token_revoked_async(db: AsyncSession, jti: str, expires_at: datetime) -> bool:
+    cached = _revocation_cache.get(jti)
+    if cached is not None:
+        return cached
+    revoked = await _revoked_in_redis_async(jti)
+    if revoked is None:
+        revoked = await crud_blocklist.is_revoked_async(db, jti)
+    return _remember(jti, revoked, expires_at)
+
+def revocation_cache_stats() -> dict:
+    return _revocation_cache.stats()
+
+async def run_blocklist_janitor(interval_seconds: int) -> None:
+    """
+    Delete expired rows from blocklisted_tokens every `interval_seconds`, until cancelled.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with AsyncSessionLocal() as db:
+                purged = await crud_blocklist.purge_expired_async(db, settings.BLOCKLIST_PURGE_BATCH_SIZE)
+            if purged:
+                logger.info(f"Purged {purged} expired blocklisted tokens")
+        except Exception as e:
+            logger.warning(f"Blocklist purge failed: {e}")
@@ -0,0 +1,157 @@
+# app/core/user_cache.py
+
+import json
+import logging
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Tuple
+from redis import RedisError
+from sqlalchemy import inspect
+from .cache import TTLCache
+from .config import settings
+from .redis import get_redis, get_async_redis
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Authenticated users by username, so get_current_active_user doesn't hit MySQL on every request.
+# Entries are plain column snapshots; every lookup builds a fresh, detached User from them.
+#
+# With USER_CACHE_USE_REDIS, Redis is the only cache and is authoritative for every worker: each
+# lookup is one MGET of the snapshot and the user's generation counter. Invalidation deletes the
+# snapshot and bumps the generation, so a snapshot loaded from MySQL before an invalidation and
+# stored after it is rejected instead of living out its TTL. Without Redis each worker caches on
+# its own and only drops its own entries: a soft-deleted, deactivated or demoted user keeps
+# authenticating on the other workers for up to USER_CACHE_LOCAL_TTL_SECONDS, kept short for that.
+_local_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS)
+_redis_hits = 0
+_redis_misses = 0
+
+_COLUMNS = {column.key: column for column in inspect(User).columns}
+_GENERATION_FIELD = "_generation"
+
+def _redis_key(username: str) -> str:
+    return f"user-cache:{username}"
+
+def _generation_key(username: str) -> str:
+    return f"user-cache-generation:{username}"
+
+def _generation_ttl() -> int:
+    # Outlives any snapshot stored before the last bump, so an expired counter can't revive one
+    return settings.USER_CACHE_TTL_SECONDS * 2
+
+def _snapshot(user: User) -> dict:
+    return {key: getattr(user, key) for key in _COLUMNS}
+
+def _to_json(snapshot: dict, generation: Optional[bytes]) -> str:
+    values = {key: value.isoformat() if isinstance(value, (date, datetime)) else value for key, value in snapshot.items()}
+    values[_GENERATION_FIELD] = generation.decode() if generation is not None else None
+    return json.dumps(values)
+
+def _from_json(raw: bytes) -> Tuple[dict, Optional[str]]:
+    snapshot = json.loads(raw)
+    generation = snapshot.pop(_GENERATION_FIELD, None)
+    for key, value in snapshot.items():
+        if value is None:
+            continue
+        python_type = _COLUMNS[key].type.python_type
+        if python_type is datetime:
+            snapshot[key] = datetime.fromisoformat(value)
+        elif python_type is date:
+            snapshot[key] = date.fromisoformat(value)
+    return snapshot, generation
+
+def _redis():
+    return get_redis() if settings.USER_CACHE_USE_REDIS else None
+
+def _async_redis():
+    return get_async_redis() if settings.USER_CACHE_USE_REDIS else None
+
+async def get_cached_user_async(username: str) -> Tuple[Optional[User], Optional[bytes]]:
+    """
+    Return a detached copy of the cached user (None on a miss), and the generation to pass to
+    cache_user_async if the caller loads the user from the database instead.
+    """
+    global _redis_hits, _redis_misses
+    redis_client = _async_redis()
+    if redis_client is None:
+        snapshot = _local_cache.get(username)
+        return (User(**snapshot) if snapshot is not None else None), None
+    try:
+        raw, generation = await redis_client.mget(_redis_key(username), _generation_key(username))
+    except RedisError as e:
+        logger.warning(f"Redis error reading cached user {username}: {e}")
+        return None, None
+    if raw is not None:
+        snapshot, cached_generation = _from_json(raw)
+        if cached_generation == (generation.decode() if generation is not None else None):
+            _redis_hits += 1
+            return User(**snapshot), generation
+    _redis_misses += 1
+    return None, generation
+
+async def cache_user_async(user: User, generation: Optional[bytes] = None) -> User:
+    """
+    Store a snapshot of `user`, loaded while the user's generation was `generation`, and return
+    a detached copy of it.
+    """
+    snapshot = _snapshot(user)
+    redis_client = _async_redis()
+    if redis_client is None:
+        _local_cache.set(user.username, snapshot)
+    else:
+        try:
+            await redis_client.set(_redis_key(user.username), _to_json(snapshot, generation), ex=settings.USER_CACHE_TTL_SECONDS)
+        except RedisError as e:
+            logger.warning(f"Redis error caching user {user.username}: {e}")
+    return User(**snapshot)
+
+def _queue_invalidation(pipe, usernames: List[str]) -> None:
+    pipe.delete(*(_redis_key(username) for username in usernames))
+    for username in usernames:
+        pipe.incr(_generation_key(username))
+        pipe.expire(_generation_key(username), _generation_ttl())
+
+def invalidate_user(username: str) -> None:
+    """
+    Drop a user from the cache. Call this after any write to their row.
+    With Redis this reaches every worker; without it, only this one (see above).
+    """
+    invalidate_users([username])
+
+def invalidate_users(usernames: Iterable[str]) -> None:
+    """
+    invalidate_user for many users, in one Redis pipeline.
+    """
+    usernames = list(usernames)
+    for username in usernames:
+        _local_cache.pop(username)
+    redis_client = _redis()
+    if redis_client is not None and usernames:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            _queue_invalidation(pipe, usernames)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Redis error invalidating {len(usernames)} cached users: {e}")
+
+async def invalidate_user_async(username: str) -> None:
+    """
+    invalidate_user for async code, through the redis.asyncio client.
+    """
+    _local_cache.pop(username)
+    redis_client = _async_redis()
+    if redis_client is not None:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            _queue_invalidation(pipe, [username])
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Redis error invalidating cached user {username}: {e}")
+
+def user_cache_stats() -> dict:
+    # The local counters only move without Redis; with it, every lookup is a Redis hit or miss
+    stats = _local_cache.stats()
+    stats["redis_hits"] = _redis_hits
+    stats["redis_misses"] = _redis_misses
+    stats["db_loads"] = stats["misses"] + _redis_misses
+    return stats
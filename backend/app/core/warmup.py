@@ -0,0 +1,106 @@
+# app/core/warmup.py
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+from jose import jwt
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from .config import settings
+from .metrics import STARTUP_SECONDS
+from .redis import get_redis
+from .security import get_password_hash_async
+from ..db.session import engine, async_engine, read_engine, async_read_engine
+
+logger = logging.getLogger(__name__)
+
+# Work done once at startup (the lifespan in main.py) instead of by the first requests after a
+# deploy: loading build info, opening pooled DB connections and a Redis connection, and loading
+# the bcrypt and JWT code paths. Each phase is timed, failures are logged rather than fatal, and
+# the whole warm-up gives up after WARMUP_TIMEOUT_SECONDS so it can't hold a rollout back.
+
+BUILD_INFO_PATH = Path(__file__).resolve().parent.parent / "build_info.json"
+
+
+def load_build_info() -> Optional[dict]:
+    try:
+        with open(BUILD_INFO_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load {BUILD_INFO_PATH}: {e}")
+        return None
+
+
+def _pool_target(pool) -> int:
+    # Pools without a fixed size (NullPool for aiosqlite) don't keep connections, so there's nothing to warm
+    return min(settings.WARMUP_DB_CONNECTIONS, pool.size()) if isinstance(pool, QueuePool) else 0
+
+
+def _warm_sync_pool(sync_engine: Engine) -> None:
+    # Held open together, so the pool ends up with that many idle connections rather than one reused
+    connections = [sync_engine.connect() for _ in range(_pool_target(sync_engine.pool))]
+    for connection in connections:
+        connection.close()
+
+
+async def _warm_async_pool(engine_: AsyncEngine) -> None:
+    connections = await asyncio.gather(*(engine_.connect().start() for _ in range(_pool_target(engine_.sync_engine.pool))))
+    await asyncio.gather(*(connection.close() for connection in connections))
+
+
+async def _warm_db() -> None:
+    engines = [(engine, async_engine)] + ([(read_engine, async_read_engine)] if read_engine is not engine else [])
+    for sync_engine, engine_ in engines:
+        await asyncio.gather(asyncio.to_thread(_warm_sync_pool, sync_engine), _warm_async_pool(engine_))
+
+
+async def _warm_redis() -> None:
+    redis_client = get_redis()
+    if redis_client is not None:
+        await asyncio.to_thread(redis_client.ping)
+
+
+async def _warm_crypto() -> None:
+    # Loads the bcrypt backend in a password-hash worker, and python-jose's signing code
+    await get_password_hash_async("warm-up")
+    token = jwt.encode({"sub": "warm-up"}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+WARMUP_PHASES: Dict[str, Callable[[], Awaitable[None]]] = {
+    "db_pool": _warm_db,
+    "redis": _warm_redis,
+    "crypto": _warm_crypto,
+}
+
+
+async def warm_up(timings: Dict[str, float]) -> None:
+    """
+    Run the warm-up phases in order, adding each one's duration (seconds) to `timings`.
+    """
+    deadline = time.perf_counter() + settings.WARMUP_TIMEOUT_SECONDS
+    for name, phase in WARMUP_PHASES.items():
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(phase(), timeout=max(deadline - started, 0))
+        except asyncio.TimeoutError:
+            logger.warning(f"Warm-up stopped at '{name}' after {settings.WARMUP_TIMEOUT_SECONDS}s (WARMUP_TIMEOUT_SECONDS)")
+            break
+        except Exception as e:
+            logger.warning(f"Warm-up phase '{name}' failed: {e}")
+        finally:
+            timings[name] = time.perf_counter() - started
+
+
+def report_startup(timings: Dict[str, float]) -> None:
+    """
+    Log how long startup took per phase, and publish it as startup_phase_seconds on /metrics.
+    """
+    for name, seconds in timings.items():
+        STARTUP_SECONDS.set(seconds, (name,))
+    phases = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items())
+    logger.info(f"Startup took {sum(timings.values()) * 1000:.0f} ms ({phases})")
@@ -1,16 +1,163 @@
 # app/crud/crud_admin.py
 
+from datetime import timedelta
+from fastapi import HTTPException
+from sqlalchemy import Row, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.user import User  # Adjust the import path as necessary
-from typing import List
-from ..schemas.user import UserPublic
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from ..schemas.user import UserPublic, UserFilters
+from ..core.pagination import decode_cursor, encode_cursor
+from ..core.user_cache import invalidate_user, invalidate_users
 
-def get_all_users(db: Session) -> List[User]:
-    return db.query(User).all()
+# Users are listed in id order and paged by keyset (id > last id of the previous page), so every
+# page costs the same however deep it is. On MySQL the secondary indexes (country, city,
+# date_joined) carry the primary key, so "country = ? AND id > ? ORDER BY id" is a range on one index.
+
+def _user_filter_predicates(filters: UserFilters) -> list:
+    predicates = []
+    if filters.role is not None:
+        predicates.append(User.role == filters.role)
+    if filters.is_active is not None:
+        predicates.append(User.is_active == filters.is_active)
+    if filters.is_deleted is not None:
+        predicates.append(User.is_deleted == filters.is_deleted)
+    if filters.joined_from is not None:
+        predicates.append(User.date_joined >= filters.joined_from)
+    if filters.joined_to is not None:
+        predicates.append(User.date_joined < filters.joined_to + timedelta(days=1))
+    if filters.country is not None:
+        predicates.append(User.country == filters.country)
+    if filters.city is not None:
+        predicates.append(User.city == filters.city)
+    return predicates
+
+def _users_query(filters: UserFilters, limit: int, cursor: Optional[str] = None):
+    query = select(User).filter(*_user_filter_predicates(filters))
+    if cursor:
+        query = query.filter(User.id > _decode_user_cursor(cursor))
+    # One extra row tells us whether there is a next page
+    return query.order_by(User.id).limit(limit + 1)
+
+def _decode_user_cursor(cursor: str) -> int:
+    (last_id,) = decode_cursor(cursor, 1)
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+def get_users(db: Session, filters: UserFilters, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[User], Optional[str]]:
+    """
+    A page of users matching `filters`, and the cursor of the next page (None on the last one).
+    """
+    users = db.scalars(_users_query(filters, limit, cursor)).all()
+    if len(users) <= limit:
+        return users, None
+    users = users[:limit]
+    return users, encode_cursor(users[-1].id)
+
+# Export: the UserPublic fields as plain columns, never whole User rows (no password hashes, no identity map)
+USER_EXPORT_COLUMNS = list(UserPublic.model_fields)
+
+def _user_export_query(filters: UserFilters):
+    return select(*(getattr(User, column) for column in USER_EXPORT_COLUMNS)).filter(*_user_filter_predicates(filters)).order_by(User.id)
+
+async def stream_users_async(db: AsyncSession, filters: UserFilters, yield_per: int = 1000) -> AsyncIterator[Sequence[tuple]]:
+    """
+    Yield the matching users (in USER_EXPORT_COLUMNS order) in batches of `yield_per` rows from a
+    server-side cursor, so memory stays flat however many users there are.
+    """
+    result = await db.stream(_user_export_query(filters).execution_options(yield_per=yield_per))
+    async for partition in result.partitions():
+        yield partition
 
 def update_user_role(db: Session, user: User, new_role: str) -> User:
     user.role = new_role
     db.add(user)
     db.commit()
     db.refresh(user)
-    return user
\ No newline at end of file
+    invalidate_user(user.username)
+    return user
+
+# Bulk operations: the same changes and guards as the single-user admin endpoints, applied per
+# chunk of ADMIN_BULK_CHUNK_SIZE users with one SELECT (the chunk's users, for the per-user
+# outcomes), one UPDATE ... WHERE username IN (...) and one COMMIT, instead of a fetch and a
+# commit per user.
+
+UPDATED, UNCHANGED, NOT_FOUND, REJECTED = "updated", "unchanged", "not_found", "rejected"
+
+class BulkUserAction(NamedTuple):
+    values: dict  # Columns to set
+    is_unchanged: Callable  # Whether a chunk row (see UserChunk) already has them
+    self_detail: str  # Why the acting superuser can't do this to themselves
+
+SOFT_DELETE = BulkUserAction({"is_deleted": True}, lambda row: False, "Superuser users cannot soft-delete themselves")
+MAKE_SUPERUSER = BulkUserAction({"is_superuser": True}, lambda row: bool(row.is_superuser), "Superuser users cannot modify their own Superuser status")
+REVOKE_SUPERUSER = BulkUserAction({"is_superuser": False}, lambda row: not row.is_superuser, "Super users cannot revoke their own superuser status")
+
+def role_action(role: str) -> BulkUserAction:
+    # `role` is one of the role enum's (lowercase) values, as stored by update_user_role
+    return BulkUserAction({"role": role}, lambda row: (row.role or "").lower() == role, "Superusers cannot modify their own role")
+
+class UserChunk(NamedTuple):
+    usernames: List[str]  # The chunk, in request (or id) order
+    rows: Dict[str, Row]  # (id, username, is_deleted, is_superuser, role) of the users found, by username
+
+def _chunk_rows_query():
+    return select(User.id, User.username, User.is_deleted, User.is_superuser, User.role)
+
+def username_chunks(db: Session, usernames: Iterable[str], chunk_size: int) -> Iterator[UserChunk]:
+    """
+    The usernames without duplicates, in order, in chunks, each with its users' rows. A chunk's
+    rows are only selected when it is reached, so they reflect the commits of earlier chunks.
+    """
+    unique = list(dict.fromkeys(usernames))
+    for start in range(0, len(unique), chunk_size):
+        chunk = unique[start:start + chunk_size]
+        rows = db.execute(_chunk_rows_query().filter(User.username.in_(chunk))).all()
+        yield UserChunk(chunk, {row.username: row for row in rows})
+
+def filtered_username_chunks(db: Session, filters: UserFilters, chunk_size: int) -> Iterator[UserChunk]:
+    """
+    Every user matching `filters`, in id order, in chunks. Keyset-paged by id, so users changed
+    by an earlier chunk are neither skipped nor seen twice.
+    """
+    last_id = 0
+    while True:
+        rows = db.execute(
+            _chunk_rows_query().filter(*_user_filter_predicates(filters), User.id > last_id).order_by(User.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        yield UserChunk([row.username for row in rows], {row.username: row for row in rows})
+        last_id = rows[-1].id
+
+def _apply_to_chunk(db: Session, action: BulkUserAction, acting_username: str, chunk: UserChunk) -> List[dict]:
+    outcomes, targets = [], []
+    for username in chunk.usernames:
+        row = chunk.rows.get(username)
+        if row is None or row.is_deleted:
+            # The single-user endpoints look users up without the soft-deleted ones, and 404
+            outcomes.append({"username": username, "status": NOT_FOUND, "detail": "User not found"})
+        elif username == acting_username:
+            outcomes.append({"username": username, "status": REJECTED, "detail": action.self_detail})
+        elif action.is_unchanged(row):
+            outcomes.append({"username": username, "status": UNCHANGED})
+        else:
+            outcomes.append({"username": username, "status": UPDATED})
+            targets.append(username)
+    if targets:
+        db.execute(update(User).where(User.username.in_(targets)).values(**action.values).execution_options(synchronize_session=False))
+        db.commit()
+        invalidate_users(targets)
+    return outcomes
+
+def bulk_update_users(db: Session, action: BulkUserAction, acting_username: str, chunks: Iterable[UserChunk]) -> dict:
+    """
+    Apply `action` to every username in `chunks` (see username_chunks and filtered_username_chunks),
+    committing per chunk. Returns the BulkUserResult fields: the number updated and an outcome per user.
+    """
+    outcomes = []
+    for chunk in chunks:
+        outcomes.extend(_apply_to_chunk(db, action, acting_username, chunk))
+    return {"updated": sum(1 for outcome in outcomes if outcome["status"] == UPDATED), "outcomes": outcomes}
@@ -0,0 +1,67 @@
+# app/crud/crud_blocklist.py
+
+from datetime import datetime
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.blocklist import BlocklistedToken
+
+# Statement builders shared by the sync and async versions below
+
+def _revoked_query(jti: str):
+    return select(BlocklistedToken.id).filter(BlocklistedToken.jti == jti).limit(1)
+
+def _expired_ids_query(now: datetime, batch_size: int):
+    return select(BlocklistedToken.id).filter(BlocklistedToken.expires_at < now).limit(batch_size)
+
+def _delete_ids(ids):
+    # Two statements rather than DELETE ... LIMIT or IN (SELECT ... LIMIT), which MySQL doesn't support
+    return delete(BlocklistedToken).filter(BlocklistedToken.id.in_(ids))
+
+def add_revocation(db: Session, jti: str, expires_at: datetime) -> None:
+    db.add(BlocklistedToken(jti=jti, expires_at=expires_at))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # Already revoked
+
+def is_revoked(db: Session, jti: str) -> bool:
+    return db.scalar(_revoked_query(jti)) is not None
+
+def purge_expired(db: Session, batch_size: int) -> int:
+    """
+    Delete expired rows `batch_size` at a time, committing each batch so locks stay short. Returns the number deleted.
+    """
+    now, purged = datetime.utcnow(), 0
+    while True:
+        ids = db.scalars(_expired_ids_query(now, batch_size)).all()
+        if ids:
+            db.execute(_delete_ids(ids))
+            db.commit()
+            purged += len(ids)
+        if len(ids) < batch_size:
+            return purged
+
+# Async versions
+
+async def add_revocation_async(db: AsyncSession, jti: str, expires_at: datetime) -> None:
+    db.add(BlocklistedToken(jti=jti, expires_at=expires_at))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+
+async def is_revoked_async(db: AsyncSession, jti: str) -> bool:
+    return (await db.scalar(_revoked_query(jti))) is not None
+
+async def purge_expired_async(db: AsyncSession, batch_size: int) -> int:
+    now, purged = datetime.utcnow(), 0
+    while True:
+        ids = (await db.scalars(_expired_ids_query(now, batch_size))).all()
+        if ids:
+            await db.execute(_delete_ids(ids))
+            await db.commit()
+            purged += len(ids)
+        if len(ids) < batch_size:
+            return purged
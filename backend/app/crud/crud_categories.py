@@ -1,52 +1,71 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.category import Category as CategoryModel
 from ..schemas.categories import CategoryCreate, CategoryUpdate
+from .crud_rollups import move_category_rollups_to_uncategorized, move_category_rollups_to_uncategorized_async
+from ..core.data_version import bump_data_version, bump_data_version_async
 from fastapi import HTTPException
 
+# Statement builders shared by the sync and async versions below
+
+def _category_by_name_query(name: str, user_id: int, exclude_id: int = None):
+    query = select(CategoryModel).filter(CategoryModel.user_id == user_id, CategoryModel.name == name)
+    if exclude_id is not None:
+        query = query.filter(CategoryModel.id != exclude_id)  # Exclude the current category from the check
+    return query
+
+def _category_query(category_id: int, user_id: int):
+    return select(CategoryModel).filter(CategoryModel.id == category_id, CategoryModel.user_id == user_id)
+
+def _user_categories_query(user_id: int):
+    return select(CategoryModel).filter(CategoryModel.user_id == user_id)
+
+def _category_exists_error(name: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"Category '{name}' already exists.")
+
 def create_category(db: Session, category_data: CategoryCreate, user_id: int):
     # Check if the category name already exists for the user
-    existing_category = db.query(CategoryModel).filter(CategoryModel.name == category_data.name, CategoryModel.user_id == user_id).first()
+    existing_category = db.scalars(_category_by_name_query(category_data.name, user_id)).first()
     if existing_category:
         # If a category with the same name exists, raise an HTTPException
-        raise HTTPException(status_code=400, detail=f"Category '{category_data.name}' already exists.")
+        raise _category_exists_error(category_data.name)
 
     # Proceed with creating the new category if the name is unique for the user
     db_category = CategoryModel(**category_data.dict(), user_id=user_id)
     db.add(db_category)
     db.commit()
+    bump_data_version(user_id)
     db.refresh(db_category)
     return db_category
 
 # Get a single category by ID
 def get_category(db: Session, category_id: int, user_id: int):
-    return db.query(CategoryModel).filter(CategoryModel.id == category_id, CategoryModel.user_id == user_id).first()
+    return db.scalars(_category_query(category_id, user_id)).first()
 
 # Get all categories for a user
 def get_user_categories(db: Session, user_id: int):
-    return db.query(CategoryModel).filter(CategoryModel.user_id == user_id).all()
+    return db.scalars(_user_categories_query(user_id)).all()
 
 # Update a category with a check to avoid updating to an existing name
 def update_category(db: Session, category_id: int, category_data: CategoryUpdate, user_id: int):
     db_category = get_category(db, category_id, user_id)
     if not db_category:
         return None  # The category does not exist
-    
+
     update_data = category_data.dict(exclude_unset=True)
 
     # If 'name' is in the update data, check if it's different and unique
     if 'name' in update_data and update_data['name'] != db_category.name:
-        existing_category = db.query(CategoryModel).filter(
-            CategoryModel.user_id == user_id,
-            CategoryModel.name == update_data['name'],
-            CategoryModel.id != category_id  # Exclude the current category from the check
-        ).first()
+        existing_category = db.scalars(_category_by_name_query(update_data['name'], user_id, exclude_id=category_id)).first()
         if existing_category:
-            raise HTTPException(status_code=400, detail=f"Category '{update_data['name']}' already exists.")
+            raise _category_exists_error(update_data['name'])
 
     # Proceed with updating if the name is unique or unchanged
     for key, value in update_data.items():
         setattr(db_category, key, value)
     db.commit()
+    bump_data_version(user_id)
     db.refresh(db_category)
     return db_category
 
@@ -55,6 +74,57 @@ def delete_category(db: Session, category_id: int, user_id: int):
     db_category = get_category(db, category_id, user_id)
     if db_category:
         db.delete(db_category)
+        move_category_rollups_to_uncategorized(db, user_id, category_id)
         db.commit()
+        bump_data_version(user_id)
+        return True
+    return False
+
+# Async versions, used by the `async def` endpoints with get_async_db
+
+async def create_category_async(db: AsyncSession, category_data: CategoryCreate, user_id: int):
+    existing_category = (await db.scalars(_category_by_name_query(category_data.name, user_id))).first()
+    if existing_category:
+        raise _category_exists_error(category_data.name)
+
+    db_category = CategoryModel(**category_data.dict(), user_id=user_id)
+    db.add(db_category)
+    await db.commit()
+    await bump_data_version_async(user_id)
+    await db.refresh(db_category)
+    return db_category
+
+async def get_category_async(db: AsyncSession, category_id: int, user_id: int):
+    return (await db.scalars(_category_query(category_id, user_id))).first()
+
+async def get_user_categories_async(db: AsyncSession, user_id: int):
+    return (await db.scalars(_user_categories_query(user_id))).all()
+
+async def update_category_async(db: AsyncSession, category_id: int, category_data: CategoryUpdate, user_id: int):
+    db_category = await get_category_async(db, category_id, user_id)
+    if not db_category:
+        return None
+
+    update_data = category_data.dict(exclude_unset=True)
+
+    if 'name' in update_data and update_data['name'] != db_category.name:
+        existing_category = (await db.scalars(_category_by_name_query(update_data['name'], user_id, exclude_id=category_id))).first()
+        if existing_category:
+            raise _category_exists_error(update_data['name'])
+
+    for key, value in update_data.items():
+        setattr(db_category, key, value)
+    await db.commit()
+    await bump_data_version_async(user_id)
+    await db.refresh(db_category)
+    return db_category
+
+async def delete_category_async(db: AsyncSession, category_id: int, user_id: int):
+    db_category = await get_category_async(db, category_id, user_id)
+    if db_category:
+        await db.delete(db_category)
+        await move_category_rollups_to_uncategorized_async(db, user_id, category_id)
+        await db.commit()
+        await bump_data_version_async(user_id)
         return True
     return False
@@ -0,0 +1,137 @@
+# app/crud/crud_reportsbycategories.py
+
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Session
+from ..models.category import Category
+from ..models.monthly_category_total import MonthlyCategoryTotal
+from .crud_rollups import UNCATEGORIZED
+from ..schemas.reportbycategories import BudgetOverview, CategoryTrend, ExpensePercentageReport, ExpenseReportByCategory, MonthlySummary, TrendPoint, TrendReport
+
+# Month reports, read from the monthly_category_totals rollup rather than raw transactions.
+# Every report comes from the same single pass: income and expenses are split with
+# conditional aggregation instead of one SUM query per Is_Income value.
+
+def _sum_where(condition, column):
+    return func.sum(case((condition, column), else_=0))
+
+def _month_rows(db: Session, user_id: int, year: int, month: int):
+    totals = MonthlyCategoryTotal
+    return db.query(
+        totals.category_id.label("id"),
+        Category.name.label("category_name"),
+        _sum_where(totals.is_income == True, totals.total_amount).label("income"),
+        _sum_where(totals.is_income == False, totals.total_amount).label("expenses"),
+        _sum_where(totals.is_income == False, totals.transaction_count).label("expense_count"),
+    ).outerjoin(Category, Category.id == totals.category_id).filter(
+        totals.user_id == user_id,
+        totals.year == year,
+        totals.month == month,
+        totals.transaction_count > 0
+    ).group_by(totals.category_id, Category.name).all()
+
+def get_month_summary(db: Session, user_id: int, year: int, month: int) -> MonthlySummary:
+    """
+    Overview, expenses per category and expense percentages for one month, from one query.
+    Totals include uncategorized transactions; the per-category lists only existing categories with expenses.
+    """
+    rows = _month_rows(db, user_id, year, month)
+    total_income = sum((Decimal(row.income or 0) for row in rows), Decimal(0))
+    total_expenses = sum((Decimal(row.expenses or 0) for row in rows), Decimal(0))
+    categories = [row for row in rows if row.category_name is not None and row.expense_count]
+
+    return MonthlySummary(
+        overview=BudgetOverview(
+            total_income=float(total_income),
+            total_expenses=float(total_expenses),
+            balance=float(total_income - total_expenses),
+        ),
+        expenses_by_category=[
+            ExpenseReportByCategory(id=row.id, category_name=row.category_name, total_amount=row.expenses)
+            for row in categories
+        ],
+        expense_percentages=[
+            ExpensePercentageReport(
+                id=row.id,
+                category_name=row.category_name,
+                percentage=(Decimal(row.expenses) / total_income * 100) if total_income else 0
+            ) for row in categories
+        ],
+    )
+
+# Multi-month trends, from one GROUP BY year, month, category over the rollup
+
+YearMonth = Tuple[int, int]
+
+def month_range(start: YearMonth, end: YearMonth) -> List[YearMonth]:
+    """
+    Every (year, month) from start to end, inclusive.
+    """
+    months, (year, month) = [], start
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def _month_label(year: int, month: int) -> str:
+    return f"{year}-{month:02d}"
+
+def _trend_rows(db: Session, user_id: int, start: YearMonth, end: YearMonth):
+    totals = MonthlyCategoryTotal
+    # (year, month) bounds spelled out column by column, so they seek on the rollup's primary key
+    after_start = or_(totals.year > start[0], and_(totals.year == start[0], totals.month >= start[1]))
+    before_end = or_(totals.year < end[0], and_(totals.year == end[0], totals.month <= end[1]))
+    return db.query(
+        totals.year,
+        totals.month,
+        totals.category_id.label("id"),
+        Category.name.label("category_name"),
+        _sum_where(totals.is_income == True, totals.total_amount).label("income"),
+        _sum_where(totals.is_income == False, totals.total_amount).label("expenses"),
+        func.sum(totals.transaction_count).label("transaction_count"),
+    ).outerjoin(Category, Category.id == totals.category_id).filter(
+        totals.user_id == user_id,
+        totals.year.between(start[0], end[0]),
+        after_start,
+        before_end,
+        totals.transaction_count > 0
+    ).group_by(totals.year, totals.month, totals.category_id, Category.name).all()
+
+def _accumulate(cells: Dict[YearMonth, list], month: YearMonth, cell: list) -> None:
+    merged = cells.setdefault(month, [Decimal(0), Decimal(0), 0])
+    for i, value in enumerate(cell):
+        merged[i] += value
+
+def _points(months: List[YearMonth], cells: Dict[YearMonth, list]) -> List[TrendPoint]:
+    # cells holds [income, expenses, transaction_count] for the months that have transactions
+    empty = [Decimal(0), Decimal(0), 0]
+    return [
+        TrendPoint(month=_month_label(*month), income=float(income), expenses=float(expenses), transaction_count=count)
+        for month in months
+        for income, expenses, count in [cells.get(month, empty)]
+    ]
+
+def get_trends(db: Session, user_id: int, start: YearMonth, end: YearMonth, by_category: bool = False) -> TrendReport:
+    """
+    Income, expenses and transaction counts per month from start to end (inclusive), zero-filled,
+    and with by_category also per category that has transactions in the range.
+    Uncategorized transactions are one series with id None, listed last.
+    """
+    months = month_range(start, end)
+    totals: Dict[YearMonth, list] = {}
+    by_id: Dict[int, Tuple[str, Dict[YearMonth, list]]] = {}
+    for row in _trend_rows(db, user_id, start, end):
+        cell = [Decimal(row.income or 0), Decimal(row.expenses or 0), int(row.transaction_count or 0)]
+        _accumulate(totals, (row.year, row.month), cell)
+        if by_category:
+            name, cells = by_id.setdefault(row.id, (row.category_name, {}))
+            _accumulate(cells, (row.year, row.month), cell)
+
+    categories = None
+    if by_category:
+        categories = [
+            CategoryTrend(id=None if category_id == UNCATEGORIZED else category_id, category_name=name, points=_points(months, cells))
+            for category_id, (name, cells) in sorted(by_id.items(), key=lambda item: (item[1][0] is None, item[1][0] or ""))
+        ]
+    return TrendReport(months=[_month_label(*month) for month in months], totals=_points(months, totals), categories=categories)
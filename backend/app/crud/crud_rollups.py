@@ -0,0 +1,159 @@
+# app/crud/crud_rollups.py
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, delete, func, extract
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.monthly_category_total import MonthlyCategoryTotal
+from ..models.transactions import Transaction
+
+# Maintenance of the monthly_category_totals rollup. Writers collect the change as
+# {bucket: (amount delta, count delta)} and apply it before committing, so the rollup
+# changes in the same DB transaction as the transactions themselves.
+
+UNCATEGORIZED = 0
+
+Bucket = Tuple[int, int, int, int, bool]  # (user_id, year, month, category_id, is_income)
+Deltas = Dict[Bucket, Tuple[Decimal, int]]
+
+_INSERT_BY_DIALECT = {"mysql": mysql.insert, "sqlite": sqlite.insert, "postgresql": postgresql.insert}
+_PRIMARY_KEY = [column.name for column in MonthlyCategoryTotal.__table__.primary_key.columns]
+
+def bucket_for(user_id: int, transaction_date: date, category_id: Optional[int], is_income: bool) -> Bucket:
+    return (user_id, transaction_date.year, transaction_date.month, category_id or UNCATEGORIZED, bool(is_income))
+
+def transaction_bucket(transaction: Transaction) -> Bucket:
+    return bucket_for(transaction.UserID, transaction.Date, transaction.CategoryID, transaction.Is_Income)
+
+def _amount(transaction: Transaction) -> Decimal:
+    return Decimal(str(transaction.Amount))
+
+def new_deltas() -> Deltas:
+    return defaultdict(lambda: (Decimal(0), 0))
+
+def add_delta(deltas: Deltas, bucket: Bucket, amount: Decimal, count: int) -> None:
+    total, transactions = deltas[bucket]
+    deltas[bucket] = (total + amount, transactions + count)
+
+def deltas_for_change(before: Optional[Transaction], after: Optional[Transaction]) -> Deltas:
+    """
+    Deltas for a transaction being created (before=None), deleted (after=None) or changed.
+    A change that moves the row to another month or category adjusts both buckets.
+    """
+    deltas = new_deltas()
+    if before is not None:
+        add_delta(deltas, transaction_bucket(before), -_amount(before), -1)
+    if after is not None:
+        add_delta(deltas, transaction_bucket(after), _amount(after), 1)
+    return {bucket: delta for bucket, delta in deltas.items() if delta != (0, 0)}
+
+class TransactionSnapshot:
+    """
+    The rollup-relevant fields of a transaction before it is modified in place.
+    """
+    def __init__(self, transaction: Transaction):
+        self.UserID = transaction.UserID
+        self.Date = transaction.Date
+        self.CategoryID = transaction.CategoryID
+        self.Is_Income = transaction.Is_Income
+        self.Amount = transaction.Amount
+
+def _dialect(db) -> str:
+    return db.get_bind().dialect.name
+
+def _upsert_statement(dialect: str, deltas: Deltas):
+    rows = [
+        dict(zip(_PRIMARY_KEY, bucket), total_amount=amount, transaction_count=count)
+        for bucket, (amount, count) in deltas.items()
+    ]
+    stmt = _INSERT_BY_DIALECT[dialect](MonthlyCategoryTotal).values(rows)
+    if dialect == "mysql":
+        return stmt.on_duplicate_key_update(
+            total_amount=MonthlyCategoryTotal.total_amount + stmt.inserted.total_amount,
+            transaction_count=MonthlyCategoryTotal.transaction_count + stmt.inserted.transaction_count,
+        )
+    return stmt.on_conflict_do_update(
+        index_elements=_PRIMARY_KEY,
+        set_={
+            "total_amount": MonthlyCategoryTotal.total_amount + stmt.excluded.total_amount,
+            "transaction_count": MonthlyCategoryTotal.transaction_count + stmt.excluded.transaction_count,
+        },
+    )
+
+def _category_rows_query(user_id: int, category_id: int):
+    return select(MonthlyCategoryTotal).filter(
+        MonthlyCategoryTotal.user_id == user_id,
+        MonthlyCategoryTotal.category_id == category_id,
+    )
+
+def _uncategorized_deltas(rows) -> Deltas:
+    deltas = new_deltas()
+    for row in rows:
+        add_delta(deltas, (row.user_id, row.year, row.month, UNCATEGORIZED, row.is_income), row.total_amount, row.transaction_count)
+    return deltas
+
+def _delete_category_rows(user_id: int, category_id: int):
+    return delete(MonthlyCategoryTotal).filter(
+        MonthlyCategoryTotal.user_id == user_id,
+        MonthlyCategoryTotal.category_id == category_id,
+    )
+
+def apply_rollup_deltas(db: Session, deltas: Deltas) -> None:
+    """
+    Add the deltas to the rollup. Does not commit.
+    """
+    if deltas:
+        db.execute(_upsert_statement(_dialect(db), deltas))
+
+def move_category_rollups_to_uncategorized(db: Session, user_id: int, category_id: int) -> None:
+    """
+    Deleting a category sets its transactions' CategoryID to NULL; move its buckets the same way. Does not commit.
+    """
+    rows = db.scalars(_category_rows_query(user_id, category_id)).all()
+    db.execute(_delete_category_rows(user_id, category_id))
+    apply_rollup_deltas(db, _uncategorized_deltas(rows))
+
+async def apply_rollup_deltas_async(db: AsyncSession, deltas: Deltas) -> None:
+    if deltas:
+        await db.execute(_upsert_statement(_dialect(db), deltas))
+
+async def move_category_rollups_to_uncategorized_async(db: AsyncSession, user_id: int, category_id: int) -> None:
+    rows = (await db.scalars(_category_rows_query(user_id, category_id))).all()
+    await db.execute(_delete_category_rows(user_id, category_id))
+    await apply_rollup_deltas_async(db, _uncategorized_deltas(rows))
+
+def aggregate_transactions_query(user_id: Optional[int] = None):
+    """
+    The rollup rows recomputed from raw transactions, in MonthlyCategoryTotal column order.
+    """
+    year = extract("year", Transaction.Date)
+    month = extract("month", Transaction.Date)
+    category_id = func.coalesce(Transaction.CategoryID, UNCATEGORIZED)
+    query = select(
+        Transaction.UserID, year, month, category_id, Transaction.Is_Income,
+        func.sum(Transaction.Amount), func.count(),
+    ).group_by(Transaction.UserID, year, month, category_id, Transaction.Is_Income)
+    if user_id is not None:
+        query = query.filter(Transaction.UserID == user_id)
+    return query
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> None:
+    """
+    Recompute the rollup from raw transactions for one user (or everyone) and commit.
+    Used for backfill and to repair drift.
+    """
+    stmt = delete(MonthlyCategoryTotal)
+    if user_id is not None:
+        stmt = stmt.filter(MonthlyCategoryTotal.user_id == user_id)
+    db.execute(stmt)
+    db.execute(
+        MonthlyCategoryTotal.__table__.insert().from_select(
+            [column.name for column in MonthlyCategoryTotal.__table__.columns],
+            aggregate_transactions_query(user_id),
+        )
+    )
+    db.commit()
@@ -1,44 +1,290 @@
 # app/crud/crud_transaction.py
 
-from sqlalchemy.orm import Session
-from ..schemas.transaction import TransactionCreate, TransactionUpdate
+import asyncio
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select, insert, and_, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from ..schemas.transaction import TransactionCreate, TransactionUpdate, TransactionFilters
 from ..models.transactions import Transaction
+from ..models.category import Category
+from ..core.pagination import encode_cursor, decode_cursor
+from ..core.data_version import bump_data_version, bump_data_version_async
+from .crud_rollups import TransactionSnapshot, deltas_for_change, apply_rollup_deltas, apply_rollup_deltas_async, new_deltas, add_delta, bucket_for
 
  # Adjust the import path as necessary
 
+# Statement builders shared by the sync and async versions below
+
+# Sort keys for the transaction list, as ?sort=<key> (ascending) or ?sort=-<key> (descending).
+# Each is paired with TransactionID as a tie-breaker and backed by an index starting with
+# UserID (see models/transactions.py), so sorted pages are read in index order.
+TRANSACTION_SORTS = {"date": "Date", "amount": "Amount"}
+DEFAULT_TRANSACTION_SORT = "-date"
+
+_CURSOR_PARSERS = {"date": date.fromisoformat, "amount": Decimal}
+
+def _sort_key(sort: str) -> Tuple[str, bool]:
+    key = sort.lstrip("-")
+    if key not in TRANSACTION_SORTS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort: {sort}")
+    return key, sort.startswith("-")
+
+def _filter_predicates(filters: TransactionFilters) -> list:
+    """
+    Plain comparisons on bare columns only (ranges, IN, equality): no functions of a column,
+    casts or leading-wildcard LIKEs, so the database can seek on the composite indexes.
+    """
+    predicates = []
+    if filters.date_from is not None:
+        predicates.append(Transaction.Date >= filters.date_from)
+    if filters.date_to is not None:
+        predicates.append(Transaction.Date <= filters.date_to)
+    if filters.category_ids:
+        predicates.append(Transaction.CategoryID.in_(filters.category_ids))
+    if filters.min_amount is not None:
+        predicates.append(Transaction.Amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        predicates.append(Transaction.Amount <= filters.max_amount)
+    if filters.is_income is not None:
+        predicates.append(Transaction.Is_Income == filters.is_income)
+    if filters.location is not None:
+        predicates.append(Transaction.Location == filters.location)
+    return predicates
+
+def _transactions_query(
+    user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, expand_category: bool = False,
+    filters: Optional[TransactionFilters] = None, sort: str = DEFAULT_TRANSACTION_SORT,
+):
+    """
+    Newest first by default, ordered on (sort column, TransactionID) so pages are stable between calls.
+    With a cursor the query seeks past the last row of the previous page instead of
+    using OFFSET, so deep pages cost the same as the first one. One extra row is
+    fetched to tell whether there is a next page.
+    With expand_category, the page's categories are loaded in one extra SELECT ... IN query.
+    """
+    key, descending = _sort_key(sort)
+    column = getattr(Transaction, TRANSACTION_SORTS[key])
+    query = select(Transaction).filter(Transaction.UserID == user_id)
+    if filters is not None:
+        query = query.filter(*_filter_predicates(filters))
+    if expand_category:
+        query = query.options(selectinload(Transaction.category))
+    if cursor:
+        last_value, last_id = _decode_transaction_cursor(cursor, key)
+        # The plain bound on the sort column is implied by the OR, but it is what lets the
+        # database seek to the cursor in the index instead of scanning up to it
+        if descending:
+            query = query.filter(column <= last_value, or_(column < last_value, and_(column == last_value, Transaction.TransactionID < last_id)))
+        else:
+            query = query.filter(column >= last_value, or_(column > last_value, and_(column == last_value, Transaction.TransactionID > last_id)))
+    elif skip:
+        query = query.offset(skip)
+    if descending:
+        return query.order_by(column.desc(), Transaction.TransactionID.desc()).limit(limit + 1)
+    return query.order_by(column, Transaction.TransactionID).limit(limit + 1)
+
+def _decode_transaction_cursor(cursor: str, key: str = "date") -> Tuple[object, int]:
+    last_value, last_id = decode_cursor(cursor, 2)
+    try:
+        return _CURSOR_PARSERS[key](last_value), int(last_id)
+    except (TypeError, ValueError, ArithmeticError):  # Decimal raises InvalidOperation, an ArithmeticError
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _page(transactions: List[Transaction], limit: int, sort: str = DEFAULT_TRANSACTION_SORT) -> Tuple[List[Transaction], Optional[str]]:
+    if len(transactions) <= limit:
+        return transactions, None
+    transactions = transactions[:limit]
+    last = transactions[-1]
+    return transactions, encode_cursor(getattr(last, TRANSACTION_SORTS[sort.lstrip("-")]), last.TransactionID)
+
+# Plain columns rather than ORM objects, so exports don't build an identity map
+EXPORT_COLUMNS = ["TransactionID", "Date", "Amount", "Is_Income", "CategoryID", "Description", "Note", "Location", "CreatedAt"]
+
+def _export_query(user_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    query = select(*(getattr(Transaction, column) for column in EXPORT_COLUMNS)).filter(Transaction.UserID == user_id)
+    if date_from is not None:
+        query = query.filter(Transaction.Date >= date_from)
+    if date_to is not None:
+        query = query.filter(Transaction.Date <= date_to)
+    return query.order_by(Transaction.Date, Transaction.TransactionID)
+
+def _transaction_query(transaction_id: int, user_id: int, expand_category: bool = False):
+    query = select(Transaction).filter(Transaction.TransactionID == transaction_id, Transaction.UserID == user_id)
+    if expand_category:
+        query = query.options(joinedload(Transaction.category))  # One row, so join rather than a second query
+    return query
+
+def _apply_update(db_transaction: Transaction, transaction_data: TransactionUpdate):
+    update_data = transaction_data.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_transaction, key, value)
+
 def create_transaction(db: Session, transaction: TransactionCreate, user_id: int):
     # Ensure transaction.dict() includes 'IsIncome'
     db_transaction = Transaction(**transaction.dict(), UserID=user_id)
     db.add(db_transaction)
+    apply_rollup_deltas(db, deltas_for_change(None, db_transaction))
     db.commit()
+    bump_data_version(user_id)
     db.refresh(db_transaction)
     return db_transaction
 
-def get_transactions(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Transaction).filter(Transaction.UserID == user_id).offset(skip).limit(limit).all()
+def get_transactions(
+    db: Session, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, expand_category: bool = False,
+    filters: Optional[TransactionFilters] = None, sort: str = DEFAULT_TRANSACTION_SORT,
+):
+    """
+    Return a page of the user's transactions and the cursor of the next page (None on the last page).
+    A cursor is only valid with the filters and sort it was issued for.
+    """
+    return _page(db.scalars(_transactions_query(user_id, skip, limit, cursor, expand_category, filters, sort)).all(), limit, sort)
 
 def update_transaction(db: Session, transaction_id: int, transaction_data: TransactionUpdate, user_id: int):  # Use TransactionUpdate for updates
-    db_transaction = db.query(Transaction).filter(Transaction.TransactionID == transaction_id, Transaction.UserID == user_id).first()
+    db_transaction = get_transaction(db, transaction_id, user_id)
     if db_transaction:
-        update_data = transaction_data.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_transaction, key, value)
+        before = TransactionSnapshot(db_transaction)
+        _apply_update(db_transaction, transaction_data)
+        apply_rollup_deltas(db, deltas_for_change(before, db_transaction))
         db.commit()
+        bump_data_version(user_id)
         db.refresh(db_transaction)
         return db_transaction
     else:
         return None
 
 def delete_transaction(db: Session, transaction_id: int, user_id: int):
-    db_transaction = db.query(Transaction).filter(Transaction.TransactionID == transaction_id, Transaction.UserID == user_id).first()
+    db_transaction = get_transaction(db, transaction_id, user_id)
     if db_transaction:
         db.delete(db_transaction)
+        apply_rollup_deltas(db, deltas_for_change(db_transaction, None))
         db.commit()
+        bump_data_version(user_id)
         return True
     else:
         return False
 
-def get_transaction(db: Session, transaction_id: int, user_id: int):
-    return db.query(Transaction).filter(Transaction.TransactionID == transaction_id, Transaction.UserID == user_id).first()
+def get_transaction(db: Session, transaction_id: int, user_id: int, expand_category: bool = False):
+    return db.scalars(_transaction_query(transaction_id, user_id, expand_category)).first()
+
+
+# Async versions, used by the `async def` endpoints with get_async_db
+
+async def create_transaction_async(db: AsyncSession, transaction: TransactionCreate, user_id: int):
+    db_transaction = Transaction(**transaction.dict(), UserID=user_id)
+    db.add(db_transaction)
+    await apply_rollup_deltas_async(db, deltas_for_change(None, db_transaction))
+    await db.commit()
+    await bump_data_version_async(user_id)
+    await db.refresh(db_transaction)
+    return db_transaction
+
+async def get_transactions_async(
+    db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, expand_category: bool = False,
+    filters: Optional[TransactionFilters] = None, sort: str = DEFAULT_TRANSACTION_SORT,
+):
+    return _page((await db.scalars(_transactions_query(user_id, skip, limit, cursor, expand_category, filters, sort))).all(), limit, sort)
+
+async def update_transaction_async(db: AsyncSession, transaction_id: int, transaction_data: TransactionUpdate, user_id: int):
+    db_transaction = await get_transaction_async(db, transaction_id, user_id)
+    if db_transaction:
+        before = TransactionSnapshot(db_transaction)
+        _apply_update(db_transaction, transaction_data)
+        await apply_rollup_deltas_async(db, deltas_for_change(before, db_transaction))
+        await db.commit()
+        await bump_data_version_async(user_id)
+        await db.refresh(db_transaction)
+        return db_transaction
+    else:
+        return None
+
+async def delete_transaction_async(db: AsyncSession, transaction_id: int, user_id: int):
+    db_transaction = await get_transaction_async(db, transaction_id, user_id)
+    if db_transaction:
+        await db.delete(db_transaction)
+        await apply_rollup_deltas_async(db, deltas_for_change(db_transaction, None))
+        await db.commit()
+        await bump_data_version_async(user_id)
+        return True
+    else:
+        return False
+
+async def get_transaction_async(db: AsyncSession, transaction_id: int, user_id: int, expand_category: bool = False):
+    return (await db.scalars(_transaction_query(transaction_id, user_id, expand_category))).first()
+
+# Bulk import
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors())
+
+async def _insert_batch_async(db: AsyncSession, user_id: int, batch: List[Tuple[int, dict]], errors: List[dict]) -> int:
+    deltas = new_deltas()
+    for _, values in batch:
+        add_delta(deltas, bucket_for(user_id, values["Date"], values["CategoryID"], values["Is_Income"]), Decimal(str(values["Amount"])), 1)
+    try:
+        # One executemany (multi-row VALUES on MySQL) plus one rollup upsert and one COMMIT per batch
+        await db.execute(insert(Transaction), [values for _, values in batch])
+        await apply_rollup_deltas_async(db, deltas)
+        await db.commit()
+        await bump_data_version_async(user_id)
+        return len(batch)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        detail = f"Database error, batch not inserted: {e.__class__.__name__}"
+        errors.extend({"row": row_number, "detail": detail} for row_number, _ in batch)
+        return 0
+
+def _read_batch(rows: Iterator[Tuple[int, object]], batch_size: int, category_ids: Set[int], user_id: int, errors: List[dict]) -> List[Tuple[int, dict]]:
+    """
+    Pull and validate rows until `batch_size` of them are valid or the rows run out.
+    Blocking (it reads the CSV upload and runs pydantic), so it is called in a worker thread.
+    """
+    batch = []
+    for row_number, raw in rows:
+        try:
+            transaction = TransactionCreate.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"row": row_number, "detail": _validation_detail(e)})
+            continue
+        if transaction.CategoryID is not None and transaction.CategoryID not in category_ids:
+            errors.append({"row": row_number, "detail": f"CategoryID: category {transaction.CategoryID} not found"})
+            continue
+        # CreatedAt is left to the database default
+        batch.append((row_number, {**transaction.dict(exclude={"CreatedAt"}), "UserID": user_id}))
+        if len(batch) >= batch_size:
+            break
+    return batch
+
+async def bulk_create_transactions_async(db: AsyncSession, user_id: int, rows: Iterable[Tuple[int, object]], batch_size: int) -> dict:
+    """
+    Validate and insert (row_number, raw_row) pairs in batches, committing per batch.
+    Invalid rows are reported with their row number and skipped; they don't fail the import.
+    Each batch is read and validated in a worker thread, so the event loop only awaits the inserts.
+    """
+    category_ids = set((await db.scalars(select(Category.id).filter(Category.user_id == user_id))).all())
+    rows = iter(rows)
+    inserted, errors = 0, []
+    while True:
+        batch = await asyncio.to_thread(_read_batch, rows, batch_size, category_ids, user_id, errors)
+        if batch:
+            inserted += await _insert_batch_async(db, user_id, batch, errors)
+        if len(batch) < batch_size:
+            break
+    errors.sort(key=lambda error: error["row"])
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
 
+# Export
 
+async def stream_transactions_async(db: AsyncSession, user_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None, yield_per: int = 1000) -> AsyncIterator[Sequence[tuple]]:
+    """
+    Yield the user's transactions (in EXPORT_COLUMNS order, oldest first) in batches of
+    `yield_per` rows from a server-side cursor, so memory stays flat however many rows there are.
+    """
+    result = await db.stream(_export_query(user_id, date_from, date_to).execution_options(yield_per=yield_per))
+    async for partition in result.partitions():
+        yield partition
@@ -1,19 +1,18 @@
 # app/crud/crud_user.py
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
-from ..core.security import get_password_hash
+from ..core.security import get_password_hash, get_password_hash_async
+from ..core.user_cache import invalidate_user, invalidate_user_async
 from datetime import datetime 
 
-def create_user(db: Session, user_in: UserCreate) -> User:
-    """
-    Create a new user in the database.
-    """
-    hashed_password = get_password_hash(user_in.password)  # Ensure you have a utility function to hash passwords
-    db_user = User(
+def _new_user(user_in: UserCreate, hashed_password: str) -> User:
+    return User(
         username=user_in.username,
         email=user_in.email,
         hashed_password=hashed_password,
@@ -31,6 +30,22 @@ def create_user(db: Session, user_in: UserCreate) -> User:
         date_joined=datetime.utcnow(),  # Set the current datetime
         # Include other fields as necessary
     )
+
+def _user_by_username_query(username: str, include_deleted: bool = False):
+    query = select(User).filter(User.username == username)
+    if not include_deleted:
+        query = query.filter(User.is_deleted == False)
+    return query
+
+def _registration_conflict_error() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username or email already registered")
+
+def create_user(db: Session, user_in: UserCreate) -> User:
+    """
+    Create a new user in the database.
+    """
+    hashed_password = get_password_hash(user_in.password)  # Ensure you have a utility function to hash passwords
+    db_user = _new_user(user_in, hashed_password)
     try:
         db.add(db_user)
         db.commit()
@@ -38,31 +53,82 @@ def create_user(db: Session, user_in: UserCreate) -> User:
         return db_user
     except IntegrityError:
         db.rollback()
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username or email already registered")
+        raise _registration_conflict_error()
 
 def get_user_by_email(db: Session, email: str) -> User:
     """
     Retrieve a user by email address.
     """
-    return db.query(User).filter(User.email == email).first()
+    return db.scalars(select(User).filter(User.email == email)).first()
 
 def get_user_by_username(db: Session, username: str, include_deleted: bool = False) -> User:
     """
     Retrieve a user by username, with an option to include or exclude soft-deleted users.
     """
-    query = db.query(User).filter(User.username == username)
-    if not include_deleted:
-        query = query.filter(User.is_deleted == False)
-    return query.first()
+    return db.scalars(_user_by_username_query(username, include_deleted)).first()
 
 def update_user_profile(db: Session, user_id: int, update_data: UserUpdate):
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = db.get(User, user_id)
     if db_user:
         update_data_dict = update_data.dict(exclude_unset=True)  # Only update fields that are provided
         for key, value in update_data_dict.items():
             setattr(db_user, key, value)
         db.commit()
         db.refresh(db_user)
+        invalidate_user(db_user.username)
         return db_user
     return None
 
+# Async versions, used by the `async def` endpoints and dependencies with get_async_db
+
+async def create_user_async(db: AsyncSession, user_in: UserCreate) -> User:
+    """
+    Create a new user in the database.
+    """
+    hashed_password = await get_password_hash_async(user_in.password)
+    db_user = _new_user(user_in, hashed_password)
+    try:
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+    except IntegrityError:
+        await db.rollback()
+        raise _registration_conflict_error()
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User:
+    """
+    Retrieve a user by email address.
+    """
+    return (await db.scalars(select(User).filter(User.email == email))).first()
+
+async def get_user_by_username_async(db: AsyncSession, username: str, include_deleted: bool = False) -> User:
+    """
+    Retrieve a user by username, with an option to include or exclude soft-deleted users.
+    """
+    return (await db.scalars(_user_by_username_query(username, include_deleted))).first()
+
+async def update_user_profile_async(db: AsyncSession, user_id: int, update_data: UserUpdate):
+    db_user = await db.get(User, user_id)
+    if db_user:
+        update_data_dict = update_data.dict(exclude_unset=True)
+        for key, value in update_data_dict.items():
+            setattr(db_user, key, value)
+        await db.commit()
+        await db.refresh(db_user)
+        await invalidate_user_async(db_user.username)
+        return db_user
+    return None
+
+async def update_user_password_async(db: AsyncSession, user_id: int, hashed_password: str) -> bool:
+    """
+    Store a new password hash for the user.
+    """
+    db_user = await db.get(User, user_id)
+    if not db_user:
+        return False
+    db_user.hashed_password = hashed_password
+    await db.commit()
+    await invalidate_user_async(db_user.username)
+    return True
+
@@ -0,0 +1,68 @@
+# app/db/replica.py
+
+import logging
+from fastapi import Depends
+from typing import Union
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from ..core.config import settings
+from ..core.data_version import wrote_recently, wrote_recently_async
+from ..core.security import get_current_active_user
+from ..models.user import User
+from .session import AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal, engine, read_engine, async_read_engine
+
+logger = logging.getLogger(__name__)
+
+# Sessions for the read-only list and report endpoints: the read replica (DATABASE_READ_URL)
+# unless the user wrote recently (core/data_version.py), in which case the primary, so users
+# always see their own writes. Writes and everything else keep using get_db/get_async_db.
+#
+# Recent writes are shared between workers through Redis. Without REDIS_URL a worker only
+# knows its own writes, so with several workers a user could read from a lagging replica
+# right after writing through another worker; reads then stay on the primary unless
+# REPLICA_WITHOUT_REDIS is set (safe with a single worker).
+
+_warned_without_redis = False
+
+def _replica_enabled() -> bool:
+    global _warned_without_redis
+    if read_engine is engine:
+        return False
+    if settings.REDIS_URL or settings.REPLICA_WITHOUT_REDIS:
+        return True
+    if not _warned_without_redis:
+        logger.warning("DATABASE_READ_URL is set but REDIS_URL is not: reading from the primary (set REPLICA_WITHOUT_REDIS to use the replica anyway)")
+        _warned_without_redis = True
+    return False
+
+def use_replica(user_id: int) -> bool:
+    return _replica_enabled() and not wrote_recently(user_id)
+
+async def use_replica_async(user_id: int) -> bool:
+    return _replica_enabled() and not await wrote_recently_async(user_id)
+
+def is_replica_session(db: Union[Session, AsyncSession]) -> bool:
+    """
+    Whether `db`, sync or async, reads from the replica, which can lag behind the primary.
+    """
+    # An AsyncSession's bind is the sync Engine wrapped by its AsyncEngine
+    return read_engine is not engine and db.get_bind() in (read_engine, async_read_engine.sync_engine)
+
+def read_session_factory(user_id: int) -> sessionmaker:
+    return ReadSessionLocal if use_replica(user_id) else SessionLocal
+
+async def async_read_session_factory(user_id: int) -> async_sessionmaker:
+    return AsyncReadSessionLocal if await use_replica_async(user_id) else AsyncSessionLocal
+
+# Dependency for getting a read-only database session
+def get_read_db(current_user: User = Depends(get_current_active_user)):
+    db = read_session_factory(current_user.id)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency for getting a read-only async database session
+async def get_async_read_db(current_user: User = Depends(get_current_active_user)):
+    async with (await async_read_session_factory(current_user.id))() as db:
+        yield db
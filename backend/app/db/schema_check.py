@@ -0,0 +1,45 @@
+# app/db/schema_check.py
+
+import logging
+from typing import List
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from .session import Base
+
+logger = logging.getLogger(__name__)
+
+def missing_indexes(bind: Engine) -> List[str]:
+    """
+    Return "table.index_name" for every index declared on the models that the database lacks.
+    An existing index counts if it starts with the declared columns, whatever it is named,
+    since databases created before migrations may use different index names.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            missing.append(f"{table.name} (table)")
+            continue
+        existing = [tuple(index["column_names"]) for index in inspector.get_indexes(table.name)]
+        existing += [tuple(constraint["column_names"]) for constraint in inspector.get_unique_constraints(table.name)]
+        existing.append(tuple(inspector.get_pk_constraint(table.name)["constrained_columns"]))
+        for index in table.indexes:
+            columns = tuple(column.name for column in index.columns)
+            if not any(candidate[:len(columns)] == columns for candidate in existing):
+                missing.append(f"{table.name}.{index.name}")
+    return sorted(missing)
+
+def check_indexes(bind: Engine, strict: bool = False) -> List[str]:
+    """
+    Log (or, with strict=True, raise on) indexes missing from the database. Run `alembic upgrade head` to add them.
+    """
+    missing = missing_indexes(bind)
+    if missing:
+        message = f"Database is missing indexes: {', '.join(missing)}. Run `alembic upgrade head`."
+        if strict:
+            raise RuntimeError(message)
+        logger.warning(message)
+    else:
+        logger.info("Schema check passed: all declared indexes exist")
+    return missing
@@ -1,18 +1,71 @@
 # app/db/session.py
 
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 from ..core.config import settings
 
 Base = declarative_base()  # Define the Base class
 
-# Create an engine instance
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+# Async drivers to use for each sync dialect when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Derive the async driver URL from a sync one, e.g. mysql+pymysql:// -> mysql+aiomysql://.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def pool_options(database_url: str) -> dict:
+    """
+    Connection pool settings from core/config.py. SQLite gets none: its default pools
+    (NullPool, or one connection per thread) don't take a size.
+    """
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+# Create an engine instance (sync, kept for scripts and the endpoints that are still sync)
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
 
 # Create a SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the `async def` endpoints so DB round-trips don't block the event loop
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL))
+
+# expire_on_commit=False: attributes can't be lazy-loaded after commit in async code
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Read replica for the read-only list and report endpoints (see db/replica.py). Without
+# DATABASE_READ_URL these are the primary's engines, so reads simply stay on the primary
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(settings.DATABASE_READ_URL, **pool_options(settings.DATABASE_READ_URL))
+    ASYNC_DATABASE_READ_URL = settings.ASYNC_DATABASE_READ_URL or get_async_database_url(settings.DATABASE_READ_URL)
+    async_read_engine = create_async_engine(ASYNC_DATABASE_READ_URL, **pool_options(ASYNC_DATABASE_READ_URL))
+else:
+    read_engine, async_read_engine = engine, async_engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
 # Dependency for getting a database session
 def get_db():
     db = SessionLocal()
@@ -20,3 +73,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency for getting an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
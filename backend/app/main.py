@@ -1,28 +1,72 @@
 # app/main.py
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from .api.v1.routes import api_router
+from .core.pagination import NEXT_CURSOR_HEADER
+from .core.config import settings
+from .db.session import engine, async_engine, read_engine, async_read_engine
+from .db.schema_check import check_indexes
+from .core.token_blocklist import run_blocklist_janitor
+from .core.warmup import load_build_info, report_startup, warm_up
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from .core.rate_limit import limiter
+from .core.redis import get_redis, close_async_redis
+from .core.metrics import MetricsMiddleware, instrument_engine, record_rate_limit_rejection, render_metrics
+from .core.query_audit import install_query_audit
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from limits.storage import RedisStorage
 from slowapi.middleware import SlowAPIMiddleware
-from redis import Redis, RedisError
-import os
-import json
+from redis import RedisError
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
 
-REDIS_URL = os.getenv("REDIS_URL")
+logger = logging.getLogger(__name__)
 
-try:
-    limiter = Limiter(key_func=get_remote_address)
-    limiter.storage = RedisStorage(REDIS_URL)
-except Exception as e:
-    print(f"Failed to initialize Redis storage for rate limiter: {e}")
 
-app = FastAPI()
+def verify_schema():
+    if not settings.SCHEMA_CHECK_ON_STARTUP:
+        return
+    try:
+        check_indexes(engine, strict=settings.SCHEMA_CHECK_STRICT)
+    except RuntimeError:
+        raise
+    except Exception as e:
+        logger.warning(f"Schema check skipped, could not inspect the database: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup is timed per phase (see core/warmup.py) so cold-start cost shows up after every rollout
+    timings = {}
+    started = time.perf_counter()
+    app.state.build_info = load_build_info()
+    timings["build_info"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.to_thread(verify_schema)
+    timings["schema_check"] = time.perf_counter() - started
+
+    if settings.WARMUP_ENABLED:
+        await warm_up(timings)
+    report_startup(timings)
+
+    janitor = None
+    if settings.BLOCKLIST_PURGE_INTERVAL_SECONDS > 0:
+        janitor = asyncio.create_task(run_blocklist_janitor(settings.BLOCKLIST_PURGE_INTERVAL_SECONDS))
+    try:
+        yield
+    finally:
+        if janitor is not None:
+            janitor.cancel()
+        await close_async_redis()
 
-# Make sure you assign the limiter instance to the app's state like this
+
+app = FastAPI(lifespan=lifespan)
+
+# The shared limiter from core/rate_limit.py, also used by every router's @limiter.limit
 app.state.limiter = limiter
 
 app.include_router(api_router, prefix="/v1")
@@ -34,18 +78,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Add a custom exception handler for rate limit exceeded
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+def rate_limit_exceeded(request: Request, exc: RateLimitExceeded):
+    record_rate_limit_rejection(request.scope)
+    return _rate_limit_exceeded_handler(request, exc)
+
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded)
 app.add_middleware(SlowAPIMiddleware)
 
+# Request and query metrics for /metrics (core/metrics.py; recorded when METRICS_ENABLED), and
+# the per-request query log and budgets (core/query_audit.py) fed by the same middleware and
+# engine listeners. Added last so it is the outermost middleware and times everything else
+install_query_audit()
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+if read_engine is not engine:
+    instrument_engine(read_engine, "read")
+    instrument_engine(async_read_engine.sync_engine, "async_read")
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 @app.get("/version")
-async def root():
-    with open('app/build_info.json') as f:
-        data = json.load(f)
-    return data
+async def version(request: Request):
+    # Loaded once by the lifespan; on first use when the app runs without it (e.g. TestClient outside a `with`)
+    state = request.app.state
+    if not hasattr(state, "build_info"):
+        state.build_info = load_build_info()
+    if state.build_info is None:
+        raise HTTPException(status_code=503, detail="Build info is not available")
+    return state.build_info
 
 @app.get("/")
 async def root():
@@ -54,10 +125,11 @@ async def root():
 
 @app.get("/test-redis")
 async def test_redis_connection():
-    redis_url = os.getenv("REDIS_URL")
+    redis_client = get_redis()
+    if redis_client is None:
+        raise HTTPException(status_code=500, detail="REDIS_URL is not set")
     try:
-        # Initialize a Redis client and attempt to set and get a value
-        redis_client = Redis.from_url(redis_url)
+        # Attempt to set and get a value through the shared connection pool
         test_key = "test_connection_key"
         test_value = "success"
         redis_client.set(test_key, test_value)
@@ -5,10 +5,11 @@ from ..db.session import Base
 class BlocklistedToken(Base):
     __tablename__ = "blocklisted_tokens"
 
+    # Durable fallback for revocations; the hot path is Redis (see core/token_blocklist.py)
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, unique=True, index=True)
+    jti = Column(String(64), unique=True, index=True, nullable=False)
     expires_at = Column(DateTime, index=True)
 
-    def __init__(self, token: str, expires_at: datetime):
-        self.token = token
-        self.expires_at = expires_at
\ No newline at end of file
+    def __init__(self, jti: str, expires_at: datetime):
+        self.jti = jti
+        self.expires_at = expires_at
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, ForeignKey, Integer, SmallInteger, DECIMAL, BIGINT, Boolean
+from ..db.session import Base
+
+class MonthlyCategoryTotal(Base):
+    """
+    Per-month totals of a user's transactions, maintained by crud_transactions in the same
+    DB transaction as each write so the reports don't re-aggregate raw transactions.
+    Rebuild with `python -m scripts.rebuild_rollups`.
+    """
+    __tablename__ = "monthly_category_totals"
+
+    user_id = Column(BIGINT, ForeignKey('users.id', ondelete="CASCADE"), primary_key=True)
+    year = Column(SmallInteger, primary_key=True, autoincrement=False)
+    month = Column(SmallInteger, primary_key=True, autoincrement=False)
+    category_id = Column(BIGINT, primary_key=True, autoincrement=False)  # 0 for uncategorized transactions
+    is_income = Column(Boolean, primary_key=True)
+    total_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
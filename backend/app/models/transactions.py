@@ -1,9 +1,18 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, Date, Text, TIMESTAMP, text, BIGINT, Boolean
+from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, Date, Text, TIMESTAMP, text, BIGINT, Boolean, Index
 from sqlalchemy.orm import relationship
 from ..db.session import Base  # Make sure this import path is correct based on your project structure
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Added by migrations 0002_transaction_indexes and 0005_transaction_filter_indexes; checked at startup by db/schema_check.py
+    __table_args__ = (
+        Index("ix_transactions_user_date", "UserID", "Date"),
+        Index("ix_transactions_user_income_date", "UserID", "Is_Income", "Date"),
+        Index("ix_transactions_category_id", "CategoryID"),
+        Index("ix_transactions_user_amount", "UserID", "Amount"),
+        Index("ix_transactions_user_category_date", "UserID", "CategoryID", "Date"),
+        Index("ix_transactions_user_location_date", "UserID", "Location", "Date"),
+    )
 
     TransactionID = Column(BIGINT, primary_key=True, autoincrement=True)
     CategoryID = Column(BIGINT, ForeignKey('categories.id',ondelete="SET NULL"), nullable=True)  # Match the case to your DB schema
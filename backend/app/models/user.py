@@ -1,6 +1,6 @@
 # app/models/user.py
 
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, Date, Enum
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, Date, Enum, BIGINT
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 from ..models.category import Category # Used by SQLAlchemy relationship, not directly accessed
@@ -9,7 +9,7 @@ from ..models.transactions import Transaction # Used by SQLAlchemy relationship,
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(BIGINT, primary_key=True, index=True, autoincrement=True)  # BIGINT to match the foreign keys referencing it
     username = Column(String(255), unique=True, index=True, nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
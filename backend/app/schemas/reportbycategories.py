@@ -1,22 +1,42 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
 
 class ExpenseReportByCategory(BaseModel):
     id: int
     category_name: str  # Optional, depending on whether you want to include the category name in the report
     total_amount: float
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ExpensePercentageReport(BaseModel):
     id: int
     category_name: str  # Optional
     percentage: float
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class BudgetOverview(BaseModel):
     total_income: float
     total_expenses: float
-    balance: float
\ No newline at end of file
+    balance: float
+
+class MonthlySummary(BaseModel):
+    overview: BudgetOverview
+    expenses_by_category: List[ExpenseReportByCategory]
+    expense_percentages: List[ExpensePercentageReport]
+
+class TrendPoint(BaseModel):
+    month: str  # YYYY-MM
+    income: float
+    expenses: float
+    transaction_count: int
+
+class CategoryTrend(BaseModel):
+    id: Optional[int] = None  # None for uncategorized transactions
+    category_name: Optional[str] = None
+    points: List[TrendPoint]  # One per month of the report, zero-filled
+
+class TrendReport(BaseModel):
+    months: List[str]  # YYYY-MM, oldest first
+    totals: List[TrendPoint]  # All categories, one per month
+    categories: Optional[List[CategoryTrend]] = None  # Only with group=category
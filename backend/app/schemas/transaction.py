@@ -1,8 +1,8 @@
 # app/schemas/transaction.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date,datetime
-from typing import Optional
+from typing import List, Optional
 
 class TransactionBase(BaseModel):
     Amount: float
@@ -33,5 +33,35 @@ class Transaction(TransactionBase):
     TransactionID: int
     UserID: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class TransactionCategory(BaseModel):
+    # The compact category embedded by ?expand=category
+    id: int
+    name: str
+    color_code: Optional[str] = None
+    icon: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class TransactionWithCategory(Transaction):
+    category: Optional[TransactionCategory] = Field(None, description="Only included with expand=category; null when uncategorized")
+
+class TransactionFilters(BaseModel):
+    # Server-side filters for GET /transactions/; every one maps to an indexed, sargable predicate
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    category_ids: Optional[List[int]] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    is_income: Optional[bool] = None
+    location: Optional[str] = None  # Exact match, so it can use the (UserID, Location, Date) index
+
+class BulkImportError(BaseModel):
+    row: int  # 1-based position in the JSON array or CSV data rows
+    detail: str
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
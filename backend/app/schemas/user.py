@@ -1,7 +1,7 @@
 # app/schemas/user.py
 
-from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator, validator
+from typing import List, Optional
 from datetime import date, datetime
 
 class UserCreate(BaseModel):
@@ -44,6 +44,43 @@ class UserPublic(BaseModel):
         orm_mode = True
         from_attributes = True
 
+ROLE_PATTERN = "^(member|moderator|administrator)$"
+
+class UserFilters(BaseModel):
+    # Server-side filters for the admin user listing and bulk operations; all exact matches or ranges on plain columns
+    role: Optional[str] = Field(None, pattern=ROLE_PATTERN)
+    is_active: Optional[bool] = None
+    is_deleted: Optional[bool] = None
+    joined_from: Optional[date] = None
+    joined_to: Optional[date] = None  # Inclusive: everyone who joined on that day
+    country: Optional[str] = None
+    city: Optional[str] = None
+
+class BulkUserSelection(BaseModel):
+    # The users a bulk admin operation applies to: listed by username, or everyone matching a filter
+    usernames: Optional[List[str]] = Field(None, min_length=1, max_length=10000)
+    filters: Optional[UserFilters] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.usernames is None) == (self.filters is None):
+            raise ValueError("Give either 'usernames' or 'filters'")
+        if self.filters is not None and not self.filters.model_dump(exclude_none=True):
+            raise ValueError("'filters' must set at least one field; an empty filter would select every user")
+        return self
+
+class BulkRoleUpdate(BulkUserSelection):
+    role: str = Field(..., pattern=ROLE_PATTERN, description="The new role for the users.")
+
+class BulkUserOutcome(BaseModel):
+    username: str
+    status: str  # updated, unchanged, not_found or rejected
+    detail: Optional[str] = None
+
+class BulkUserResult(BaseModel):
+    updated: int
+    outcomes: List[BulkUserOutcome]  # One per selected username, in the order given (id order for filters)
+
 class PasswordChange(BaseModel):
     old_password: str = Field(..., min_length=8, description="The current password of the user.")
     new_password: str = Field(..., min_length=8, description="The new password for the user.")
@@ -0,0 +1,78 @@
+# benchmarks/bench_async_db.py
+#
+# Concurrent-request throughput of an `async def` endpoint using the sync Session
+# (the old behaviour, which blocks the event loop on every round-trip) versus the
+# AsyncSession from get_async_db.
+#
+# Usage (from backend/, with DATABASE_URL pointing at a database with data):
+#   python -m benchmarks.bench_async_db --user-id 1 --requests 500 --concurrency 50
+#   python -m benchmarks.bench_async_db --user-id 1 --sleep 0.02   # MySQL: emulate a slow query
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from app.db.session import SessionLocal, AsyncSessionLocal, engine
+from app.crud.crud_transactions import get_transactions, get_transactions_async
+from app.models import user  # noqa: F401  (registers the User mapper the relationships refer to)
+
+
+def build_app(user_id: int, sleep: float) -> FastAPI:
+    bench_app = FastAPI()
+    slow_query = text("SELECT SLEEP(:s)") if sleep and engine.dialect.name == "mysql" else None
+
+    @bench_app.get("/sync")
+    async def sync_session_endpoint():
+        db = SessionLocal()
+        try:
+            if slow_query is not None:
+                db.execute(slow_query, {"s": sleep})
+            return len(get_transactions(db, user_id=user_id)[0])
+        finally:
+            db.close()
+
+    @bench_app.get("/async")
+    async def async_session_endpoint():
+        async with AsyncSessionLocal() as db:
+            if slow_query is not None:
+                await db.execute(slow_query, {"s": sleep})
+            return len((await get_transactions_async(db, user_id=user_id))[0])
+
+    return bench_app
+
+
+async def run(bench_app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await client.get(path)  # warm up the pool
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sleep", type=float, default=0.0, help="extra per-query latency in seconds (MySQL only)")
+    args = parser.parse_args()
+
+    bench_app = build_app(args.user_id, args.sleep)
+    for label, path in (("sync Session (before)", "/sync"), ("AsyncSession (after)", "/async")):
+        throughput = asyncio.run(run(bench_app, path, args.requests, args.concurrency))
+        print(f"{label:<24} {throughput:10.1f} req/s  ({args.requests} requests, concurrency {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
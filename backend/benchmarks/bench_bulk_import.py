@@ -0,0 +1,107 @@
+# benchmarks/bench_bulk_import.py
+#
+# Throughput of POST /v1/transactions/bulk for a JSON array and for an uploaded CSV,
+# at one or more batch sizes. Rows go to a dedicated bench user; --cleanup deletes them
+# (and their rollup rows) afterwards.
+#
+# Usage (from backend/, with DATABASE_URL set):
+#   python -m benchmarks.bench_bulk_import --rows 100000 --batch-sizes 500 1000 5000
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
+from sqlalchemy import delete, select
+
+from app.main import app
+from app.core.rate_limit import limiter
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.models.monthly_category_total import MonthlyCategoryTotal
+from app.models.transactions import Transaction
+from app.models.user import User
+
+BENCH_USERNAME = "bench_bulk_import"
+FIELDS = ["Amount", "Date", "Description", "Is_Income"]
+
+
+def get_bench_user_id() -> int:
+    with SessionLocal() as db:
+        user = db.scalars(select(User).filter(User.username == BENCH_USERNAME)).first()
+        if user is None:
+            user = User(username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@example.com", hashed_password="!", date_joined=datetime.utcnow())
+            db.add(user)
+            db.commit()
+        return user.id
+
+
+def cleanup(user_id: int) -> None:
+    with SessionLocal() as db:
+        db.execute(delete(Transaction).filter(Transaction.UserID == user_id))
+        db.execute(delete(MonthlyCategoryTotal).filter(MonthlyCategoryTotal.user_id == user_id))
+        db.commit()
+
+
+def make_rows(rows: int) -> list:
+    start = date(2020, 1, 1)
+    return [
+        {"Amount": round(random.uniform(1, 500), 2), "Date": (start + timedelta(days=random.randrange(1500))).isoformat(), "Description": f"bench {i}", "Is_Income": i % 10 == 0}
+        for i in range(rows)
+    ]
+
+
+def to_csv(rows: list) -> bytes:
+    out = io.StringIO()
+    out.write(",".join(FIELDS) + "\n")
+    for row in rows:
+        out.write(",".join(str(row[field]).lower() if field == "Is_Income" else str(row[field]) for field in FIELDS) + "\n")
+    return out.getvalue().encode()
+
+
+async def post(client: httpx.AsyncClient, kind: str, rows: list, batch_size: int) -> float:
+    params = {"batch_size": batch_size}
+    started = time.perf_counter()
+    if kind == "json":
+        response = await client.post("/v1/transactions/bulk", params=params, content=json.dumps(rows), headers={"Content-Type": "application/json"})
+    else:
+        response = await client.post("/v1/transactions/bulk", params=params, files={"file": ("rows.csv", to_csv(rows), "text/csv")})
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    result = response.json()
+    assert result["inserted"] == len(rows), result
+    return elapsed
+
+
+async def run(args) -> None:
+    user_id = get_bench_user_id()
+    token = create_access_token(BENCH_USERNAME)["access_token"]
+    limiter.enabled = False  # the write limit would stop repeated runs
+    rows = make_rows(args.rows)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"Authorization": f"Bearer {token}"}, timeout=None) as client:
+        print(f"{'format':>8} {'batch':>8} {'seconds':>10} {'rows/s':>12}")
+        for batch_size in args.batch_sizes:
+            for kind in ("json", "csv"):
+                elapsed = await post(client, kind, rows, batch_size)
+                print(f"{kind:>8} {batch_size:>8} {elapsed:>10.2f} {len(rows) / elapsed:>12.0f}")
+    if args.cleanup:
+        cleanup(user_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
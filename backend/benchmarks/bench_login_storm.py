@@ -0,0 +1,79 @@
+# benchmarks/bench_login_storm.py
+#
+# Latency of a cheap endpoint while a burst of logins is being checked, with bcrypt run
+# directly on the event loop (the old behaviour) versus on the password thread pool.
+# No database is needed: each "login" is one bcrypt verify of a real hash.
+#
+# Usage (from backend/):
+#   python -m benchmarks.bench_login_storm --logins 40 --pings 200
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.crud import crud_user  # noqa: F401  (crud_user and security import each other; load them in the app's order)
+from app.core.security import get_password_hash, verify_password, verify_password_async
+
+PASSWORD = "Bench-password-1!"
+
+
+def build_app() -> FastAPI:
+    bench_app = FastAPI()
+    hashed = get_password_hash(PASSWORD)
+
+    @bench_app.post("/login-blocking")
+    async def login_blocking():
+        return verify_password(PASSWORD, hashed)
+
+    @bench_app.post("/login-offloaded")
+    async def login_offloaded():
+        return await verify_password_async(PASSWORD, hashed)
+
+    @bench_app.get("/ping")
+    async def ping():
+        return "pong"
+
+    return bench_app
+
+
+async def run(bench_app: FastAPI, login_path: str, logins: int, pings: int) -> list:
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def ping_loop():
+            # Latency is measured from when each ping was due, so time spent waiting for a
+            # blocked event loop counts, as it would for a client whose request sits in the socket
+            samples = []
+            started = time.perf_counter()
+            for i in range(pings):
+                due = started + i * 0.005
+                await asyncio.sleep(max(0, due - time.perf_counter()))
+                await client.get("/ping")
+                samples.append((time.perf_counter() - due) * 1000)
+            return samples
+
+        storm = asyncio.gather(*(client.post(login_path) for _ in range(logins)))
+        samples = await ping_loop()
+        await storm
+        return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--pings", type=int, default=200)
+    args = parser.parse_args()
+
+    bench_app = build_app()
+    print(f"{'bcrypt':<24} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, path in (("on the event loop", "/login-blocking"), ("on the thread pool", "/login-offloaded")):
+        samples = sorted(asyncio.run(run(bench_app, path, args.logins, args.pings)))
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(f"{label:<24} {statistics.median(samples):>8.1f} {p99:>8.1f} {samples[-1]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
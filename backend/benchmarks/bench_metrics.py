@@ -0,0 +1,74 @@
+# benchmarks/bench_metrics.py
+#
+# Cost of recording metrics (core/metrics.py): requests per second of a trivial endpoint with
+# and without MetricsMiddleware, and the time per query of `SELECT 1` with and without the
+# engine events. Both are upper bounds, since real requests and queries do much more work.
+#
+# Usage (from backend/):
+#   python -m benchmarks.bench_metrics --requests 20000 --queries 50000
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import MetricsMiddleware, instrument_engine
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    if with_metrics:
+        bench_app.add_middleware(MetricsMiddleware)
+    return bench_app
+
+
+async def requests_per_second(bench_app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/items/0")
+        started = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/items/{i}")
+        return requests / (time.perf_counter() - started)
+
+
+def seconds_per_query(instrumented: bool, queries: int) -> float:
+    engine = create_engine("sqlite://")
+    if instrumented:
+        instrument_engine(engine, "bench")
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        conn.execute(statement)
+        started = time.perf_counter()
+        for _ in range(queries):
+            conn.execute(statement)
+        return (time.perf_counter() - started) / queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    plain = asyncio.run(requests_per_second(build_app(False), args.requests))
+    measured = asyncio.run(requests_per_second(build_app(True), args.requests))
+    print(f"requests/s without metrics: {plain:>10.0f}")
+    print(f"requests/s with metrics:    {measured:>10.0f}   (+{(1 / measured - 1 / plain) * 1e6:.1f} µs per request)")
+
+    plain = seconds_per_query(False, args.queries)
+    measured = seconds_per_query(True, args.queries)
+    print(f"µs per query without events: {plain * 1e6:>8.1f}")
+    print(f"µs per query with events:    {measured * 1e6:>8.1f}   (+{(measured - plain) * 1e6:.1f} µs per query)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_pagination.py
+#
+# OFFSET vs keyset (cursor) pagination of get_transactions at increasing page depths.
+# Seeds a dedicated user with --rows transactions the first time it runs (this takes a
+# while for a few million rows), then times the first page and deeper pages both ways.
+#
+# Usage (from backend/, with DATABASE_URL set):
+#   python -m benchmarks.bench_pagination --rows 3000000 --depths 0 10000 100000 1000000 2900000
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.db.session import SessionLocal
+from app.core.pagination import encode_cursor
+from app.crud.crud_transactions import get_transactions
+from app.models.transactions import Transaction
+from app.models.user import User
+
+BENCH_USERNAME = "bench_pagination"
+INSERT_CHUNK = 10_000
+
+
+def get_bench_user(db) -> User:
+    user = db.scalars(select(User).filter(User.username == BENCH_USERNAME)).first()
+    if user is None:
+        user = User(username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@example.com", hashed_password="!", date_joined=datetime.utcnow())
+        db.add(user)
+        db.commit()
+    return user
+
+
+def seed(db, user_id: int, rows: int) -> None:
+    existing = db.scalar(select(func.count()).select_from(Transaction).filter(Transaction.UserID == user_id))
+    start = date(2000, 1, 1)
+    for offset in range(existing, rows, INSERT_CHUNK):
+        batch = [
+            {"UserID": user_id, "Amount": round(random.uniform(1, 500), 2), "Date": start + timedelta(days=random.randrange(9000)), "Is_Income": False}
+            for _ in range(min(INSERT_CHUNK, rows - offset))
+        ]
+        db.execute(insert(Transaction), batch)
+        db.commit()
+        print(f"seeded {offset + len(batch)}/{rows}", end="\r", flush=True)
+    print()
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id = get_bench_user(db).id
+        seed(db, user_id, args.rows)
+
+        print(f"{'depth':>10} {'offset ms':>12} {'keyset ms':>12}")
+        for depth in args.depths:
+            # The cursor a client would hold after paging down to `depth` (not timed)
+            cursor = None
+            if depth:
+                last = db.execute(
+                    select(Transaction.Date, Transaction.TransactionID)
+                    .filter(Transaction.UserID == user_id)
+                    .order_by(Transaction.Date.desc(), Transaction.TransactionID.desc())
+                    .offset(depth - 1).limit(1)
+                ).first()
+                cursor = encode_cursor(last.Date, last.TransactionID)
+
+            offset_ms = timed(lambda: get_transactions(db, user_id, skip=depth, limit=args.limit), args.repeat)
+            keyset_ms = timed(lambda: get_transactions(db, user_id, limit=args.limit, cursor=cursor), args.repeat)
+            db.expunge_all()
+            print(f"{depth:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_queries.py
+#
+# Database-level timings of each crud and report query at several data sizes. For every
+# --sizes N there is one user with N generated transactions (scripts/seed_data.py; seeded
+# the first time, reused afterwards), and every query is timed against each of them, so
+# it shows which ones stay flat as a user's history grows and which grow with it.
+#
+# Usage (from backend/, with DATABASE_URL set and `alembic upgrade head` applied):
+#   python -m benchmarks.bench_queries --sizes 1000 10000 100000 1000000
+#   python -m benchmarks.bench_queries --sizes 10000 100000 --only list summary --out queries.json
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date
+from typing import Callable, Dict
+
+from sqlalchemy import func, select
+
+from scripts.seed_data import seed_user
+from app.core.pagination import encode_cursor
+from app.crud.crud_categories import get_user_categories
+from app.crud.crud_reportsbycategories import get_month_summary, get_trends
+from app.crud.crud_rollups import rebuild_rollups
+from app.crud.crud_transactions import _export_query, create_transaction, delete_transaction, get_transaction, get_transactions
+from app.db.session import SessionLocal
+from app.models.category import Category
+from app.models.transactions import Transaction
+from app.models.user import User
+from app.schemas.transaction import TransactionCreate, TransactionFilters
+
+BENCH_PREFIX = "bench_queries_"
+
+
+def get_sized_user(db, size: int) -> int:
+    username = f"{BENCH_PREFIX}{size}"
+    user_id = db.scalar(select(User.id).filter(User.username == username))
+    if user_id is None:
+        started = time.perf_counter()
+        user_id = seed_user(db, username, size, months=36, rng=random.Random(size)).id
+        print(f"seeded {username} in {time.perf_counter() - started:.1f}s")
+    return user_id
+
+
+def queries(db, user_id: int, size: int) -> Dict[str, Callable[[], object]]:
+    """
+    The operations to time for one user, keyed by name. Anything a query needs (a cursor, an id)
+    is looked up here, outside the timings.
+    """
+    today = date.today()
+    middle = db.execute(
+        select(Transaction.Date, Transaction.TransactionID).filter(Transaction.UserID == user_id)
+        .order_by(Transaction.Date.desc(), Transaction.TransactionID.desc()).offset(size // 2).limit(1)
+    ).first()
+    cursor = encode_cursor(middle.Date, middle.TransactionID)
+    category_id = db.scalar(select(Category.id).filter(Category.user_id == user_id, Category.name == "Groceries"))
+    month_filter = TransactionFilters(date_from=date(today.year, today.month, 1), category_ids=[category_id])
+    new_transaction = TransactionCreate(Amount=12.5, Date=today, Description="bench", CategoryID=category_id)
+    last_month = (today.year - 1, 12) if today.month == 1 else (today.year, today.month - 1)
+
+    def create_and_delete():
+        created = create_transaction(db, new_transaction, user_id)
+        delete_transaction(db, created.TransactionID, user_id)
+
+    def export_all():
+        return sum(1 for _ in db.execute(_export_query(user_id).execution_options(yield_per=1000)))
+
+    return {
+        "list first page": lambda: get_transactions(db, user_id, limit=100),
+        "list middle page (cursor)": lambda: get_transactions(db, user_id, limit=100, cursor=cursor),
+        "list middle page (offset)": lambda: get_transactions(db, user_id, limit=100, skip=size // 2),
+        "list filtered": lambda: get_transactions(db, user_id, limit=100, filters=month_filter),
+        "list sorted by amount": lambda: get_transactions(db, user_id, limit=100, sort="-amount"),
+        "get by id": lambda: get_transaction(db, middle.TransactionID, user_id),
+        "categories": lambda: get_user_categories(db, user_id),
+        "month summary": lambda: get_month_summary(db, user_id, *last_month),
+        "trends 12 months by category": lambda: get_trends(db, user_id, (today.year - 1, today.month), (today.year, today.month), by_category=True),
+        "create + delete": create_and_delete,
+        "export all rows": export_all,
+        "rebuild rollups": lambda: rebuild_rollups(db, user_id),
+    }
+
+
+def timed(db, fn, repeat: int) -> float:
+    fn()  # Warm up caches and the statement cache
+    samples = []
+    for _ in range(repeat):
+        db.expunge_all()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time crud and report queries at several data sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--only", nargs="+", help="Only queries whose name contains one of these")
+    parser.add_argument("--out", help="Write the medians here as JSON")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        users = {size: get_sized_user(db, size) for size in args.sizes}
+        results: Dict[str, Dict[int, float]] = {}
+        for size, user_id in users.items():
+            actual = db.scalar(select(func.count()).select_from(Transaction).filter(Transaction.UserID == user_id))
+            for name, fn in queries(db, user_id, actual).items():
+                if args.only and not any(part in name for part in args.only):
+                    continue
+                results.setdefault(name, {})[size] = round(timed(db, fn, args.repeat), 3)
+
+        print(f"{'median ms':<30}" + "".join(f"{size:>12}" for size in args.sizes))
+        for name, by_size in results.items():
+            print(f"{name:<30}" + "".join(f"{by_size[size]:>12.2f}" for size in args.sizes))
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump({"dialect": db.get_bind().dialect.name, "repeat": args.repeat, "median_ms": results}, f, indent=2)
+            print(f"wrote {args.out}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_rate_limit.py
+#
+# Per-request overhead of @limiter.limit: no limiter, slowapi's in-memory storage, the shared
+# local-first storage from core/rate_limit.py, and (with REDIS_URL set) limits' plain Redis
+# storage, which makes a round-trip on every request. The limit is set high enough never to trip.
+#
+# Usage (from backend/):
+#   REDIS_URL=redis://localhost:6379/0 python -m benchmarks.bench_rate_limit --requests 5000
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.core.config import settings
+from app.core.rate_limit import LocalFirstRedisStorage  # noqa: F401  (registers the local+redis:// scheme)
+
+LIMIT = "1000000/minute"
+
+
+def build_app(storages: dict) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/none")
+    async def no_limit(request: Request):
+        return "ok"
+
+    for name, storage_uri in storages.items():
+        limiter = Limiter(
+            key_func=get_remote_address,
+            storage_uri=storage_uri,
+            storage_options={"sync_every": settings.RATELIMIT_SYNC_EVERY, "sync_interval": settings.RATELIMIT_SYNC_INTERVAL_SECONDS} if storage_uri.startswith("local+") else {},
+        )
+
+        async def limited(request: Request):
+            return "ok"
+
+        limited.__name__ = f"limited_{name}"  # slowapi keys limits by function name
+        bench_app.get(f"/{name}")(limiter.limit(LIMIT)(limited))
+        bench_app.state.limiter = limiter
+
+    return bench_app
+
+
+async def run(bench_app: FastAPI, path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):  # warm up
+            await client.get(path)
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(path)
+            response.raise_for_status()
+        return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    storages = {"memory": "memory://", "local_first": "local+redis://"}
+    if settings.REDIS_URL:
+        storages["redis"] = settings.REDIS_URL
+
+    bench_app = build_app(storages)
+    baseline = asyncio.run(run(bench_app, "/none", args.requests))
+    print(f"{'limiter storage':<16} {'us/request':>12} {'overhead us':>12}")
+    print(f"{'(none)':<16} {baseline:>12.1f} {0:>12.1f}")
+    for name in storages:
+        per_request = asyncio.run(run(bench_app, f"/{name}", args.requests))
+        print(f"{name:<16} {per_request:>12.1f} {per_request - baseline:>12.1f}")
+    if not settings.REDIS_URL:
+        print("REDIS_URL is not set: local_first counted in process only, and the plain Redis storage was skipped")
+
+
+if __name__ == "__main__":
+    main()
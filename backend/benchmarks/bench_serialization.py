@@ -0,0 +1,77 @@
+# benchmarks/bench_serialization.py
+#
+# Serializing a 10k-row transaction list the way FastAPI does for response_model=List[Transaction]
+# (validate each ORM object, dump to Python, json.dumps) versus ModelListResponse (one TypeAdapter
+# validation, encoded to bytes by pydantic-core). Runs on in-memory ORM objects, no database needed.
+#
+# Usage (from backend/):
+#   python -m benchmarks.bench_serialization --rows 10000
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.serialization import ModelListResponse
+from app.models import user  # noqa: F401  (registers the User mapper the relationships refer to)
+from app.models.transactions import Transaction
+from app.schemas.transaction import Transaction as TransactionSchema
+
+
+def make_transactions(rows: int) -> list:
+    start, created = date(2020, 1, 1), datetime(2024, 1, 1, 12, 0)
+    return [
+        Transaction(
+            TransactionID=i, UserID=1, CategoryID=i % 20 or None, Amount=Decimal("12.34") + i,
+            Date=start + timedelta(days=i % 1500), Description=f"transaction {i}", Note=None,
+            Location="Kathmandu", CreatedAt=created, Is_Income=i % 10 == 0,
+        )
+        for i in range(rows)
+    ]
+
+
+def fastapi_default(field, transactions) -> bytes:
+    content = asyncio.run(serialize_response(field=field, response_content=transactions, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def model_list_response(transactions) -> bytes:
+    return ModelListResponse(TransactionSchema, transactions).body
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    transactions = make_transactions(args.rows)
+    field = create_response_field(name="response", type_=List[TransactionSchema])
+    import json
+    assert json.loads(fastapi_default(field, transactions)) == json.loads(model_list_response(transactions))
+
+    default_ms = timed(lambda: fastapi_default(field, transactions), args.repeat)
+    fast_ms = timed(lambda: model_list_response(transactions), args.repeat)
+    print(f"{args.rows} rows")
+    print(f"{'response_model + JSONResponse':<32} {default_ms:>8.1f} ms")
+    print(f"{'ModelListResponse':<32} {fast_ms:>8.1f} ms  ({default_ms / fast_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
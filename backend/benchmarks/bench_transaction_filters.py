@@ -0,0 +1,130 @@
+# benchmarks/bench_transaction_filters.py
+#
+# Filtered and sorted first pages of get_transactions for one user with --rows transactions.
+# Seeds a dedicated user (with categories and locations) the first time it runs, then times
+# each filter combination and prints the database's plan for it, to show it is served from
+# an index rather than a scan of the user's rows.
+#
+# Usage (from backend/, with DATABASE_URL set and `alembic upgrade head` applied):
+#   python -m benchmarks.bench_transaction_filters --rows 1000000
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from app.db.session import SessionLocal
+from app.crud.crud_transactions import _transactions_query, get_transactions
+from app.models.category import Category
+from app.models.transactions import Transaction
+from app.models.user import User
+from app.schemas.transaction import TransactionFilters
+
+BENCH_USERNAME = "bench_filters"
+INSERT_CHUNK = 10_000
+CATEGORIES = 20
+LOCATIONS = ["Kathmandu", "Pokhara", "Lalitpur", "Bhaktapur", "Biratnagar", "Online", None]
+
+
+def get_bench_user(db) -> User:
+    user = db.scalars(select(User).filter(User.username == BENCH_USERNAME)).first()
+    if user is None:
+        user = User(username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@example.com", hashed_password="!", date_joined=datetime.utcnow())
+        db.add(user)
+        db.commit()
+    return user
+
+
+def get_categories(db, user_id: int) -> list:
+    category_ids = db.scalars(select(Category.id).filter(Category.user_id == user_id).order_by(Category.id)).all()
+    if not category_ids:
+        db.add_all(Category(name=f"bench-{i}", user_id=user_id) for i in range(CATEGORIES))
+        db.commit()
+        category_ids = db.scalars(select(Category.id).filter(Category.user_id == user_id).order_by(Category.id)).all()
+    return list(category_ids)
+
+
+def seed(db, user_id: int, category_ids: list, rows: int) -> None:
+    existing = db.scalar(select(func.count()).select_from(Transaction).filter(Transaction.UserID == user_id))
+    start = date(2000, 1, 1)
+    for offset in range(existing, rows, INSERT_CHUNK):
+        batch = [
+            {
+                "UserID": user_id,
+                "Amount": round(random.uniform(1, 500), 2),
+                "Date": start + timedelta(days=random.randrange(9000)),
+                "Is_Income": random.random() < 0.2,
+                "CategoryID": random.choice(category_ids + [None]),
+                "Location": random.choice(LOCATIONS),
+            }
+            for _ in range(min(INSERT_CHUNK, rows - offset))
+        ]
+        db.execute(insert(Transaction), batch)
+        db.commit()
+        print(f"seeded {offset + len(batch)}/{rows}", end="\r", flush=True)
+    print()
+
+
+def scenarios(category_ids: list) -> dict:
+    return {
+        "no filter": (TransactionFilters(), "-date"),
+        "one month": (TransactionFilters(date_from=date(2010, 3, 1), date_to=date(2010, 3, 31)), "-date"),
+        "expenses": (TransactionFilters(is_income=False), "-date"),
+        "income in a year": (TransactionFilters(is_income=True, date_from=date(2012, 1, 1), date_to=date(2012, 12, 31)), "-date"),
+        "one category": (TransactionFilters(category_ids=category_ids[:1]), "-date"),
+        "three categories": (TransactionFilters(category_ids=category_ids[:3]), "-date"),
+        "location": (TransactionFilters(location="Pokhara"), "-date"),
+        "amount range": (TransactionFilters(min_amount=100, max_amount=101), "-date"),
+        "sort -amount": (TransactionFilters(), "-amount"),
+        "sort amount, range": (TransactionFilters(min_amount=250, max_amount=260), "amount"),
+    }
+
+
+def explain(db, query) -> str:
+    compiled = query.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN" if db.get_bind().dialect.name == "sqlite" else "EXPLAIN"
+    return " | ".join(" ".join(str(value) for value in row) for row in db.execute(text(f"{prefix} {compiled}")))
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=11)
+    parser.add_argument("--explain", action="store_true", help="Print the query plan of each scenario")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id = get_bench_user(db).id
+        category_ids = get_categories(db, user_id)
+        seed(db, user_id, category_ids, args.rows)
+
+        print(f"{'scenario':<22} {'rows':>6} {'median ms':>10}")
+        for name, (filters, sort) in scenarios(category_ids).items():
+            def page():
+                transactions, _ = get_transactions(db, user_id, limit=args.limit, filters=filters, sort=sort)
+                db.expunge_all()
+                return transactions
+            rows = len(page())  # Also warms the cache
+            print(f"{name:<22} {rows:>6} {timed(page, args.repeat):>10.2f}")
+            if args.explain:
+                print(f"    {explain(db, _transactions_query(user_id, limit=args.limit, filters=filters, sort=sort))}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Baseline: the schema as it existed before migrations were introduced
+
+Existing databases already have these tables; mark them as migrated with
+`alembic stamp 0001_baseline` instead of running this revision.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# BIGINT primary keys only auto-increment on SQLite when declared as INTEGER
+BigIntegerPK = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+
+
+def _timestamp_defaults():
+    created = sa.text("CURRENT_TIMESTAMP")
+    if op.get_context().dialect.name == "mysql":
+        return created, sa.text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+    return created, created
+
+
+def upgrade() -> None:
+    created_default, updated_default = _timestamp_defaults()
+
+    op.create_table(
+        "users",
+        sa.Column("id", BigIntegerPK, primary_key=True, autoincrement=True),
+        sa.Column("username", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("first_name", sa.String(255)),
+        sa.Column("last_name", sa.String(255)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_superuser", sa.Boolean()),
+        sa.Column("date_joined", sa.DateTime()),
+        sa.Column("last_login", sa.DateTime()),
+        sa.Column("profile_picture", sa.String(255)),
+        sa.Column("phone_number", sa.String(20)),
+        sa.Column("date_of_birth", sa.Date()),
+        sa.Column("bio", sa.Text()),
+        sa.Column("country", sa.String(100)),
+        sa.Column("city", sa.String(100)),
+        sa.Column("postal_code", sa.String(20)),
+        sa.Column("address_line", sa.String(255)),
+        sa.Column("reset_password_token", sa.String(255)),
+        sa.Column("reset_password_token_expiry", sa.DateTime()),
+        sa.Column("email_verification_token", sa.String(255)),
+        sa.Column("is_email_verified", sa.Boolean()),
+        sa.Column("is_deleted", sa.Boolean()),
+        sa.Column("role", sa.Enum("member", "moderator", "administrator"), nullable=False, server_default="member"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    for column in ("first_name", "last_name", "date_joined", "last_login", "phone_number", "country", "city",
+                   "postal_code", "reset_password_token", "email_verification_token"):
+        op.create_index(f"ix_users_{column}", "users", [column])
+
+    op.create_table(
+        "categories",
+        sa.Column("id", BigIntegerPK, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("budgeted_amount", sa.DECIMAL(10, 2), nullable=False, server_default="0.00"),
+        sa.Column("budgeted_limit", sa.DECIMAL(10, 2), nullable=False, server_default="0.00"),
+        sa.Column("description", sa.Text()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("icon", sa.String(255)),
+        sa.Column("color_code", sa.String(7)),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=created_default),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=updated_default),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.id")),
+    )
+
+    op.create_table(
+        "transactions",
+        sa.Column("TransactionID", BigIntegerPK, primary_key=True, autoincrement=True),
+        sa.Column("CategoryID", sa.BigInteger(), sa.ForeignKey("categories.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("UserID", sa.BigInteger(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("Amount", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("Date", sa.Date(), nullable=False),
+        sa.Column("Description", sa.String(255)),
+        sa.Column("Note", sa.Text()),
+        sa.Column("Location", sa.String(255)),
+        sa.Column("CreatedAt", sa.TIMESTAMP(), server_default=created_default),
+        sa.Column("UpdatedAt", sa.TIMESTAMP(), server_default=updated_default),
+        sa.Column("Is_Income", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+    op.create_table(
+        "blocklisted_tokens",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("token", sa.String(512)),
+        sa.Column("expires_at", sa.DateTime()),
+    )
+    op.create_index("ix_blocklisted_tokens_id", "blocklisted_tokens", ["id"])
+    op.create_index("ix_blocklisted_tokens_token", "blocklisted_tokens", ["token"], unique=True)
+    op.create_index("ix_blocklisted_tokens_expires_at", "blocklisted_tokens", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("blocklisted_tokens")
+    op.drop_table("transactions")
+    op.drop_table("categories")
+    op.drop_table("users")
@@ -0,0 +1,33 @@
+"""Composite indexes for the transaction list and report queries
+
+- (UserID, Date): per-user listing ordered by date, /transactions/recent and
+  keyset pagination (InnoDB appends the primary key, so this also covers the
+  TransactionID tie-breaker).
+- (UserID, Is_Income, Date): the month reports, which filter on user, income
+  flag and a date range.
+- (CategoryID): joins and the ON DELETE SET NULL from categories.
+
+Revision ID: 0002_transaction_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+revision = '0002_transaction_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_transactions_user_date", "transactions", ["UserID", "Date"])
+    op.create_index("ix_transactions_user_income_date", "transactions", ["UserID", "Is_Income", "Date"])
+    op.create_index("ix_transactions_category_id", "transactions", ["CategoryID"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_category_id", table_name="transactions")
+    op.drop_index("ix_transactions_user_income_date", table_name="transactions")
+    op.drop_index("ix_transactions_user_date", table_name="transactions")
@@ -0,0 +1,50 @@
+"""monthly_category_totals rollup for the month reports, backfilled from transactions
+
+Revision ID: 0003_monthly_category_totals
+Revises: 0002_transaction_indexes
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003_monthly_category_totals'
+down_revision = '0002_transaction_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    totals = op.create_table(
+        "monthly_category_totals",
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("year", sa.SmallInteger(), primary_key=True, autoincrement=False),
+        sa.Column("month", sa.SmallInteger(), primary_key=True, autoincrement=False),
+        sa.Column("category_id", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("is_income", sa.Boolean(), primary_key=True),
+        sa.Column("total_amount", sa.DECIMAL(14, 2), nullable=False, server_default="0"),
+        sa.Column("transaction_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    transactions = sa.table(
+        "transactions",
+        sa.column("UserID"), sa.column("Date", sa.Date()), sa.column("CategoryID"),
+        sa.column("Is_Income"), sa.column("Amount"),
+    )
+    year = sa.extract("year", transactions.c.Date)
+    month = sa.extract("month", transactions.c.Date)
+    category_id = sa.func.coalesce(transactions.c.CategoryID, 0)
+    op.execute(
+        totals.insert().from_select(
+            ["user_id", "year", "month", "category_id", "is_income", "total_amount", "transaction_count"],
+            sa.select(
+                transactions.c.UserID, year, month, category_id, transactions.c.Is_Income,
+                sa.func.sum(transactions.c.Amount), sa.func.count(),
+            ).group_by(transactions.c.UserID, year, month, category_id, transactions.c.Is_Income),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("monthly_category_totals")
@@ -0,0 +1,52 @@
+"""Blocklist revoked tokens by jti instead of storing the whole JWT
+
+Revision ID: 0004_blocklist_jti
+Revises: 0003_monthly_category_totals
+Create Date: 2026-10-18
+
+"""
+from datetime import datetime
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004_blocklist_jti'
+down_revision = '0003_monthly_category_totals'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    blocklist = sa.table(
+        "blocklisted_tokens",
+        sa.column("id", sa.Integer()),
+        sa.column("token", sa.String(512)),
+        sa.column("jti", sa.String(64)),
+        sa.column("expires_at", sa.DateTime()),
+    )
+    op.add_column("blocklisted_tokens", sa.Column("jti", sa.String(64), nullable=True))
+
+    # Nothing ever pruned this table; expired rows can go. Tokens revoked before this
+    # migration carry no jti, so they are identified by their hash (see core/token_blocklist.py)
+    bind.execute(sa.delete(blocklist).where(sa.or_(blocklist.c.expires_at < datetime.utcnow(), blocklist.c.token.is_(None))))
+    for row_id, token in bind.execute(sa.select(blocklist.c.id, blocklist.c.token)).all():
+        bind.execute(sa.update(blocklist).where(blocklist.c.id == row_id).values(jti=hashlib.sha256(token.encode()).hexdigest()))
+
+    with op.batch_alter_table("blocklisted_tokens") as batch_op:
+        batch_op.drop_index("ix_blocklisted_tokens_token")
+        batch_op.drop_column("token")
+        batch_op.alter_column("jti", existing_type=sa.String(64), nullable=False)
+        batch_op.create_index("ix_blocklisted_tokens_jti", ["jti"], unique=True)
+
+
+def downgrade() -> None:
+    # The original tokens can't be recovered from their ids, so revocations are dropped
+    op.execute("DELETE FROM blocklisted_tokens")
+    with op.batch_alter_table("blocklisted_tokens") as batch_op:
+        batch_op.drop_index("ix_blocklisted_tokens_jti")
+        batch_op.drop_column("jti")
+        batch_op.add_column(sa.Column("token", sa.String(512)))
+        batch_op.create_index("ix_blocklisted_tokens_token", ["token"], unique=True)
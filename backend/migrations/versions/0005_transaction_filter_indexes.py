@@ -0,0 +1,32 @@
+"""Indexes for the transaction list filters and sorts
+
+- (UserID, Amount): ?sort=amount / ?sort=-amount, and amount ranges.
+- (UserID, CategoryID, Date): ?category_id=..., newest first within the categories.
+- (UserID, Location, Date): ?location=..., newest first.
+
+Date ranges and ?is_income use the indexes from 0002_transaction_indexes.
+
+Revision ID: 0005_transaction_filter_indexes
+Revises: 0004_blocklist_jti
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+revision = '0005_transaction_filter_indexes'
+down_revision = '0004_blocklist_jti'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_transactions_user_amount", "transactions", ["UserID", "Amount"])
+    op.create_index("ix_transactions_user_category_date", "transactions", ["UserID", "CategoryID", "Date"])
+    op.create_index("ix_transactions_user_location_date", "transactions", ["UserID", "Location", "Date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_user_location_date", table_name="transactions")
+    op.drop_index("ix_transactions_user_category_date", table_name="transactions")
+    op.drop_index("ix_transactions_user_amount", table_name="transactions")
@@ -0,0 +1,40 @@
+"""Widen users.id to BIGINT on databases created before migrations
+
+Those databases declared users.id as INT while categories.user_id, transactions.UserID and
+monthly_category_totals.user_id reference it as BIGINT. 0001_baseline already creates it as
+BIGINT, so on databases built by the migrations this is a no-op, and so is downgrading.
+
+SQLite is skipped: an INTEGER PRIMARY KEY is its 64-bit rowid already.
+
+Revision ID: 0006_users_id_bigint
+Revises: 0005_transaction_filter_indexes
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006_users_id_bigint'
+down_revision = '0005_transaction_filter_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        return
+    id_type = next(column["type"] for column in sa.inspect(bind).get_columns("users") if column["name"] == "id")
+    if isinstance(id_type, sa.BigInteger):
+        return
+    # MySQL refuses to change the type of a column that foreign keys reference while it checks them
+    if bind.dialect.name == "mysql":
+        op.execute("SET FOREIGN_KEY_CHECKS = 0")
+    op.alter_column("users", "id", existing_type=id_type, type_=sa.BigInteger(), existing_nullable=False, autoincrement=True)
+    if bind.dialect.name == "mysql":
+        op.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,25 @@
+# scripts/purge_blocklist.py
+#
+# Delete expired rows from blocklisted_tokens. The app already does this every
+# BLOCKLIST_PURGE_INTERVAL_SECONDS; this is for running it from cron instead (with the
+# interval set to 0) or on demand. Run from the backend directory:
+#   python -m scripts.purge_blocklist [--batch-size 5000]
+
+import argparse
+
+from app.core.config import settings
+from app.crud.crud_blocklist import purge_expired
+from app.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete expired rows from blocklisted_tokens")
+    parser.add_argument("--batch-size", type=int, default=settings.BLOCKLIST_PURGE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        print(f"Purged {purge_expired(db, args.batch_size)} expired tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# scripts/rebuild_rollups.py
+#
+# Backfill or repair the monthly_category_totals rollup from raw transactions.
+# Run from the backend directory:
+#   python -m scripts.rebuild_rollups                 # rebuild every user, one transaction per user
+#   python -m scripts.rebuild_rollups --user-id 42    # rebuild one user
+#   python -m scripts.rebuild_rollups --check         # only report users whose rollup has drifted
+
+import argparse
+
+from sqlalchemy import select
+
+from app.core.data_version import bump_data_version
+from app.db.session import SessionLocal
+from app.crud.crud_rollups import aggregate_transactions_query, rebuild_rollups
+from app.models.monthly_category_total import MonthlyCategoryTotal
+from app.models.user import User
+
+
+def rollup_rows(db, user_id: int) -> set:
+    rows = db.execute(
+        select(
+            MonthlyCategoryTotal.user_id, MonthlyCategoryTotal.year, MonthlyCategoryTotal.month,
+            MonthlyCategoryTotal.category_id, MonthlyCategoryTotal.is_income,
+            MonthlyCategoryTotal.total_amount, MonthlyCategoryTotal.transaction_count,
+        ).filter(MonthlyCategoryTotal.user_id == user_id, MonthlyCategoryTotal.transaction_count != 0)
+    )
+    return {tuple(row) for row in rows}
+
+
+def expected_rows(db, user_id: int) -> set:
+    return {
+        (row[0], int(row[1]), int(row[2]), row[3], bool(row[4]), row[5], row[6])
+        for row in db.execute(aggregate_transactions_query(user_id))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the monthly_category_totals rollup")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--check", action="store_true", help="report drift without writing")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_ids = [args.user_id] if args.user_id else db.scalars(select(User.id).order_by(User.id)).all()
+        drifted = 0
+        for user_id in user_ids:
+            if args.check:
+                if rollup_rows(db, user_id) != expected_rows(db, user_id):
+                    drifted += 1
+                    print(f"user {user_id}: rollup has drifted")
+            else:
+                rebuild_rollups(db, user_id)
+                bump_data_version(user_id)  # Drop cached reports built from the old rollup
+        print(f"{drifted} of {len(user_ids)} users drifted" if args.check else f"Rebuilt rollups for {len(user_ids)} users")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# scripts/seed_data.py
+#
+# Generate realistic volume: users, their categories and transactions spread over the last
+# --months, with lognormal amounts per category, a few large income transactions, more
+# spending at weekends, and a handful of recurring locations. Rows go in with multi-row
+# INSERTs (--batch-size per statement and commit), then each user's rollup is rebuilt once.
+# Run from the backend directory:
+#   python -m scripts.seed_data --users 10 --transactions 100000        # 100k transactions per user
+#   python -m scripts.seed_data --users 1 --transactions 3000000 --months 120
+#   python -m scripts.seed_data --users 5 --password 'Seed-Passw0rd!'   # users that can log in
+#   python -m scripts.seed_data --reset                                 # delete every seeded user
+
+import argparse
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import delete, insert, select
+
+from app.crud import crud_user  # noqa: F401  (crud_user and security import each other; load them in the app's order)
+from app.core.data_version import bump_data_version
+from app.core.security import get_password_hash
+from app.crud.crud_rollups import rebuild_rollups
+from app.db.session import SessionLocal
+from app.models.category import Category
+from app.models.monthly_category_total import MonthlyCategoryTotal
+from app.models.transactions import Transaction
+from app.models.user import User
+
+DEFAULT_PREFIX = "seed_"
+
+# name, relative frequency, median amount, lognormal sigma, descriptions
+EXPENSE_CATEGORIES = [
+    ("Groceries", 30, 38.0, 0.6, ["Supermarket", "Corner shop", "Farmers market"]),
+    ("Eating out", 20, 16.0, 0.5, ["Cafe", "Lunch", "Dinner", "Takeaway"]),
+    ("Transport", 15, 9.0, 0.7, ["Bus fare", "Taxi", "Fuel", "Parking"]),
+    ("Shopping", 10, 45.0, 0.9, ["Clothes", "Electronics", "Home goods"]),
+    ("Entertainment", 8, 22.0, 0.7, ["Cinema", "Concert", "Games"]),
+    ("Subscriptions", 6, 11.0, 0.4, ["Streaming", "Music", "Cloud storage"]),
+    ("Utilities", 4, 85.0, 0.3, ["Electricity", "Water", "Internet", "Phone"]),
+    ("Health", 4, 55.0, 0.8, ["Pharmacy", "Doctor", "Gym"]),
+    ("Travel", 2, 280.0, 0.8, ["Flight", "Hotel", "Train"]),
+    ("Rent", 1, 1200.0, 0.05, ["Rent"]),
+]
+# Income: (description, relative frequency, median amount, sigma)
+INCOME_SOURCES = [
+    ("Salary", 6, 3500.0, 0.15),
+    ("Freelance", 2, 600.0, 0.6),
+    ("Refund", 2, 40.0, 0.8),
+]
+INCOME_CATEGORY = "Income"
+LOCATIONS = ["Kathmandu", "Lalitpur", "Bhaktapur", "Pokhara", "Online", "Chitwan", "Biratnagar", "Butwal"]
+MAX_AMOUNT = 99_999_999.99  # DECIMAL(10, 2)
+
+
+class TransactionGenerator:
+    """
+    Draws transaction rows for one user. Seeded, so the same arguments give the same data.
+    """
+    def __init__(self, rng: random.Random, user_id: int, category_ids: dict, months: int, income_ratio: float):
+        self.rng = rng
+        self.user_id = user_id
+        self.income_ratio = income_ratio
+        today = date.today()
+        self.days = [today - timedelta(days=offset) for offset in range(months * 30)]
+        # Roughly 1.5x the spending on Saturdays and Sundays
+        self.day_weights = list(_cumulative(1.5 if day.weekday() >= 5 else 1.0 for day in self.days))
+        self.expenses = [(category_ids[name], median, sigma, descriptions) for name, _, median, sigma, descriptions in EXPENSE_CATEGORIES]
+        self.expense_weights = list(_cumulative(weight for _, weight, *_ in EXPENSE_CATEGORIES))
+        self.income_category_id = category_ids[INCOME_CATEGORY]
+        self.income_weights = list(_cumulative(weight for _, weight, *_ in INCOME_SOURCES))
+        # Each user frequents five places, some much more than others; about 30% of rows have none
+        self.locations = rng.sample(LOCATIONS, 5) + [None]
+        self.location_weights = list(_cumulative([8, 4, 2, 1, 1, 7]))
+
+    def rows(self, count: int) -> List[dict]:
+        rng = self.rng
+        dates = rng.choices(self.days, cum_weights=self.day_weights, k=count)
+        rows = []
+        for day in dates:
+            if rng.random() < self.income_ratio:
+                description, _, median, sigma = rng.choices(INCOME_SOURCES, cum_weights=self.income_weights)[0]
+                category_id = self.income_category_id if rng.random() < 0.8 else None
+                is_income = True
+            else:
+                category_id, median, sigma, descriptions = rng.choices(self.expenses, cum_weights=self.expense_weights)[0]
+                description = rng.choice(descriptions)
+                if rng.random() < 0.05:
+                    category_id = None  # Some spending never gets categorized
+                is_income = False
+            rows.append({
+                "UserID": self.user_id,
+                "CategoryID": category_id,
+                "Amount": round(min(rng.lognormvariate(math.log(median), sigma), MAX_AMOUNT), 2),
+                "Date": day,
+                "Description": description,
+                "Location": rng.choices(self.locations, cum_weights=self.location_weights)[0],
+                "Is_Income": is_income,
+            })
+        return rows
+
+
+def _cumulative(weights):
+    total = 0.0
+    for weight in weights:
+        total += weight
+        yield total
+
+
+def create_categories(db, user_id: int) -> dict:
+    names = [name for name, *_ in EXPENSE_CATEGORIES] + [INCOME_CATEGORY]
+    db.execute(insert(Category), [{"user_id": user_id, "name": name} for name in names])
+    db.commit()
+    return dict(db.execute(select(Category.name, Category.id).filter(Category.user_id == user_id)).all())
+
+
+def seed_user(
+    db, username: str, transactions: int, months: int = 24, income_ratio: float = 0.08, rng: Optional[random.Random] = None,
+    hashed_password: str = "!", batch_size: int = 10_000, progress: Optional[Callable[[int], None]] = None,
+) -> User:
+    """
+    Create a user with the standard categories and `transactions` generated transactions, and build
+    their rollup. The default password hash matches no password, so the user can't log in.
+    """
+    rng = rng or random.Random()
+    user = User(username=username, email=f"{username}@example.com", hashed_password=hashed_password, date_joined=datetime.utcnow())
+    db.add(user)
+    db.commit()
+    generator = TransactionGenerator(rng, user.id, create_categories(db, user.id), months, income_ratio)
+    for offset in range(0, transactions, batch_size):
+        db.execute(insert(Transaction), generator.rows(min(batch_size, transactions - offset)))
+        db.commit()
+        if progress is not None:
+            progress(min(offset + batch_size, transactions))
+    rebuild_rollups(db, user.id)
+    bump_data_version(user.id)
+    return user
+
+
+def delete_seeded_users(db, prefix: str) -> int:
+    user_ids = db.scalars(select(User.id).filter(User.username.startswith(prefix, autoescape=True))).all()
+    for user_id in user_ids:
+        db.execute(delete(Transaction).filter(Transaction.UserID == user_id))
+        db.execute(delete(MonthlyCategoryTotal).filter(MonthlyCategoryTotal.user_id == user_id))
+        db.execute(delete(Category).filter(Category.user_id == user_id))
+        db.execute(delete(User).filter(User.id == user_id))
+        db.commit()
+        bump_data_version(user_id)
+    return len(user_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate users, categories and transactions")
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--transactions", type=int, default=10_000, help="Transactions per user")
+    parser.add_argument("--months", type=int, default=24, help="How far back transactions go")
+    parser.add_argument("--income-ratio", type=float, default=0.08, help="Share of transactions that are income")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per INSERT and COMMIT")
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Username prefix; existing users with it are kept")
+    parser.add_argument("--password", help="Give the users this password so they can log in")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="Delete the users with --prefix (and their data) instead")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.reset:
+            print(f"Deleted {delete_seeded_users(db, args.prefix)} users")
+            return
+
+        existing = set(db.scalars(select(User.username).filter(User.username.startswith(args.prefix, autoescape=True))).all())
+        hashed_password = get_password_hash(args.password) if args.password else "!"
+        started, seeded = time.perf_counter(), 0
+        for i in range(args.users):
+            username = f"{args.prefix}{i}"
+            if username in existing:
+                print(f"{username} exists, skipping")
+                continue
+            seed_user(
+                db, username, args.transactions, args.months, args.income_ratio, random.Random(args.seed + i),
+                hashed_password, args.batch_size, progress=lambda done: print(f"{username}: {done}/{args.transactions}", end="\r", flush=True),
+            )
+            seeded += args.transactions
+            print()
+        elapsed = time.perf_counter() - started
+        print(f"Inserted {seeded} transactions in {elapsed:.1f}s ({seeded / elapsed if elapsed else 0:.0f} rows/s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
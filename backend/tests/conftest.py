@@ -0,0 +1,46 @@
+import uuid
+from weakref import WeakKeyDictionary
+import fakeredis
+import pytest
+import redis
+from redis import asyncio as aioredis
+from app.crud import crud_user  # noqa: F401 (imported first: crud_user and core.security import each other)
+from app.core import redis as core_redis
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.models.user import User
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """
+    Point the sync and async Redis clients (core/redis.py) at an in-process fakeredis server,
+    so features that need REDIS_URL (ETags, report caching, read-your-writes) can be tested without one.
+    """
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://fakeredis")
+    monkeypatch.setattr(core_redis, "_pool", redis.ConnectionPool(connection_class=fakeredis.FakeRedisConnection, server=server))
+    monkeypatch.setattr(core_redis, "_async_pools", WeakKeyDictionary())
+    monkeypatch.setattr(core_redis, "_new_async_pool", lambda: aioredis.ConnectionPool(connection_class=fakeredis.aioredis.FakeAsyncRedisConnection, server=server))
+    return fakeredis.FakeRedis(server=server)
+
+@pytest.fixture
+def user():
+    """
+    A user of the test's own, with no categories or transactions yet.
+    """
+    username = f"test-{uuid.uuid4().hex[:12]}"
+    with SessionLocal() as db:
+        user = User(username=username, email=f"{username}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+    return user
+
+@pytest.fixture
+def auth_headers(user):
+    """
+    Authorization headers for requests made as `user`.
+    """
+    return {"Authorization": f"Bearer {create_access_token(user.username)['access_token']}"}
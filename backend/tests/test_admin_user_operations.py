@@ -1,5 +1,20 @@
+import json
+import uuid
+from datetime import datetime
+import pytest
 from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy import select
 from app.main import app
+from app.core.admin import get_current_super_user
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.core.streaming import NDJSON_MEDIA_TYPE
+from app.crud.crud_admin import USER_EXPORT_COLUMNS, MAKE_SUPERUSER, UPDATED, UNCHANGED, NOT_FOUND, REJECTED
+from app.crud.crud_admin import _apply_to_chunk, filtered_username_chunks, username_chunks
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.schemas.user import BulkUserSelection, UserFilters
 
 client = TestClient(app)
 
@@ -14,3 +29,169 @@ client = TestClient(app)
 #     response = client.post("/api/v1/admin/create", json={"username": "", "password": ""})
 #     assert response.status_code == 422
 #     assert response.json() == {"detail": [{"loc": ["body", "username"], "msg": "field required", "type": "value_error.missing"}, {"loc": ["body", "password"], "msg": "field required", "type": "value_error.missing"}]}
+
+def test_list_users_requires_authentication():
+    # Test that the paginated user listing and its export need a token
+    assert client.get("/v1/admin/users", params={"limit": 10}).status_code == 401
+    assert client.get("/v1/admin/users/export").status_code == 401
+
+def test_bulk_operations_require_authentication():
+    # Test that the bulk admin operations need a token
+    assert client.post("/v1/admin/bulk/soft-delete", json={"usernames": ["someone"]}).status_code == 401
+    assert client.post("/v1/admin/bulk/update-role", json={"usernames": ["someone"], "role": "moderator"}).status_code == 401
+
+# Behaviour of the listing, export and bulk operations, against users created here. Each test
+# gets its own `country`, so its filters only ever match its own users
+
+@pytest.fixture
+def country():
+    return uuid.uuid4().hex[:12]
+
+@pytest.fixture
+def make_users(country):
+    # Create users {suffix: column overrides} in that country; returns {suffix: username}
+    def make(**users):
+        usernames = {}
+        with SessionLocal() as db:
+            for suffix, columns in users.items():
+                username = f"{country}-{suffix}"
+                db.add(User(username=username, email=f"{username}@example.com", hashed_password="x", country=country, **columns))
+                usernames[suffix] = username
+            db.commit()
+        return usernames
+    return make
+
+@pytest.fixture
+def superuser(make_users):
+    # Requests in the test are made as this superuser
+    username = make_users(admin={"is_superuser": True})["admin"]
+    with SessionLocal() as db:
+        admin = db.scalars(select(User).filter(User.username == username)).one()
+    app.dependency_overrides[get_current_super_user] = lambda: admin
+    yield admin
+    app.dependency_overrides.pop(get_current_super_user, None)
+
+def _user(username):
+    with SessionLocal() as db:
+        return db.scalars(select(User).filter(User.username == username)).one()
+
+def test_list_users_pages_by_cursor(superuser, make_users, country):
+    # Test keyset paging: every user exactly once, X-Next-Cursor on every page but the last
+    make_users(a={}, b={}, c={}, d={})
+    usernames, cursor, pages = [], None, 0
+    while True:
+        params = {"country": country, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/v1/admin/users", params=params)
+        assert response.status_code == 200
+        usernames += [user["username"] for user in response.json()]
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert pages == 3
+    assert usernames == [f"{country}-{suffix}" for suffix in ("admin", "a", "b", "c", "d")]
+
+def test_list_users_filters(superuser, make_users, country):
+    # Test the filters, including that joined_to includes the whole day
+    created = make_users(
+        early={"date_joined": datetime(2024, 1, 1, 8), "city": "Pokhara"},
+        late={"date_joined": datetime(2024, 1, 31, 23, 30), "role": "moderator"},
+        after={"date_joined": datetime(2024, 2, 1, 0, 0)},
+        deleted={"date_joined": datetime(2024, 1, 15), "is_deleted": True},
+    )
+    def listed(**filters):
+        response = client.get("/v1/admin/users", params={"country": country, **filters})
+        assert response.status_code == 200
+        return {user["username"] for user in response.json()}
+    assert listed(joined_from="2024-01-01", joined_to="2024-01-31") == {created["early"], created["late"], created["deleted"]}
+    assert listed(joined_from="2024-01-02", joined_to="2024-01-31", is_deleted=False) == {created["late"]}
+    assert listed(role="moderator") == {created["late"]}
+    assert listed(city="Pokhara") == {created["early"]}
+    assert client.get("/v1/admin/users", params={"joined_from": "2024-02-01", "joined_to": "2024-01-01"}).status_code == 400
+
+def test_list_users_invalid_cursor(superuser):
+    assert client.get("/v1/admin/users", params={"cursor": encode_cursor("not-an-id")}).status_code == 400
+    assert client.get("/v1/admin/users", params={"cursor": "garbage"}).status_code == 400
+
+def test_export_users_ndjson(superuser, make_users, country):
+    # Test the export: one UserPublic object per matching user, never the password hash
+    make_users(a={}, b={})
+    response = client.get("/v1/admin/users/export", params={"country": country})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    users = [json.loads(line) for line in response.text.splitlines()]
+    assert [user["username"] for user in users] == [f"{country}-{suffix}" for suffix in ("admin", "a", "b")]
+    assert all(set(user) == set(USER_EXPORT_COLUMNS) for user in users)
+    assert "hashed_password" not in USER_EXPORT_COLUMNS
+
+def test_username_chunks():
+    # Test that duplicates are dropped, order is kept and chunks are at most chunk_size long
+    with SessionLocal() as db:
+        assert [chunk.usernames for chunk in username_chunks(db, ["a", "b", "a", "c", "b", "d", "e"], 2)] == [["a", "b"], ["c", "d"], ["e"]]
+        assert list(username_chunks(db, [], 2)) == []
+
+def test_bulk_selection_validation():
+    # Test that a selection needs exactly one of usernames and filters, and a non-empty filter
+    assert BulkUserSelection(usernames=["a"]).usernames == ["a"]
+    assert BulkUserSelection(filters={"country": "NP"}).filters.country == "NP"
+    for selection in ({}, {"usernames": ["a"], "filters": {"country": "NP"}}, {"filters": {}}, {"filters": {"city": None}}):
+        with pytest.raises(ValidationError):
+            BulkUserSelection(**selection)
+
+def test_bulk_rejects_empty_filter(superuser):
+    response = client.post("/v1/admin/bulk/soft-delete", json={"filters": {}})
+    assert response.status_code == 422
+
+def test_apply_to_chunk_outcomes(superuser, make_users):
+    # Test the per-user outcomes of one chunk: updated, unchanged, not found, self and deleted users
+    created = make_users(member={}, admin2={"is_superuser": True}, gone={"is_deleted": True})
+    missing = f"{created['member']}-missing"
+    with SessionLocal() as db:
+        [chunk] = username_chunks(db, [created["member"], created["admin2"], missing, superuser.username, created["gone"]], 10)
+        outcomes = _apply_to_chunk(db, MAKE_SUPERUSER, superuser.username, chunk)
+    assert [(outcome["username"], outcome["status"]) for outcome in outcomes] == [
+        (created["member"], UPDATED), (created["admin2"], UNCHANGED), (missing, NOT_FOUND), (superuser.username, REJECTED), (created["gone"], NOT_FOUND),
+    ]
+    assert _user(created["member"]).is_superuser
+    assert not _user(created["gone"]).is_superuser
+
+def test_bulk_soft_delete_by_username(superuser, make_users):
+    # Test the endpoint: duplicates collapse to one outcome, the acting superuser is protected
+    created = make_users(a={}, b={}, gone={"is_deleted": True})
+    response = client.post("/v1/admin/bulk/soft-delete", json={"usernames": [created["a"], created["b"], created["a"], superuser.username, created["gone"]]})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["updated"] == 2
+    assert [(outcome["username"], outcome["status"]) for outcome in result["outcomes"]] == [
+        (created["a"], UPDATED), (created["b"], UPDATED), (superuser.username, REJECTED), (created["gone"], NOT_FOUND),
+    ]
+    assert _user(created["a"]).is_deleted and _user(created["b"]).is_deleted
+    assert not _user(superuser.username).is_deleted
+
+def test_bulk_update_role_by_filter_in_chunks(superuser, make_users, country, monkeypatch):
+    # Test a filter selection over several chunks: every matching user once, in id order
+    monkeypatch.setattr(settings, "ADMIN_BULK_CHUNK_SIZE", 2)
+    created = make_users(a={}, b={}, c={"role": "moderator"}, d={})
+    response = client.post("/v1/admin/bulk/update-role", json={"filters": {"country": country}, "role": "moderator"})
+    assert response.status_code == 200
+    result = response.json()
+    assert [(outcome["username"], outcome["status"]) for outcome in result["outcomes"]] == [
+        (superuser.username, REJECTED), (created["a"], UPDATED), (created["b"], UPDATED), (created["c"], UNCHANGED), (created["d"], UPDATED),
+    ]
+    assert result["updated"] == 3
+    assert {_user(username).role for username in created.values()} == {"moderator"}
+
+def test_update_role_stores_enum_value(superuser, make_users):
+    # Test that the single-user endpoint stores the role lowercase, like the bulk endpoint
+    created = make_users(a={})
+    response = client.patch(f"/v1/admin/update-role/{created['a']}", json={"role": "Moderator"})
+    assert response.status_code == 200
+    assert _user(created["a"]).role == "moderator"
+    assert client.patch(f"/v1/admin/update-role/{created['a']}", json={"role": "owner"}).status_code == 400
+
+def test_filtered_username_chunks(make_users, country):
+    created = make_users(a={}, b={}, c={})
+    with SessionLocal() as db:
+        chunks = list(filtered_username_chunks(db, UserFilters(country=country), 2))
+    assert [chunk.usernames for chunk in chunks] == [[created["a"], created["b"]], [created["c"]]]
+    assert chunks[0].rows[created["a"]].role == "member"
@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import select
+from app.main import app
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.blocklist import BlocklistedToken
+
+client = TestClient(app)
+
+def test_logout_revokes_token(auth_headers, fake_redis):
+    # Test that logging out revokes the token in Redis and the database, and that it is refused afterwards
+    assert client.get("/v1/user/profile", headers=auth_headers).status_code == 200
+    response = client.post("/v1/auth/logout", headers=auth_headers)
+    assert response.status_code == 200
+    jti = jwt.decode(auth_headers["Authorization"].split()[1], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["jti"]
+    assert fake_redis.exists(f"revoked-token:{jti}")
+    with SessionLocal() as db:
+        assert db.scalar(select(BlocklistedToken.id).filter(BlocklistedToken.jti == jti)) is not None
+    assert client.get("/v1/user/profile", headers=auth_headers).status_code == 401
@@ -1,27 +1,15 @@
-from fastapi.testclient import TestClient
-from app.main import app
-import os
-from dotenv import load_dotenv
 import random
 import string
-
-load_dotenv()
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.crud import crud_categories
+from app.db.session import SessionLocal
+from app.schemas.categories import CategoryCreate
 
 client = TestClient(app)
 
-# call login endpoint to get a valid JWT token using the test user from .env file
-test_user = os.getenv("TEST_USER");
-test_password = os.getenv("TEST_PASSWORD");
-response = client.post("/v1/auth/login", json={"username": test_user, "password": test_password})
-assert response.status_code == 200
-assert "access_token" in response.json()
-assert "refresh_token" in response.json()
-token = response.json()["access_token"]
-print("Response is:")
-print(response.json())
-
-# Test creating a category with authentication header
-headers = {"Authorization": f"Bearer {token}"}
+# Requests are made as a user created for each test (auth_headers, see conftest.py)
 
 # Generate a new random category name
 
@@ -29,35 +17,61 @@ def random_string(length):
     letters = string.ascii_lowercase
     return ''.join(random.choice(letters) for i in range(length))
 
+@pytest.fixture
+def category(user):
+    # The id of a category of the test's user
+    with SessionLocal() as db:
+        return crud_categories.create_category(db, CategoryCreate(name=random_string(8)), user.id).id
 
-def test_create_category_endpoint():
+
+def test_create_category_endpoint(auth_headers):
     # Test creating a category
-    response = client.post("/v1/categories/", json={"name": random_string(5), "budgeted_amount": 0, "budgeted_limit": 0, "color_code": "blue", "description": "", "icon": ""}, headers=headers)
+    response = client.post("/v1/categories/", json={"name": random_string(5), "budgeted_amount": 0, "budgeted_limit": 0, "color_code": "blue", "description": "", "icon": ""}, headers=auth_headers)
     print(response.json())
     assert response.status_code == 200
 
-def test_create_category_endpoint_invalid_data():
+def test_create_category_endpoint_invalid_data(auth_headers):
     # Test creating a category with invalid data
-    response = client.post("/v1/categories/", json={"testname": ""}, headers=headers)
+    response = client.post("/v1/categories/", json={"testname": ""}, headers=auth_headers)
     assert response.status_code == 422
     print(response.json())
 
-def test_read_categories():
+def test_read_categories(auth_headers):
     # Test reading categories
-    response = client.get("/v1/categories/", headers=headers)
+    response = client.get("/v1/categories/", headers=auth_headers)
     assert response.status_code == 200
 
-def test_read_category():
+def test_read_category(auth_headers, category):
     # Test reading a category
-    response = client.get("/v1/categories/36/", headers=headers)
+    response = client.get(f"/v1/categories/{category}/", headers=auth_headers)
     assert response.status_code == 200
+    assert response.json()["id"] == category
 
-def test_read_category_not_found():
-    # Test reading a category that does not exist
-    response = client.get("/v1/categories/2/", headers=headers)
+def test_read_category_not_found(auth_headers, category):
+    # Test reading a category that no longer exists
+    assert client.delete(f"/v1/categories/{category}/", headers=auth_headers).status_code == 200
+    response = client.get(f"/v1/categories/{category}/", headers=auth_headers)
     assert response.status_code == 404
 
-def test_update_category_endpoint():
+def test_update_category_endpoint(auth_headers, category):
     # Test updating a category
-    response = client.put("/v1/categories/36/", json={"name": "Category 1 Updated"}, headers=headers)
-    assert response.status_code == 200
\ No newline at end of file
+    response = client.put(f"/v1/categories/{category}/", json={"name": "Category 1 Updated"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Category 1 Updated"
+
+def test_read_categories_not_modified(auth_headers, fake_redis):
+    # Test re-reading categories with the ETag of the previous response
+    response = client.get("/v1/categories/", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    response = client.get("/v1/categories/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+def test_read_categories_etag_changes_after_write(auth_headers, fake_redis):
+    # Test that a write invalidates the ETag of the previous response
+    etag = client.get("/v1/categories/", headers=auth_headers).headers["ETag"]
+    client.post("/v1/categories/", json={"name": random_string(5)}, headers=auth_headers)
+    response = client.get("/v1/categories/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
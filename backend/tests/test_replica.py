@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from app.crud import crud_user  # noqa: F401 (imported first: crud_user and core.security import each other)
+from app.core import data_version, report_cache
+from app.core.config import settings
+from app.db import replica
+from app.db.session import SessionLocal, ReadSessionLocal, AsyncSessionLocal, get_async_database_url, pool_options
+from app.main import app
+from app.schemas.reportbycategories import BudgetOverview, MonthlySummary
+
+USER_ID = 424242
+
+@pytest.fixture
+def replicated(monkeypatch):
+    # A distinct read engine, as if DATABASE_READ_URL were set, and no writes remembered yet
+    monkeypatch.setattr(settings, "DATABASE_READ_URL", "sqlite://")
+    monkeypatch.setattr(replica, "read_engine", create_engine("sqlite://"))
+    monkeypatch.setattr(replica, "async_read_engine", create_async_engine("sqlite+aiosqlite://"))
+    monkeypatch.setattr(data_version, "_recent_writes", {})
+    return replica.read_engine
+
+def test_pool_options_sized_from_settings():
+    # Test that server databases get the pool settings from config
+    assert pool_options("mysql+pymysql://user:password@db/budget") == {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def test_pool_options_sqlite():
+    # Test that SQLite, sync or async, gets no pool sizing (its pools don't take one)
+    assert pool_options("sqlite:////tmp/budget.db") == {}
+    assert pool_options(get_async_database_url("sqlite:////tmp/budget.db")) == {}
+
+def test_get_async_database_url():
+    assert get_async_database_url("mysql+pymysql://user:password@db/budget") == "mysql+aiomysql://user:password@db/budget"
+    assert get_async_database_url("sqlite:////tmp/budget.db") == "sqlite+aiosqlite:////tmp/budget.db"
+
+def test_reads_use_primary_without_replica():
+    # Test that without DATABASE_READ_URL everything reads from the primary
+    assert not replica.use_replica(USER_ID)
+    assert replica.read_session_factory(USER_ID) is SessionLocal
+
+def test_reads_use_replica(replicated, fake_redis):
+    assert replica.use_replica(USER_ID)
+    assert asyncio.run(replica.use_replica_async(USER_ID))
+    assert replica.read_session_factory(USER_ID) is ReadSessionLocal
+
+def test_reads_use_primary_after_write(replicated, fake_redis):
+    # Test read-your-writes: after a write, the user reads from the primary
+    data_version.bump_data_version(USER_ID)
+    assert not replica.use_replica(USER_ID)
+    assert not asyncio.run(replica.use_replica_async(USER_ID))
+    assert replica.use_replica(USER_ID + 1)
+
+def test_reads_use_primary_after_write_in_another_worker(replicated, fake_redis):
+    # Test that a write made through another worker (known only from Redis) also counts
+    asyncio.run(data_version.bump_data_version_async(USER_ID))
+    data_version._recent_writes.clear()
+    assert fake_redis.ttl(f"recent-write:{USER_ID}") == settings.REPLICA_READ_AFTER_WRITE_SECONDS
+    assert not replica.use_replica(USER_ID)
+    assert not asyncio.run(replica.use_replica_async(USER_ID))
+
+def test_reads_use_primary_without_redis(replicated, monkeypatch):
+    # Test that without Redis reads stay on the primary, unless REPLICA_WITHOUT_REDIS says otherwise
+    monkeypatch.setattr(settings, "REDIS_URL", None)
+    assert not replica.use_replica(USER_ID)
+    monkeypatch.setattr(settings, "REPLICA_WITHOUT_REDIS", True)
+    assert replica.use_replica(USER_ID)
+
+def test_is_replica_session(replicated):
+    with Session(bind=replicated) as db:
+        assert replica.is_replica_session(db)
+    with SessionLocal() as db:
+        assert not replica.is_replica_session(db)
+    assert replica.is_replica_session(AsyncSession(bind=replica.async_read_engine))
+    assert not replica.is_replica_session(AsyncSessionLocal())
+
+def test_no_etag_from_replica(replicated, fake_redis, monkeypatch, auth_headers):
+    # Test that lists read from the replica carry no ETag, since the data version follows the primary.
+    # The "replica" is a second engine on the test database, so the endpoints have tables to read
+    monkeypatch.setattr(replica, "async_read_engine", create_async_engine(get_async_database_url(settings.DATABASE_URL)))
+    monkeypatch.setattr(replica, "AsyncReadSessionLocal", async_sessionmaker(bind=replica.async_read_engine, expire_on_commit=False))
+    client = TestClient(app)
+    for path in ("/v1/categories/", "/v1/transactions/"):
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+def test_replica_reports_cached_briefly(fake_redis):
+    # Test that a closed month computed on the replica is cached for REPORT_CACHE_REPLICA_TTL_SECONDS only
+    summary = MonthlySummary(overview=BudgetOverview(total_income=0, total_expenses=0, balance=0), expenses_by_category=[], expense_percentages=[])
+    report_cache.cached_month_summary("test", USER_ID, 2001, 1, lambda: summary)
+    report_cache.cached_month_summary("test", USER_ID + 1, 2001, 1, lambda: summary, replica=True)
+    ttls = {user_id: fake_redis.ttl(key) for user_id in (USER_ID, USER_ID + 1) for key in fake_redis.keys(f"report:{user_id}:*")}
+    assert ttls[USER_ID] == settings.REPORT_CACHE_CLOSED_MONTH_TTL_SECONDS
+    assert ttls[USER_ID + 1] == settings.REPORT_CACHE_REPLICA_TTL_SECONDS
@@ -0,0 +1,58 @@
+from fastapi.testclient import TestClient
+from app.main import app
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+client = TestClient(app)
+
+# call login endpoint to get a valid JWT token using the test user from .env file
+test_user = os.getenv("TEST_USER");
+test_password = os.getenv("TEST_PASSWORD");
+response = client.post("/v1/auth/login", json={"username": test_user, "password": test_password})
+assert response.status_code == 200
+token = response.json()["access_token"]
+
+headers = {"Authorization": f"Bearer {token}"}
+
+def test_monthly_summary():
+    # Test the combined dashboard report
+    response = client.get("/v1/reports/2024/1/summary", headers=headers)
+    assert response.status_code == 200
+    summary = response.json()
+    assert set(summary) == {"overview", "expenses_by_category", "expense_percentages"}
+    overview = summary["overview"]
+    assert round(overview["total_income"] - overview["total_expenses"], 2) == round(overview["balance"], 2)
+
+def test_summary_matches_individual_reports():
+    # Test that the summary returns the same data as the three month reports
+    summary = client.get("/v1/reports/2024/1/summary", headers=headers).json()
+    assert client.get("/v1/reports/budgets/2024/1/budget-overview", headers=headers).json() == summary["overview"]
+    assert client.get("/v1/reports/categories/expenses/2024/1", headers=headers).json() == summary["expenses_by_category"]
+    assert client.get("/v1/reports/categories/expense-percentages/2024/1", headers=headers).json() == summary["expense_percentages"]
+
+def test_trends_zero_filled():
+    # Test that the trend report has one point per month, including months without transactions
+    response = client.get("/v1/reports/trends", params={"from": "2023-11", "to": "2024-02"}, headers=headers)
+    assert response.status_code == 200
+    trends = response.json()
+    assert trends["months"] == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    assert [point["month"] for point in trends["totals"]] == trends["months"]
+    assert trends["categories"] is None
+
+def test_trends_by_category_matches_summary():
+    # Test that one month of the per-category trend agrees with that month's summary
+    trends = client.get("/v1/reports/trends", params={"from": "2024-01", "to": "2024-01", "group": "category"}, headers=headers).json()
+    summary = client.get("/v1/reports/2024/1/summary", headers=headers).json()
+    assert round(trends["totals"][0]["expenses"], 2) == round(summary["overview"]["total_expenses"], 2)
+    expenses = {row["id"]: row["total_amount"] for row in summary["expenses_by_category"]}
+    for series in trends["categories"]:
+        assert [point["month"] for point in series["points"]] == trends["months"]
+        if series["id"] in expenses:
+            assert round(series["points"][0]["expenses"], 2) == round(expenses[series["id"]], 2)
+
+def test_trends_invalid_range():
+    # Test rejecting a reversed range and a malformed month
+    assert client.get("/v1/reports/trends", params={"from": "2024-05", "to": "2024-01"}, headers=headers).status_code == 400
+    assert client.get("/v1/reports/trends", params={"from": "2024-13"}, headers=headers).status_code == 422
@@ -1,23 +1,19 @@
+import json
+import random
+import string
+from datetime import date
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-import os
-from dotenv import load_dotenv
-import random, string
-
-load_dotenv()
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.crud import crud_transactions
+from app.db.session import SessionLocal
+from app.schemas.transaction import TransactionCreate
 
 client = TestClient(app)
 
-# call login endpoint to get a valid JWT token using the test user from .env file
-test_user = os.getenv("TEST_USER");
-test_password = os.getenv("TEST_PASSWORD");
-response = client.post("/v1/auth/login", json={"username": test_user, "password": test_password})
-assert response.status_code == 200
-assert "access_token" in response.json()
-assert "refresh_token" in response.json()
-token = response.json()["access_token"]
-print("Response is:")
-print(response.json())
+# Requests are made as a user created for each test (auth_headers, see conftest.py)
 
 # Generate a new random category name
 
@@ -25,8 +21,13 @@ def random_string(length):
     letters = string.ascii_lowercase
     return ''.join(random.choice(letters) for i in range(length))
 
-# create authentication header with token
-headers = {"Authorization": f"Bearer {token}"}
+@pytest.fixture
+def make_transactions(user):
+    # Create transactions for `user` from TransactionCreate fields; returns their ids in order
+    def make(*rows):
+        with SessionLocal() as db:
+            return [crud_transactions.create_transaction(db, TransactionCreate(**row), user.id).TransactionID for row in rows]
+    return make
 
 # {
 #   "Amount": "<number>",
@@ -39,45 +40,161 @@ headers = {"Authorization": f"Bearer {token}"}
 #   "CreatedAt": "<dateTime>"
 # }
 
-def test_create_transaction_endpoint():
+def test_create_transaction_endpoint(auth_headers):
     # Test creating a transaction
-    response = client.post("/v1/transactions/", json={"Amount": 10, "Date": "2021-09-01", "Description": random_string(8), "Note":"", "Location":"", "Is_Income":0}, headers=headers)
+    response = client.post("/v1/transactions/", json={"Amount": 10, "Date": "2021-09-01", "Description": random_string(8), "Note":"", "Location":"", "Is_Income":0}, headers=auth_headers)
     assert response.status_code == 200
 
-def test_create_transaction_endpoint_invalid_data():
+def test_create_transaction_endpoint_invalid_data(auth_headers):
     # Test creating a transaction with invalid data
-    response = client.post("/v1/transactions/", json={"amount": 10, "date": "2021-09-01", "description": "Test transaction", "type": "invalid"}, headers=headers)
+    response = client.post("/v1/transactions/", json={"amount": 10, "date": "2021-09-01", "description": "Test transaction", "type": "invalid"}, headers=auth_headers)
     assert response.status_code == 422
 
-def test_read_transactions():
+def test_read_transactions(auth_headers):
     # Test reading transactions
-    response = client.get("/v1/transactions/", headers=headers)
+    response = client.get("/v1/transactions/", headers=auth_headers)
     print("Response is:")
     print(response.json())
     assert response.status_code == 200
 
-def test_read_transaction():
+def test_read_transaction(auth_headers, make_transactions):
     # Test reading a transaction
-    response = client.get("/v1/transactions/69/", headers=headers)
+    [transaction_id] = make_transactions({"Amount": 10, "Date": date(2021, 9, 1)})
+    response = client.get(f"/v1/transactions/{transaction_id}/", headers=auth_headers)
     assert response.status_code == 200
+    assert response.json()["TransactionID"] == transaction_id
 
-def test_read_transaction_not_found():
-    # Test reading a transaction that does not exist
-    response = client.get("/v1/transactions/100/", headers=headers)
+def test_read_transaction_not_found(auth_headers, make_transactions):
+    # Test reading a transaction that no longer exists
+    [transaction_id] = make_transactions({"Amount": 10, "Date": date(2021, 9, 1)})
+    assert client.delete(f"/v1/transactions/{transaction_id}/", headers=auth_headers).status_code == 200
+    response = client.get(f"/v1/transactions/{transaction_id}/", headers=auth_headers)
     assert response.status_code == 404
 
-# def test_update_transaction_endpoint():
+# def test_update_transaction_endpoint(auth_headers):
 #     # Test updating a transaction
-#     response = client.put("/v1/transactions/70/", json={"Amount": 10}, headers=headers)
+#     response = client.put("/v1/transactions/70/", json={"Amount": 10}, headers=auth_headers)
 #     assert response.status_code == 200
 
-# def test_delete_transaction():
+# def test_delete_transaction(auth_headers):
 #     # Test deleting a transaction
-#     response = client.delete("/v1/transactions/70/", headers=headers)
+#     response = client.delete("/v1/transactions/70/", headers=auth_headers)
 #     assert response.status_code == 200
 
-def test_delete_transaction_not_found():
-    # Test deleting a transaction that does not exist
-    response = client.delete("/v1/transactions/100/", headers=headers)
+def test_delete_transaction_not_found(auth_headers, make_transactions):
+    # Test deleting a transaction that no longer exists
+    [transaction_id] = make_transactions({"Amount": 10, "Date": date(2021, 9, 1)})
+    assert client.delete(f"/v1/transactions/{transaction_id}/", headers=auth_headers).status_code == 200
+    response = client.delete(f"/v1/transactions/{transaction_id}/", headers=auth_headers)
     assert response.status_code == 404
 
+
+def test_read_transactions_cursor_pagination(auth_headers, make_transactions):
+    # Test walking pages with the cursor returned in the X-Next-Cursor header: every transaction exactly once
+    created = make_transactions(*({"Amount": day, "Date": date(2024, 1, day)} for day in range(1, 6)))
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, "cursor": cursor} if cursor else {"limit": 2}
+        response = client.get("/v1/transactions/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        pages.append([transaction["TransactionID"] for transaction in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(sum(pages, [])) == sorted(created)
+
+def test_read_transactions_invalid_cursor(auth_headers):
+    # Test reading transactions with a malformed cursor
+    response = client.get("/v1/transactions/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
+
+def test_read_transactions_filtered(auth_headers):
+    # Test server-side filters
+    params = {"from": "2024-01-01", "to": "2024-12-31", "is_income": "false", "min_amount": 1}
+    response = client.get("/v1/transactions/", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    for transaction in response.json():
+        assert "2024-01-01" <= transaction["Date"] <= "2024-12-31"
+        assert transaction["Is_Income"] is False
+        assert transaction["Amount"] >= 1
+
+def test_read_transactions_sorted_by_amount(auth_headers):
+    # Test sorting by amount, largest first
+    response = client.get("/v1/transactions/", params={"sort": "-amount"}, headers=auth_headers)
+    assert response.status_code == 200
+    amounts = [transaction["Amount"] for transaction in response.json()]
+    assert amounts == sorted(amounts, reverse=True)
+
+def test_read_transactions_invalid_filters(auth_headers):
+    # Test rejecting an empty date range and an unknown sort
+    response = client.get("/v1/transactions/", params={"from": "2024-02-01", "to": "2024-01-01"}, headers=auth_headers)
+    assert response.status_code == 400
+    response = client.get("/v1/transactions/", params={"sort": "description"}, headers=auth_headers)
+    assert response.status_code == 422
+
+def test_read_transactions_expand_category(auth_headers):
+    # Test embedding each transaction's category
+    response = client.get("/v1/transactions/", params={"expand": "category", "limit": 5}, headers=auth_headers)
+    assert response.status_code == 200
+    for transaction in response.json():
+        assert "category" in transaction
+        if transaction["category"] is not None:
+            assert transaction["category"]["id"] == transaction["CategoryID"]
+
+def test_read_transactions_expand_category_query_budget(auth_headers, monkeypatch):
+    # Test that embedding categories doesn't load them one query per transaction (strict mode raises on N+1)
+    monkeypatch.setattr(settings, "QUERY_STRICT", True)
+    monkeypatch.setattr(settings, "QUERY_MAX_REPEATS", 1)
+    response = client.get("/v1/transactions/", params={"expand": "category", "limit": 50}, headers=auth_headers)
+    assert response.status_code == 200
+
+def test_read_transactions_invalid_expand(auth_headers):
+    # Test expanding an unsupported relation
+    response = client.get("/v1/transactions/", params={"expand": "user"}, headers=auth_headers)
+    assert response.status_code == 422
+
+def test_bulk_create_transactions_json(auth_headers):
+    # Test a bulk import where one row is invalid; the valid rows are still inserted
+    rows = [
+        {"Amount": 10, "Date": "2021-09-01", "Description": random_string(8), "Is_Income": False},
+        {"Amount": "not-a-number", "Date": "2021-09-01"},
+    ]
+    response = client.post("/v1/transactions/bulk", json=rows, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
+    assert response.json()["failed"] == 1
+    assert response.json()["errors"][0]["row"] == 2
+
+def test_bulk_create_transactions_csv(auth_headers):
+    # Test a bulk import from an uploaded CSV file
+    csv_data = f"Amount,Date,Description,Is_Income\n12.5,2021-09-02,{random_string(8)},false\n"
+    response = client.post("/v1/transactions/bulk", files={"file": ("transactions.csv", csv_data, "text/csv")}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
+
+def test_bulk_create_transactions_not_a_list(auth_headers):
+    # Test a bulk import with a JSON object instead of an array
+    response = client.post("/v1/transactions/bulk", json={"Amount": 10}, headers=auth_headers)
+    assert response.status_code == 400
+
+def test_export_transactions_csv(auth_headers):
+    # Test exporting transactions as CSV
+    response = client.get("/v1/transactions/export", params={"format": "csv"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines()[0].startswith("TransactionID,Date,Amount")
+
+def test_export_transactions_ndjson_date_range(auth_headers, make_transactions):
+    # Test exporting transactions as NDJSON within a date range: the bounds are inclusive
+    dates = [date(2021, 8, 31), date(2021, 9, 1), date(2021, 9, 15), date(2021, 9, 30), date(2021, 10, 1)]
+    created = dict(zip(make_transactions(*({"Amount": 10, "Date": day} for day in dates)), dates))
+    response = client.get("/v1/transactions/export", params={"format": "ndjson", "from": "2021-09-01", "to": "2021-09-30"}, headers=auth_headers)
+    assert response.status_code == 200
+    exported = {row["TransactionID"]: row["Date"] for row in map(json.loads, response.text.splitlines())}
+    assert exported == {transaction_id: day.isoformat() for transaction_id, day in created.items() if date(2021, 9, 1) <= day <= date(2021, 9, 30)}
+
+def test_export_transactions_invalid_format(auth_headers):
+    # Test exporting transactions in an unsupported format
+    response = client.get("/v1/transactions/export", params={"format": "xml"}, headers=auth_headers)
+    assert response.status_code == 422
@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from app.crud import crud_user  # noqa: F401 (imported first: crud_user and core.security import each other)
+from app.core import user_cache
+from app.core.config import settings
+from app.models.user import User
+
+def _user(is_superuser=False):
+    return User(id=424242, username="cached-user", email="cached@example.com", hashed_password="x", is_active=True, is_superuser=is_superuser)
+
+@pytest.fixture
+def redis_cache(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "USER_CACHE_USE_REDIS", True)
+    return fake_redis
+
+def test_cached_user_is_detached_copy(redis_cache):
+    async def run():
+        user, generation = await user_cache.get_cached_user_async("cached-user")
+        assert user is None
+        await user_cache.cache_user_async(_user(), generation)
+        return await user_cache.get_cached_user_async("cached-user")
+    cached, _ = asyncio.run(run())
+    assert (cached.id, cached.username, cached.is_superuser) == (424242, "cached-user", False)
+
+def test_invalidation_reaches_every_worker(redis_cache):
+    # Test that another worker's invalidation (known only from Redis) is seen on the next lookup
+    asyncio.run(user_cache.cache_user_async(_user(is_superuser=True)))
+    user_cache.invalidate_user("cached-user")
+    user, _ = asyncio.run(user_cache.get_cached_user_async("cached-user"))
+    assert user is None
+    assert redis_cache.ttl("user-cache-generation:cached-user") == settings.USER_CACHE_TTL_SECONDS * 2
+
+def test_snapshot_loaded_before_invalidation_is_rejected(redis_cache):
+    # Test the race: a worker loads the user, the row is changed and invalidated, then the old snapshot is stored
+    async def run():
+        _, generation = await user_cache.get_cached_user_async("cached-user")
+        await user_cache.invalidate_user_async("cached-user")
+        await user_cache.cache_user_async(_user(is_superuser=True), generation)
+        return await user_cache.get_cached_user_async("cached-user")
+    user, generation = asyncio.run(run())
+    assert user is None and generation == b"1"
+
+def test_local_cache_without_redis(monkeypatch):
+    monkeypatch.setattr(user_cache, "_local_cache", user_cache.TTLCache(maxsize=8, ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS))
+    asyncio.run(user_cache.cache_user_async(_user()))
+    assert asyncio.run(user_cache.get_cached_user_async("cached-user"))[0].username == "cached-user"
+    user_cache.invalidate_user("cached-user")
+    assert asyncio.run(user_cache.get_cached_user_async("cached-user")) == (None, None)